@@ -9,107 +9,346 @@ Structure:
 - core/: Graph state, edges, resolver
 - nodes/: Individual node implementations
 - utils/: Helper functions (OCR, rendering)
+
+Subcommands (each imports only the heavy modules it needs):
+    python auto_improve_subtitles.py                                  # full run on the bundled sample
+    python auto_improve_subtitles.py transcribe video.mp4 -o segments.json
+    python auto_improve_subtitles.py translate segments.json -o translated.json
+    python auto_improve_subtitles.py analyze-target chinese_sample.jpg
+    python auto_improve_subtitles.py tune video.mp4 chinese_sample.jpg --segments translated.json
+    python auto_improve_subtitles.py render video.mp4 translated.json --parameters output/iteration_results.json
 """
 
 import sys
-import importlib.util
+import json
+import time
+import shutil
+import argparse
+import importlib
+import tempfile
+from functools import partial
 from pathlib import Path
 from config import AgentConfig
-from utils.ocr_analyzer import OCRAnalyzer
-from nodes.analyze_target_node import AnalyzeTargetNode
-from nodes.generate_video_node import GenerateVideoNode
-from nodes.take_screenshot_node import TakeScreenshotNode
-from nodes.analyze_current_node import AnalyzeCurrentNode
-from nodes.compare_node import CompareNode
-from nodes.adjust_parameters_node import AdjustParametersNode
-from core.resolver import SubtitleResolver
+from core.state import GraphState, convert_to_native
+from core.checkpoint import CheckpointJournal
+from core.instrumentation import Instrumentation, CProfileProfiler
+from core.iteration_log import IterationLog
 
 # Helper function to load modules from utils directory
 def load_utils_module(module_name):
-    r"""Load a module from the utils directory"""
-    utils_path = Path(__file__).parent / "utils" / f"{module_name}.py"
-    spec = importlib.util.spec_from_file_location(module_name, utils_path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Could not load {module_name} from {utils_path}")
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    r"""Load a module from the utils directory (shared with regular `utils.*` imports)"""
+    return importlib.import_module(f"utils.{module_name}")
 
-# Load whisper and translate tools
-whisper_tools = load_utils_module("whisper_tools")
-translate_tools = load_utils_module("translate_tools")
 
+def __getattr__(name):
+    """Whisper (faster-whisper) and translate tools load on first use, not at import"""
+    if name in ("whisper_tools", "translate_tools"):
+        module = load_utils_module(name)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def main():
-    """Main execution"""
-    print("="*60)
-    print("🤖 AI AGENT: Graph-Based Subtitle Improvement")
-    print("="*60)
-    
-    # Paths
-    agent_dir = Path(__file__).parent
-    target_image = agent_dir / "chinese_sample.jpg"
-    source_video = agent_dir / "10_second.mp4"
-    output_dir = agent_dir / "output"
-    screenshots_dir = agent_dir / "screenshots"
+
+def open_transcript(source_video, config, instrumentation, whisper_model=None):
+    """
+    Lazy Whisper segments of a video
     
-    # Check files exist
-    if not target_image.exists():
-        print(f"❌ Target image not found: {target_image}")
-        print("   Please copy chinese_sample.jpg to agent folder!")
-        return
+    Returns:
+        (segments, transcript_cache): Segment iterator and the cache it reads/fills (or None)
+    """
+    from utils.audio_buffer import extract_audio
+    from utils.transcript_cache import TranscriptCache
     
-    if not source_video.exists():
-        print(f"❌ Source video not found: {source_video}")
-        print("   Please copy 10_second.mp4 to agent folder!")
-        return
+    # Decode the audio once into a memory-mapped PCM file shared by every audio consumer
+    agent_dir = Path(__file__).parent
+    with instrumentation.stage('extract_audio'):
+        audio = extract_audio(source_video, agent_dir / config.audio_cache_dir, config.audio_cache_max_files)
     
-    # Load configuration from config.py (uses defaults from AgentConfig)
-    config = AgentConfig()
+    transcript_cache = None
+    if config.use_transcript_cache:
+        transcript_cache = TranscriptCache(agent_dir / config.transcript_cache_dir)
     
-    # Validate configuration
-    config.validate()
+    # Whisper yields segments lazily; each one is translated as soon as it is emitted.
+    # Long media is VAD-split and transcribed in a process pool (long_media_threshold_s)
+    whisper_tools = load_utils_module("whisper_tools")
+    segments = whisper_tools.iter_media_segments(
+        str(source_video), language=config.whisper_language, model=whisper_model, config=config,
+        cache=transcript_cache, audio=audio
+    )
+    return segments, transcript_cache
+
+
+def transcribe_and_translate(source_video, config, instrumentation, whisper_model=None, languages=None):
+    """
+    Transcribe the source video with Whisper and translate each segment to Chinese as it arrives
     
-    # Generate subtitles from video using Whisper
+    With several languages (multi-target mode) the transcript is translated into
+    all of them concurrently and a dict of language -> segments is returned.
+    """
     print(f"\n{'='*60}")
-    print("🎙️  WHISPER: Generating Subtitles from Audio")
+    print(f"🎙️  WHISPER → 🌐 TRANSLATION: {config.source_language} → "
+          f"{', '.join(languages) if languages else config.target_language} (streaming)")
     print(f"{'='*60}")
     print(f"🎙️  Transcribing audio with Whisper...")
-    subtitle_segments = whisper_tools.transcribe_with_timestamps(str(source_video), language="en")  # Changed to "en" since audio is English
     
-    print(f"✅ Found {len(subtitle_segments)} subtitle segments")
+    segments, transcript_cache = open_transcript(source_video, config, instrumentation, whisper_model)
+    return translate_transcript(segments, config, instrumentation, languages, transcript_cache)
+
+
+def translate_transcript(segments, config, instrumentation, languages=None, transcript_cache=None):
+    """
+    Translate transcribed segments (an iterator is consumed while it is produced)
+    
+    Returns:
+        list: Translated segments, or a dict of language -> segments with several languages
+    """
+    from utils.ollama_client import Deadline
+    from utils.subtitle_pipeline import stream_translated_segments
+    translate_tools = load_utils_module("translate_tools")
     
-    # Translate each segment to Chinese
-    print(f"\n{'='*60}")
-    print("🌐 TRANSLATION: English → Chinese")
-    print(f"{'='*60}")
+    # One deadline for the whole job caps every Ollama attempt and retry backoff.
+    # The job's config (not DEFAULT_CONFIG) picks the model, language, server and memory
+    deadline = Deadline(config.translation_deadline_s or None)
+    translate_fn = partial(translate_tools.translate_text, deadline=deadline, config=config)
+    # Batch mode packs consecutive segments into one numbered-line prompt
+    batch_translate_fn = None
+    if config.translation_mode == "batch":
+        batch_translate_fn = partial(translate_tools.translate_batch, deadline=deadline, config=config)
+    # Multi-target: every unit is translated into all languages at once ('text' becomes a dict)
+    if languages:
+        translate_fn = partial(translate_tools.translate_text_multi, languages=languages, deadline=deadline,
+                               config=config)
+        if batch_translate_fn is not None:
+            batch_translate_fn = partial(translate_tools.translate_batch_multi, languages=languages,
+                                         deadline=deadline, config=config)
     
-    for i, seg in enumerate(subtitle_segments, 1):
-        english_text = seg['text']
-        print(f"\n   Segment {i}/{len(subtitle_segments)}: {english_text}")
-        
-        # Translate to Chinese
-        chinese_text = translate_tools.translate_text(english_text)
-        seg['text'] = chinese_text  # Replace with Chinese translation
-        seg['original_text'] = english_text  # Keep original for reference
-        
-        print(f"   ✅ Translated: {chinese_text}")
+    # The Ollama client, translation memory and fallback counter live as long as the process
+    # (batch workers and the job server run many jobs); report this run's share
+    ollama_before = translate_tools.client_counters(config)
+    memory_before = translate_tools.memory_stats(config)
+    fallbacks_before = translate_tools.fallback_count()
+    
+    start_time = time.perf_counter()
+    subtitle_segments = []
+    with instrumentation.stage('transcribe_translate'):
+        for seg in stream_translated_segments(segments, translate_fn,
+                                              queue_size=config.pipeline_queue_size,
+                                              concurrency=config.translation_concurrency,
+                                              batch_translate_fn=batch_translate_fn,
+                                              batch_token_budget=config.batch_token_budget,
+                                              batch_max_segments=config.batch_max_segments,
+                                              batch_max_wait_s=config.batch_max_wait_s,
+                                              instrumentation=instrumentation):
+            subtitle_segments.append(seg)
+            if len(subtitle_segments) == 1:
+                print(f"\n   ⏱️  First translated subtitle after {time.perf_counter() - start_time:.1f}s")
+            print(f"\n   Segment {len(subtitle_segments)} [{seg['start']:.2f}s]: {seg['original_text']}")
+            if languages:
+                for language, text in seg['text'].items():
+                    print(f"   ✅ {language}: {text}")
+            else:
+                print(f"   ✅ Translated: {seg['text']}")
     
     print(f"\n{'='*60}")
-    print("✅ All segments translated to Chinese")
+    if languages:
+        print(f"✅ {len(subtitle_segments)} segments transcribed and translated to {', '.join(languages)}")
+    else:
+        print(f"✅ {len(subtitle_segments)} segments transcribed and translated to {config.target_language}")
     print(f"{'='*60}")
     for i, seg in enumerate(subtitle_segments[:3], 1):
         print(f"   {i}. [{seg['start']:.2f}s - {seg['end']:.2f}s]: {seg['text']}")
     if len(subtitle_segments) > 3:
         print(f"   ... and {len(subtitle_segments) - 3} more segments")
     
+    if transcript_cache is not None:
+        stats = transcript_cache.stats()
+        print(f"   📊 Transcript cache: {stats['hits']} hit / {stats['misses']} miss this run "
+              f"({stats['lifetime_hits']} / {stats['lifetime_misses']} overall)")
+    
+    memory_stats = translate_tools.memory_stats(config)
+    if memory_stats is not None:
+        hits, fuzzy_hits, misses = (memory_stats[key] - memory_before[key] for key in ('hits', 'fuzzy_hits', 'misses'))
+        print(f"   📊 Translation memory: {hits} hit ({fuzzy_hits} fuzzy) / "
+              f"{misses} miss, {memory_stats['entries']} entries stored")
+    
+    ollama = translate_tools.client_stats(config, since=ollama_before)
+    if ollama['requests'] or ollama['short_circuited']:
+        ttft = f"{ollama['avg_ttft_s']:.2f}s" if ollama['avg_ttft_s'] is not None else "n/a"
+        rate = f"{ollama['tokens_per_s']:.1f}" if ollama['tokens_per_s'] is not None else "n/a"
+        print(f"   📊 Ollama: {ollama['requests']} requests, {ollama['retries']} retries, "
+              f"{ollama['failures']} failed, {ollama['short_circuited']} short-circuited, "
+              f"{translate_tools.fallback_count() - fallbacks_before} fallbacks; "
+              f"TTFT {ttft}, {rate} tokens/s, breaker {ollama['breaker']}")
+    
+    if languages:
+        return {language: [dict(seg, text=seg['text'][language]) for seg in subtitle_segments]
+                for language in languages}
+    return subtitle_segments
+
+
+def language_slug(language: str) -> str:
+    """'Simplified Chinese' -> 'simplified_chinese'"""
+    return "_".join(language.lower().split())
+
+
+def render_other_languages(source_video, output_dir, config, translations, best_result, instrumentation):
+    """
+    Multi-target mode: render every language with the style tuned on the first one
+    
+    The first language's best render is copied as is; the others are rendered
+    together from one decode of the source.
+    
+    Returns:
+        dict: language -> output video path
+    """
+    from utils.multi_render import render_languages
+    
+    languages = list(translations)
+    parameters = best_result['parameters']
+    outputs_dir = output_dir / "languages"
+    paths = {language: outputs_dir / language_slug(language) / f"{source_video.stem}.mp4"
+             for language in languages}
+    
+    print(f"\n{'='*60}")
+    print(f"🌍 MULTI-TARGET RENDER: {', '.join(languages[1:])} (one decode, {len(languages) - 1} encoders)")
+    print(f"{'='*60}")
+    
+    paths[languages[0]].parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(best_result['video_path'], paths[languages[0]])
+    
+    outputs = {
+        language: {
+            'segments': translations[language],
+            'path': paths[language],
+            'font_path': config.target_language_fonts.get(language)
+        }
+        for language in languages[1:]
+    }
+    with instrumentation.stage('multi_render', languages=len(outputs)):
+        render_languages(source_video, outputs, parameters,
+                         index_dir=Path(__file__).parent / config.keyframe_index_dir)
+    
+    for language, path in paths.items():
+        print(f"   ✅ {language}: {path}")
+    return {language: str(path) for language, path in paths.items()}
+
+
+def run_pipeline(source_video: Path, target_image: Path, output_dir: Path, screenshots_dir: Path,
+                 config: AgentConfig, resume: bool = False, profile_nodes=(),
+                 ocr_analyzer=None, whisper_model=None, subtitle_segments=None) -> dict:
+    """
+    Run transcription, translation and the subtitle resolver for one video
+    
+    Args:
+        source_video: Video to subtitle
+        target_image: Reference image with the desired subtitle style
+        output_dir: Where results, logs and traces are written
+        screenshots_dir: Where probe screenshots are written
+        config: Validated agent configuration
+        resume: Continue from output_dir/checkpoint.jsonl if present
+        profile_nodes: Node/stage names to run under cProfile
+        ocr_analyzer: Preloaded OCR analyzer (created if None)
+        whisper_model: Preloaded WhisperModel (shared registry model from config if None)
+        subtitle_segments: Already translated segments (skips transcription and translation);
+                           in multi-target mode a dict of language -> segments
+    
+    Returns:
+        dict: Run summary (stop reason, iterations, best result, stage timings)
+    """
+    from core.profile_store import StyleProfileStore, style_profile_key, probe_resolution
+    from core.resolver import SubtitleResolver
+    from nodes.adjust_parameters_node import AdjustParametersNode
+    from nodes.analyze_current_node import AnalyzeCurrentNode
+    from nodes.analyze_target_node import AnalyzeTargetNode
+    from nodes.compare_node import CompareNode
+    from nodes.generate_video_node import GenerateVideoNode
+    from nodes.take_screenshot_node import TakeScreenshotNode
+    from utils.artifact_store import ArtifactStore
+    from utils.ocr_analyzer import OCRAnalyzer
+    
+    agent_dir = Path(__file__).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    screenshots_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Per-stage timing, CPU and memory measurements
+    instrumentation = Instrumentation()
+    if profile_nodes:
+        instrumentation.add_profiler(CProfileProfiler(output_dir / "profiles", list(profile_nodes)))
+    
+    # Checkpoint journal: one GraphState snapshot per completed node
+    checkpoint = CheckpointJournal(output_dir / "checkpoint.jsonl")
+    # Streaming iteration log: one compact line per iteration, OCR boxes spilled to output/ocr/
+    iteration_log = IterationLog(output_dir / "iterations.jsonl", output_dir / "ocr")
+    if not resume:
+        checkpoint.reset()
+        iteration_log.reset()
+    
+    # Multi-target mode: the style is tuned on the first language, the rest reuse it
+    languages = config.target_languages if len(config.target_languages) > 1 else None
+    translations_path = output_dir / "translations.json"
+    translations = None
+    
+    resumed = checkpoint.load_latest() if resume else None
+    if subtitle_segments is not None and resumed is None:
+        if languages:
+            translations = subtitle_segments
+            subtitle_segments = translations[languages[0]]
+        print(f"\n📝 Using {len(subtitle_segments)} provided subtitle segments")
+        checkpoint.record('translate', GraphState(subtitle_segments=subtitle_segments))
+    elif resumed is not None:
+        _, resumed_state = resumed
+        subtitle_segments = resumed_state.subtitle_segments
+        print(f"\n♻️  Restored {len(subtitle_segments or [])} translated segments from checkpoint")
+        if languages and translations_path.exists():
+            with open(translations_path, 'r', encoding='utf-8') as f:
+                translations = json.load(f)
+        elif languages:
+            # The checkpoint only holds the first language; the others come from the source text
+            if not all('original_text' in seg for seg in subtitle_segments or []):
+                raise FileNotFoundError(f"{translations_path} is missing and the checkpointed segments have "
+                                        f"no source text to translate {', '.join(languages[1:])} from")
+            print(f"\n⚠️  {translations_path.name} missing, translating {', '.join(languages[1:])} again")
+            source_segments = [dict(seg, text=seg['original_text']) for seg in subtitle_segments]
+            translations = {languages[0]: subtitle_segments,
+                            **translate_transcript(iter(source_segments), config, instrumentation, languages[1:])}
+    else:
+        if resume:
+            print("\n⚠️  No checkpoint found, starting a fresh run")
+        result = transcribe_and_translate(source_video, config, instrumentation, whisper_model, languages)
+        if languages:
+            translations = result
+            subtitle_segments = translations[languages[0]]
+        else:
+            subtitle_segments = result
+        checkpoint.record('translate', GraphState(subtitle_segments=subtitle_segments))
+    
+    if translations is not None:
+        with open(translations_path, 'w', encoding='utf-8') as f:
+            json.dump(translations, f, indent=2, ensure_ascii=False)
+    
     # Create shared utilities
-    ocr_analyzer = OCRAnalyzer()
+    if ocr_analyzer is None:
+        ocr_analyzer = OCRAnalyzer()
+    artifact_store = None
+    if config.use_artifact_cache:
+        artifact_store = ArtifactStore(agent_dir / config.artifact_cache_dir,
+                                       int(config.artifact_cache_max_gb * 1024 ** 3))
+    
+    # Tuned style profiles: a known reference style at this resolution skips the search
+    style_profiles = None
+    profile_key = None
+    if config.use_style_profiles:
+        style_profiles = StyleProfileStore(agent_dir / config.style_profile_path)
+        profile_key = style_profile_key(target_image, probe_resolution(source_video), config.font_paths[0])
     
     # Create nodes
     analyze_target = AnalyzeTargetNode(target_image, ocr_analyzer)
-    generate_video = GenerateVideoNode(source_video, output_dir, screenshots_dir)
-    take_screenshot = TakeScreenshotNode(screenshots_dir)
+    generate_video = GenerateVideoNode(
+        source_video, output_dir, screenshots_dir, artifact_store,
+        keyframe_interval=config.incremental_keyframe_interval_s if config.incremental_render else None,
+        incremental_max_fraction=config.incremental_max_fraction
+    )
+    take_screenshot = TakeScreenshotNode(screenshots_dir, artifact_store)
     analyze_current = AnalyzeCurrentNode(ocr_analyzer)
     compare = CompareNode(config)
     adjust_parameters = AdjustParametersNode(config)
@@ -124,9 +363,17 @@ def main():
         compare=compare,
         adjust_parameters=adjust_parameters,
         output_dir=output_dir,
-        subtitle_segments=subtitle_segments  # Pass Whisper segments
+        subtitle_segments=subtitle_segments,  # Pass Whisper segments
+        checkpoint=checkpoint,
+        instrumentation=instrumentation,
+        iteration_log=iteration_log,
+        style_profiles=style_profiles,
+        style_profile_key=profile_key
     )
     
+    if resumed is not None:
+        resolver.restore()
+    
     # Execute graph
     final_state = resolver.resolve()
     
@@ -136,8 +383,260 @@ def main():
     # Print summary
     resolver.print_summary()
     
+    language_outputs = None
+    if translations is not None and final_state.best_result:
+        language_outputs = render_other_languages(source_video, output_dir, config, translations,
+                                                  final_state.best_result, instrumentation)
+    
+    # Export timings
+    instrumentation.print_summary()
+    instrumentation.export_summary(output_dir / "stage_summary.json")
+    instrumentation.export_chrome_trace(output_dir / "trace.json")
+    
+    return {
+        'stop_reason': final_state.stop_reason,
+        'total_iterations': final_state.iteration,
+        'best_result': final_state.best_result,
+        'output_dir': str(output_dir),
+        'language_outputs': language_outputs,
+        'stages': instrumentation.summary()
+    }
+
+
+def load_config(overrides):
+    """Validated configuration for a subcommand run (defaults plus --set overrides)"""
+    from dataclasses import replace
+
+    config = replace(AgentConfig(), **overrides)
+    config.validate()
+    return config
+
+
+def write_json(data, path):
+    """Write data to a JSON file, or print it when path is None"""
+    text = json.dumps(convert_to_native(data), indent=2, ensure_ascii=False)
+    if path is None:
+        print(text)
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"💾 Saved: {path}")
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_parameters(path):
+    """Subtitle style from iteration_results.json, a run summary or a plain parameters file"""
+    data = load_json(path)
+    if 'best_result' in data:
+        data = data['best_result'] or {}
+    return dict(data.get('parameters', data))
+
+
+def command_transcribe(args, config):
+    """Whisper only: write the source-language segments"""
+    print(f"🎙️  Transcribing {args.video} with Whisper...")
+    segments, _ = open_transcript(Path(args.video), config, Instrumentation())
+    segments = [dict(seg) for seg in segments]
+    print(f"✅ {len(segments)} segments transcribed")
+    write_json(segments, args.output)
+    return 0
+
+
+def command_translate(args, config):
+    """Translation only: segments JSON (from transcribe) -> translated segments JSON"""
+    segments = load_json(args.segments)
+    # Translated segments can be translated again from their source text
+    segments = [dict(seg, text=seg.get('original_text', seg['text'])) for seg in segments]
+    languages = args.language or None
+    if languages and len(languages) == 1:
+        config.target_language = languages[0]
+        languages = None
+    translated = translate_transcript(iter(segments), config, Instrumentation(), languages)
+    write_json(translated, args.output)
+    return 0
+
+
+def command_analyze_target(args, config):
+    """OCR only: print the reference image's subtitle metrics"""
+    from nodes.analyze_target_node import AnalyzeTargetNode
+    from utils.ocr_analyzer import OCRAnalyzer
+
+    state = AnalyzeTargetNode(Path(args.image), OCRAnalyzer()).execute(GraphState())
+    if state.target_metrics is None:
+        return 1
+    write_json({'target_metrics': state.target_metrics, 'test_subtitle': state.test_subtitle}, args.output)
+    return 0
+
+
+def command_tune(args, config):
+    """The full resolver loop, optionally on already translated segments"""
+    output_dir = Path(args.output_dir)
+    subtitle_segments = load_json(args.segments) if args.segments else None
+    summary = run_pipeline(Path(args.video), Path(args.target), output_dir, output_dir / "screenshots",
+                           config, resume=args.resume, profile_nodes=args.profile_node,
+                           subtitle_segments=subtitle_segments)
+    return 0 if summary['best_result'] else 1
+
+
+def command_render(args, config):
+    """Render translated segments with a given style (no OCR, no tuning)"""
+    from nodes.generate_video_node import GenerateVideoNode
+    from utils.artifact_store import ArtifactStore
+
+    parameters = load_parameters(args.parameters) if args.parameters else {}
+    for key, value in (('font_size', args.font_size), ('stroke_width', args.stroke_width),
+                       ('position_pct', args.position)):
+        if value is not None:
+            parameters[key] = value
+    parameters.setdefault('stroke_width', 2)
+    parameters.setdefault('font_path', config.font_paths[0])
+    missing = [key for key in ('font_size', 'position_pct') if key not in parameters]
+    if missing:
+        print(f"❌ Missing style parameters: {', '.join(missing)} (use --parameters or the flags)")
+        return 1
+
+    source_video = Path(args.video)
+    output_path = Path(args.output or f"{source_video.stem}_subtitled.mp4")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Same render cache as tune: a fixed-up transcript re-encodes only the changed spans
+    artifact_store = None
+    if config.use_artifact_cache:
+        artifact_store = ArtifactStore(Path(__file__).parent / config.artifact_cache_dir,
+                                       int(config.artifact_cache_max_gb * 1024 ** 3))
+    state = GraphState(subtitle_segments=load_json(args.segments), parameters=parameters)
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        node = GenerateVideoNode(
+            source_video, scratch, scratch, artifact_store,
+            keyframe_interval=config.incremental_keyframe_interval_s if config.incremental_render else None,
+            incremental_max_fraction=config.incremental_max_fraction
+        )
+        state = node.execute(state)
+        if artifact_store is not None:
+            # The stored render stays in the cache for the next re-render
+            shutil.copyfile(state.video_path, output_path)
+        else:
+            shutil.move(str(state.video_path), output_path)
+    print(f"✅ Rendered: {output_path}")
+    return 0
+
+
+def run_default(args):
+    """No subcommand: the full pipeline on the sample files next to this script"""
+    print("="*60)
+    print("🤖 AI AGENT: Graph-Based Subtitle Improvement")
+    print("="*60)
+
+    # Paths
+    agent_dir = Path(__file__).parent
+    target_image = agent_dir / "chinese_sample.jpg"
+    source_video = agent_dir / "10_second.mp4"
+    output_dir = agent_dir / "output"
+    screenshots_dir = agent_dir / "screenshots"
+
+    # Check files exist
+    if not target_image.exists():
+        print(f"❌ Target image not found: {target_image}")
+        print("   Please copy chinese_sample.jpg to agent folder!")
+        return 1
+
+    if not source_video.exists():
+        print(f"❌ Source video not found: {source_video}")
+        print("   Please copy 10_second.mp4 to agent folder!")
+        return 1
+
+    # Load configuration from config.py (uses defaults from AgentConfig)
+    config = AgentConfig()
+
+    # Validate configuration
+    config.validate()
+
+    run_pipeline(source_video, target_image, output_dir, screenshots_dir, config,
+                 resume=args.resume, profile_nodes=args.profile_node)
+
     print("✅ Agent execution complete!")
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Graph-based Chinese subtitle improvement agent")
+
+    def add_run_options(p, default_resume, default_profile):
+        p.add_argument('--resume', action='store_true', default=default_resume,
+                       help="Resume from output/checkpoint.jsonl, skipping transcription, "
+                            "translation and target analysis when they already completed")
+        p.add_argument('--profile-node', action='append', default=default_profile, metavar='NAME',
+                       help="Run cProfile for a node or stage (e.g. generate_video, whisper); "
+                            "writes output/profiles/NAME_N.prof. Repeatable")
+
+    add_run_options(parser, False, [])
+    sub = parser.add_subparsers(dest='command', metavar='COMMAND',
+                                help="Run one stage (default: the full pipeline on the sample files)")
+
+    def add_command(name, handler, help_text):
+        p = sub.add_parser(name, help=help_text, description=help_text)
+        p.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                       help="AgentConfig override, e.g. whisper_model=small")
+        p.set_defaults(handler=handler)
+        return p
+
+    p = add_command('transcribe', command_transcribe, "Transcribe a video with Whisper")
+    p.add_argument('video')
+    p.add_argument('-o', '--output', help="Segments JSON (printed if omitted)")
+
+    p = add_command('translate', command_translate, "Translate transcribed segments")
+    p.add_argument('segments', help="Segments JSON from 'transcribe'")
+    p.add_argument('-o', '--output', help="Translated segments JSON (printed if omitted)")
+    p.add_argument('--language', action='append', metavar='LANGUAGE',
+                   help="Target language (default: config target_language); repeat for several, "
+                        "which writes a dict of language -> segments")
+
+    p = add_command('analyze-target', command_analyze_target, "Measure the subtitle style of a reference image")
+    p.add_argument('image')
+    p.add_argument('-o', '--output', help="Metrics JSON (printed if omitted)")
+
+    p = add_command('tune', command_tune, "Tune the subtitle style against a reference image")
+    p.add_argument('video')
+    p.add_argument('target', help="Reference image with the desired subtitle style")
+    p.add_argument('--segments', help="Translated segments JSON (transcribes and translates if omitted)")
+    p.add_argument('--output-dir', default='output')
+    # SUPPRESS: given before or after 'tune', the top-level value is kept unless repeated here
+    add_run_options(p, argparse.SUPPRESS, argparse.SUPPRESS)
+
+    p = add_command('render', command_render, "Render translated segments with a fixed style")
+    p.add_argument('video')
+    p.add_argument('segments', help="Translated segments JSON")
+    p.add_argument('--parameters', help="iteration_results.json from 'tune', or a parameters JSON")
+    p.add_argument('--font-size', type=int)
+    p.add_argument('--stroke-width', type=int)
+    p.add_argument('--position', type=float, help="Vertical position as a fraction of the height")
+    p.add_argument('-o', '--output', help="Output video (default: VIDEO_subtitled.mp4)")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution"""
+    args = parse_args(argv)
+    if args.command is None:
+        return run_default(args)
+
+    from job_client import parse_overrides
+
+    try:
+        config = load_config(parse_overrides(args.set))
+    except (TypeError, ValueError) as e:
+        print(f"❌ Invalid configuration: {e}")
+        return 2
+    return args.handler(args, config)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
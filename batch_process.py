@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Batch Processing: Subtitle Many Videos on a Worker Pool
+=======================================================
+Runs the subtitle agent over a manifest or a directory of videos. Jobs are
+spread over worker processes; each worker loads EasyOCR and Whisper once and
+reuses them for every job it runs. Failed jobs are recorded and the batch
+continues; a worker process that dies (e.g. killed for memory) fails only the
+job it was running, and the unfinished jobs run again on a fresh pool.
+
+Usage:
+    python batch_process.py --dir videos/ --target chinese_sample.jpg --workers 4
+    python batch_process.py --manifest jobs.jsonl --workers 2 --set max_iterations=3
+    python batch_process.py --manifest jobs.jsonl --skip-done     # rerun only unfinished jobs
+
+Distributed mode (several render hosts share one queue):
+    python batch_process.py --queue /shared/queue.db --publish --manifest jobs.jsonl
+    python batch_process.py --queue /shared/queue.db --worker --workers 2      # on every host
+    python batch_process.py --queue /shared/queue.db --queue-status
+
+    Workers lease one job at a time and heartbeat while it runs. A job whose
+    worker stops heartbeating is leased again after --lease-s; only the
+    current lease holder can publish its result, so no job is recorded twice.
+    Video, reference and output paths must be visible to every host.
+
+Manifest formats:
+    .jsonl  {"video": "a.mp4", "target": "ref.jpg", "id": "a", "config": {"max_iterations": 2}}
+    .csv    columns video,target[,id]
+
+One status line per finished job (status, timing, score, error) is appended
+to <output-root>/batch_status.jsonl; each job writes to <output-root>/<id>/.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace, fields
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import AgentConfig
+from core.state import convert_to_native
+from job_client import parse_overrides
+from utils.job_queue import open_queue
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.avi', '.webm', '.m4v')
+
+# Per-process warm state, filled by _init_worker
+_WORKER = {}
+
+
+def load_manifest(path: Path) -> List[Dict[str, Any]]:
+    """Read jobs from a .jsonl/.json or .csv manifest (relative paths resolve against it)"""
+    base = path.parent
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            jobs = [dict(row) for row in csv.DictReader(f)]
+    elif path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            jobs = [json.loads(line) for line in f if line.strip()]
+
+    for job in jobs:
+        for key in ('video', 'target'):
+            if not job.get(key):
+                raise ValueError(f"Manifest entry missing '{key}': {job}")
+            if not Path(job[key]).is_absolute():
+                job[key] = str(base / job[key])
+    return jobs
+
+
+def scan_directory(directory: Path, target: Path) -> List[Dict[str, Any]]:
+    """One job per video file in a directory, all using the same reference image"""
+    videos = sorted(p for p in directory.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+    return [{'video': str(video), 'target': str(target)} for video in videos]
+
+
+def assign_ids(jobs: List[Dict[str, Any]]):
+    """Give every job a unique id (manifest id, else the video name)"""
+    seen = set()
+    for job in jobs:
+        base_id = str(job.get('id') or Path(job['video']).stem)
+        job_id = base_id
+        n = 2
+        while job_id in seen:
+            job_id = f"{base_id}_{n}"
+            n += 1
+        job['id'] = job_id
+        seen.add(job_id)
+
+
+def finished_ids(status_path: Path) -> set:
+    """Ids whose latest status line is 'done'"""
+    latest = {}
+    if status_path.exists():
+        with open(status_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                latest[record['id']] = record['status']
+    return {job_id for job_id, status in latest.items() if status == 'done'}
+
+
+def _init_worker(whisper_config: AgentConfig):
+    """Load the pipeline, EasyOCR and the Whisper model once per worker process"""
+    import auto_improve_subtitles as pipeline
+    from utils.ocr_analyzer import OCRAnalyzer
+
+    start = time.perf_counter()
+    _WORKER['pipeline'] = pipeline
+    _WORKER['ocr_analyzer'] = OCRAnalyzer()
+    # Registry model: jobs with the same Whisper settings reuse it
+    pipeline.whisper_tools.load_model(whisper_config)
+    print(f"🔥 Worker {os.getpid()} warm in {time.perf_counter() - start:.1f}s")
+
+
+def _run_job(job: Dict[str, Any], base_config: AgentConfig, output_root: str,
+             attempt: Optional[str] = None) -> Dict[str, Any]:
+    """Run one job inside a worker and return its status record (attempt: separate output subfolder)"""
+    record = {
+        'id': job['id'],
+        'video': job['video'],
+        'target': job['target'],
+        'worker': os.getpid(),
+        'started_at': time.time()
+    }
+    try:
+        config = replace(base_config, **(job.get('config') or {}))
+        config.validate()
+    except (TypeError, ValueError) as e:
+        # A bad config fails the same way on every attempt
+        record.update({'status': 'failed', 'error': f"invalid config: {e}", 'retryable': False,
+                       'finished_at': time.time(), 'duration_s': 0.0})
+        return convert_to_native(record)
+    # Translation runs with these settings (the job's config, not DEFAULT_CONFIG)
+    record.update({'target_language': config.target_language, 'translation_model': config.translation_model})
+    try:
+        job_dir = Path(output_root) / job['id']
+        if attempt:
+            job_dir = job_dir / attempt
+        result = _WORKER['pipeline'].run_pipeline(
+            Path(job['video']), Path(job['target']),
+            job_dir / "output", job_dir / "screenshots", config,
+            ocr_analyzer=_WORKER['ocr_analyzer']
+        )
+        best = result.get('best_result') or {}
+        record.update({
+            'status': 'done',
+            'stop_reason': result['stop_reason'],
+            'iterations': result['total_iterations'],
+            'best_score': (best.get('comparison') or {}).get('overall_score'),
+            'best_parameters': best.get('parameters'),
+            'output_dir': result['output_dir']
+        })
+    except Exception as e:
+        traceback.print_exc()
+        record.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    record['finished_at'] = time.time()
+    record['duration_s'] = record['finished_at'] - record['started_at']
+    return convert_to_native(record)
+
+
+def _run_marked_job(job: Dict[str, Any], base_config: AgentConfig, output_root: str,
+                    running_dir: str) -> Dict[str, Any]:
+    """_run_job that leaves running_dir/<id> behind if its worker process dies mid-job"""
+    marker = Path(running_dir) / job['id']
+    marker.touch()
+    try:
+        return _run_job(job, base_config, output_root)
+    finally:
+        marker.unlink(missing_ok=True)
+
+
+def _crash_record(job: Dict[str, Any], error: str) -> Dict[str, Any]:
+    return {'id': job['id'], 'video': job['video'], 'target': job['target'],
+            'status': 'failed', 'error': f"worker crashed: {error}"}
+
+
+def _run_pool(jobs: List[Dict[str, Any]], workers: int, base_config: AgentConfig, output_root: Path,
+              report) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Run jobs on a fresh worker pool until they finish or a worker process dies
+    
+    A dead worker (e.g. killed for memory) breaks the whole pool, failing every
+    pending future; those jobs are handed back instead of being recorded.
+    
+    Args:
+        jobs: Jobs to run
+        workers: Pool size
+        base_config: Config the job overrides apply to
+        output_root: Batch output folder
+        report: Called with the status record of every finished job
+    
+    Returns:
+        (not_started, suspects): Unfinished jobs that had not started, and
+                                 those that were running when the pool broke
+    """
+    running_dir = output_root / ".running"
+    shutil.rmtree(running_dir, ignore_errors=True)
+    running_dir.mkdir(parents=True)
+    
+    finished = set()
+    broken = None
+    # spawn: CTranslate2/EasyOCR threads do not survive fork
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(base_config,)) as pool:
+        futures = {pool.submit(_run_marked_job, job, base_config, str(output_root), str(running_dir)): job
+                   for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                record = future.result()
+            except BrokenProcessPool as e:
+                broken = e
+                continue
+            except Exception as e:
+                record = _crash_record(job, f"{type(e).__name__}: {e}")
+            finished.add(job['id'])
+            report(record)
+    
+    unfinished = [job for job in jobs if job['id'] not in finished]
+    if broken is None:
+        return [], []
+    started = {path.name for path in running_dir.iterdir()}
+    shutil.rmtree(running_dir, ignore_errors=True)
+    suspects = [job for job in unfinished if job['id'] in started]
+    not_started = [job for job in unfinished if job['id'] not in started]
+    if not suspects and len(not_started) == len(jobs):
+        # Died before running anything (e.g. while loading models): retrying would loop
+        for job in not_started:
+            report(_crash_record(job, f"pool broke before any job ran ({broken})"))
+        return [], []
+    print(f"💥 A worker process died with {len(suspects)} job(s) running; "
+          f"restarting the pool for {len(not_started)} unstarted job(s)")
+    return not_started, suspects
+
+
+def append_status(status_path: Path, record: Dict[str, Any]):
+    with open(status_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _heartbeat(job_queue, lease, lease_s: float, stop: threading.Event):
+    """Renew a lease until stop is set"""
+    while not stop.wait(lease_s / 3):
+        if not job_queue.heartbeat(lease, lease_s):
+            print(f"⚠️  Lost the lease on {lease.job_id}; its result will not be published")
+            return
+
+
+def queue_worker(queue_url: str, output_root: str, lease_s: float, poll_s: float, exit_when_empty: bool):
+    """Lease and run jobs from a shared queue until it is drained (or forever)"""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    job_queue = open_queue(queue_url)
+    _init_worker(AgentConfig())
+    Path(output_root).mkdir(parents=True, exist_ok=True)
+    status_path = Path(output_root) / "batch_status.jsonl"
+    
+    while True:
+        lease = job_queue.lease(worker, lease_s)
+        if lease is None:
+            stats = job_queue.stats()
+            if exit_when_empty and stats['queued'] == 0 and stats['leased'] == 0:
+                break
+            time.sleep(poll_s)
+            continue
+        
+        print(f"📥 {worker} leased {lease.job_id} (attempt {lease.attempt})")
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(job_queue, lease, lease_s, stop), daemon=True)
+        beat.start()
+        try:
+            # Jobs carry their full config; each attempt writes to its own folder
+            record = _run_job(lease.job, AgentConfig(), output_root, attempt=f"attempt_{lease.attempt}")
+        finally:
+            stop.set()
+            beat.join()
+        
+        record['attempt'] = lease.attempt
+        if record['status'] == 'done':
+            published = job_queue.complete(lease, record)
+        else:
+            published = job_queue.fail(lease, record.get('error', 'failed'), retry=record.get('retryable', True))
+        if not published:
+            print(f"⚠️  {lease.job_id}: lease lost, result discarded")
+            continue
+        append_status(status_path, record)
+        icon = "✅" if record['status'] == 'done' else "❌"
+        print(f"{icon} {lease.job_id} {record['status']} in {record['duration_s']:.1f}s")
+    
+    job_queue.close()
+
+
+def run_queue_workers(args):
+    """Start --workers processes on this host, each leasing from the queue"""
+    output_root = Path(args.output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    print(f"👷 {args.workers} queue workers on {socket.gethostname()} → {args.queue}")
+    
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=queue_worker, name=f"queue-worker-{i}",
+                                 args=(args.queue, str(output_root), args.lease_s, args.poll_s,
+                                       args.exit_when_empty))
+                 for i in range(max(1, args.workers))]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    print_queue_status(args.queue)
+
+
+def print_queue_status(queue_url: str):
+    job_queue = open_queue(queue_url)
+    stats = job_queue.stats()
+    print(f"📊 Queue: {stats['queued']} queued, {stats['leased']} running, "
+          f"{stats['done']} done, {stats['failed']} failed")
+    for job in job_queue.jobs('failed'):
+        print(f"   ❌ {job['id']} after {job['attempts']} attempts: {job['error']}")
+    job_queue.close()
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run the subtitle agent over many videos")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--manifest', help="Jobs file (.jsonl, .json or .csv)")
+    source.add_argument('--dir', help="Directory of videos (uses --target for all)")
+    parser.add_argument('--target', default=str(Path(__file__).parent / "chinese_sample.jpg"),
+                        help="Reference image for --dir")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 4),
+                        help="Worker processes (each holds its own OCR and Whisper models)")
+    parser.add_argument('--output-root', default=str(Path(__file__).parent / "output" / "batch"))
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Config override for every job (repeatable)")
+    parser.add_argument('--skip-done', action='store_true',
+                        help="Skip jobs already marked done in batch_status.jsonl")
+    
+    distributed = parser.add_argument_group("distributed mode")
+    distributed.add_argument('--queue', help="Job queue URL (sqlite:///path/queue.db or a path)")
+    mode = distributed.add_mutually_exclusive_group()
+    mode.add_argument('--publish', action='store_true', help="Publish --manifest/--dir jobs to --queue")
+    mode.add_argument('--worker', action='store_true', help="Run --workers processes leasing from --queue")
+    mode.add_argument('--queue-status', action='store_true', help="Show queue counts and failures")
+    distributed.add_argument('--lease-s', type=float, default=300.0,
+                             help="Lease length; workers heartbeat every third of it")
+    distributed.add_argument('--poll-s', type=float, default=5.0, help="Idle worker polling interval")
+    distributed.add_argument('--max-attempts', type=int, default=3, help="Attempts per published job")
+    distributed.add_argument('--exit-when-empty', action='store_true',
+                             help="Workers stop once nothing is queued or running")
+    
+    args = parser.parse_args()
+    if (args.publish or args.worker or args.queue_status) and not args.queue:
+        parser.error("--publish, --worker and --queue-status need --queue")
+    if not (args.worker or args.queue_status) and not (args.manifest or args.dir):
+        parser.error("one of --manifest or --dir is required")
+    return args
+
+
+def publish_jobs(args, jobs: List[Dict[str, Any]], overrides: Dict[str, Any]):
+    """Publish jobs with absolute paths and their full config overrides"""
+    for job in jobs:
+        job['video'] = str(Path(job['video']).resolve())
+        job['target'] = str(Path(job['target']).resolve())
+        job['config'] = {**overrides, **(job.get('config') or {})}
+    job_queue = open_queue(args.queue)
+    added = job_queue.publish(jobs, max_attempts=args.max_attempts)
+    print(f"📤 Published {added} jobs to {args.queue} ({len(jobs) - added} already queued)")
+    job_queue.close()
+
+
+def main():
+    """Schedule the batch"""
+    args = parse_args()
+    
+    if args.queue_status:
+        print_queue_status(args.queue)
+        return
+    if args.worker:
+        run_queue_workers(args)
+        return
+
+    overrides = parse_overrides(args.set)
+    unknown = set(overrides) - {f.name for f in fields(AgentConfig)}
+    if unknown:
+        print(f"❌ Unknown config fields: {sorted(unknown)}")
+        return
+    base_config = replace(AgentConfig(), **overrides)
+    base_config.validate()
+
+    if args.manifest:
+        jobs = load_manifest(Path(args.manifest))
+    else:
+        jobs = scan_directory(Path(args.dir), Path(args.target))
+    assign_ids(jobs)
+    
+    if args.publish:
+        publish_jobs(args, jobs, overrides)
+        return
+
+    output_root = Path(args.output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    status_path = output_root / "batch_status.jsonl"
+
+    if args.skip_done:
+        done = finished_ids(status_path)
+        jobs = [job for job in jobs if job['id'] not in done]
+        print(f"⏭️  Skipping {len(done)} finished jobs")
+
+    missing = [job for job in jobs if not (Path(job['video']).exists() and Path(job['target']).exists())]
+    for job in missing:
+        record = {'id': job['id'], 'video': job['video'], 'target': job['target'],
+                  'status': 'failed', 'error': 'video or target not found', 'duration_s': 0.0}
+        append_status(status_path, record)
+        print(f"❌ {job['id']}: video or target not found")
+    jobs = [job for job in jobs if job not in missing]
+
+    if not jobs:
+        print("Nothing to do")
+        return
+
+    workers = max(1, min(args.workers, len(jobs)))
+    print("=" * 60)
+    print(f"📦 BATCH: {len(jobs)} jobs on {workers} workers → {output_root}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    counts = {'done': 0, 'failed': len(missing)}
+
+    def report(record):
+        append_status(status_path, record)
+        counts[record['status']] += 1
+        finished = counts['done'] + counts['failed'] - len(missing)
+        icon = "✅" if record['status'] == 'done' else "❌"
+        print(f"{icon} [{finished}/{len(jobs)}] {record['id']} {record['status']} "
+              f"in {record.get('duration_s', 0):.1f}s" +
+              (f" ({record['error']})" if record.get('error') else ""))
+
+    # A dead worker only fails its own job: the rest run again on a fresh pool
+    pending = jobs
+    while pending:
+        pending, suspects = _run_pool(pending, workers, base_config, output_root, report)
+        if len(suspects) == 1:
+            report(_crash_record(suspects[0], "process died while running this job"))
+            continue
+        # Several jobs were running when a worker died: rerun them alone until the crashing one is found
+        for i, job in enumerate(suspects):
+            print(f"🔎 Re-running {job['id']} alone")
+            _, crashed = _run_pool([job], 1, base_config, output_root, report)
+            if crashed:
+                report(_crash_record(job, "process died while running this job"))
+                pending = pending + suspects[i + 1:]
+                break
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{'='*60}")
+    print(f"✅ {counts['done']} done, ❌ {counts['failed']} failed in {elapsed / 60:.1f} min "
+          f"({counts['done'] / elapsed * 3600:.1f} videos/hour)")
+    print(f"📄 Status: {status_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end subtitle resolver on synthetic media
+==========================================================
+Generates synthetic source videos and reference images locally (varying
+resolution, duration and segment density), runs the full resolver with
+stubbed transcription/translation, and reports per-stage throughput:
+
+- frames/sec rendered by GenerateVideoNode (subtitle images + encode)
+- create_subtitle_image ms/segment
+- OCR ms/frame (OCRAnalyzer on screenshots and the reference image)
+- resolver iterations/minute
+
+Results are written to benchmarks/results/<commit>.json so runs can be
+compared across commits with --compare.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --scenario small --iterations 2
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace, asdict
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+
+from config import AgentConfig
+from utils.subtitle_renderer import create_subtitle_image
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Common CJK fonts on Windows, macOS and Linux
+CJK_FONTS = [
+    "C:/Windows/Fonts/msyhbd.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+]
+
+PHRASES = ["我们处理大量敏感信息", "不允许在办公桌旁使用手机", "这在指导原则中",
+           "我们不想危及客户账户", "请在周五之前提交报告", "欢迎参加新员工培训"]
+
+
+@dataclass
+class Scenario:
+    """One synthetic workload"""
+    name: str
+    width: int
+    height: int
+    duration: float
+    segments_per_min: int
+    fps: int = 24
+
+
+SCENARIOS = [
+    Scenario("small", 640, 360, 5.0, 12),
+    Scenario("hd", 1280, 720, 10.0, 20),
+    Scenario("hd_dense", 1280, 720, 10.0, 60),
+    Scenario("full_hd", 1920, 1080, 10.0, 20),
+]
+
+
+def find_font(preferred=None):
+    for path in [preferred] + AgentConfig().font_paths + CJK_FONTS:
+        if path and Path(path).exists():
+            return path
+    return None
+
+
+def background_frame(scenario: Scenario, t: float) -> np.ndarray:
+    """Moving gradient so the encoder has real work to do"""
+    x = np.linspace(0, 1, scenario.width, dtype=np.float32)
+    y = np.linspace(0, 1, scenario.height, dtype=np.float32)[:, None]
+    phase = t / max(scenario.duration, 1e-6)
+    r = (np.sin(2 * np.pi * (x + phase)) * 0.5 + 0.5) * 120 + 30
+    g = (y * 0.5 + 0.25) * 140 + 20 + np.zeros_like(x)
+    b = (np.cos(2 * np.pi * (x * y + phase)) * 0.5 + 0.5) * 100 + 40
+    return np.dstack([r + 0 * y, g, b]).astype(np.uint8)
+
+
+def make_source_video(scenario: Scenario, path: Path):
+    from moviepy import VideoClip
+
+    clip = VideoClip(lambda t: background_frame(scenario, t), duration=scenario.duration)
+    clip.write_videofile(str(path), fps=scenario.fps, codec='libx264', audio=False, logger=None)
+    clip.close()
+
+
+def make_segments(scenario: Scenario):
+    """Evenly spaced translated segments at the scenario's density"""
+    count = max(1, round(scenario.duration / 60 * scenario.segments_per_min))
+    span = scenario.duration / count
+    return [{
+        'start': round(i * span, 3),
+        'end': round((i + 1) * span - 0.05, 3),
+        'text': PHRASES[i % len(PHRASES)],
+        'original_text': f"synthetic segment {i + 1}"
+    } for i in range(count)]
+
+
+def make_reference_image(scenario: Scenario, path: Path, font_path: str,
+                         font_size: int = 36, stroke_width: int = 2, position_pct: float = 0.65):
+    """Frame with a subtitle in the target style"""
+    frame = Image.fromarray(background_frame(scenario, scenario.duration / 2))
+    subtitle = create_subtitle_image(PHRASES[0], scenario.width, 100, font_size, stroke_width, font_path)
+    frame.paste(subtitle, (0, int(scenario.height * position_pct)), subtitle)
+    frame.save(path, quality=95)
+
+
+def stage_row(stages, name):
+    for row in stages:
+        if row['name'] == name:
+            return row
+    return {'count': 0, 'total_wall_s': 0.0}
+
+
+def run_scenario(scenario: Scenario, workdir: Path, config: AgentConfig, ocr_analyzer):
+    import auto_improve_subtitles as pipeline
+
+    scenario_dir = workdir / scenario.name
+    scenario_dir.mkdir(parents=True, exist_ok=True)
+    source_video = scenario_dir / "source.mp4"
+    target_image = scenario_dir / "target.jpg"
+    segments = make_segments(scenario)
+
+    start = time.perf_counter()
+    make_source_video(scenario, source_video)
+    make_reference_image(scenario, target_image, config.font_paths[0])
+    setup_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = pipeline.run_pipeline(source_video, target_image, scenario_dir / "output",
+                                   scenario_dir / "screenshots", config,
+                                   ocr_analyzer=ocr_analyzer, subtitle_segments=segments)
+    wall_s = time.perf_counter() - start
+
+    stages = result['stages']
+    iterations = result['total_iterations']
+    generate = stage_row(stages, 'generate_video')
+    render = stage_row(stages, 'render_subtitles')
+    encode = stage_row(stages, 'encode_video')
+    ocr = stage_row(stages, 'ocr')
+    frames = iterations * int(scenario.duration * scenario.fps)
+
+    return {
+        'scenario': asdict(scenario),
+        'segments': len(segments),
+        'iterations': iterations,
+        'setup_s': setup_s,
+        'wall_s': wall_s,
+        'frames_rendered': frames,
+        'render_fps': frames / generate['total_wall_s'] if generate['total_wall_s'] else None,
+        'encode_fps': frames / encode['total_wall_s'] if encode['total_wall_s'] else None,
+        'subtitle_image_ms': (render['total_wall_s'] / (len(segments) * render['count']) * 1000
+                              if render['count'] else None),
+        'ocr_ms_per_frame': ocr['total_wall_s'] / ocr['count'] * 1000 if ocr['count'] else None,
+        'iterations_per_min': iterations / wall_s * 60 if wall_s else None,
+        'stages': stages
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=AGENT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def print_report(results, baseline=None):
+    base = {r['scenario']['name']: r for r in (baseline or {}).get('results', [])}
+    print(f"\n{'scenario':<10} {'res':>10} {'segs':>5} {'iters':>5} {'render fps':>11} "
+          f"{'sub ms':>7} {'ocr ms/frame':>13} {'iters/min':>10}")
+    for r in results:
+        s = r['scenario']
+        print(f"{s['name']:<10} {s['width']:>5}x{s['height']:<4} {r['segments']:>5} {r['iterations']:>5} "
+              f"{fmt(r['render_fps'], '>11.1f')} {fmt(r['subtitle_image_ms'], '>7.2f')} "
+              f"{fmt(r['ocr_ms_per_frame'], '>13.1f')} {fmt(r['iterations_per_min'], '>10.2f')}")
+        old = base.get(s['name'])
+        if old:
+            deltas = []
+            for key, label in (('render_fps', 'render fps'), ('ocr_ms_per_frame', 'ocr ms'),
+                               ('iterations_per_min', 'iters/min')):
+                if r[key] and old.get(key):
+                    deltas.append(f"{label} {(r[key] / old[key] - 1) * 100:+.1f}%")
+            print(f"{'':<10} vs {baseline['commit']}: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end resolver benchmark on synthetic media")
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help="Run only these scenarios (repeatable)")
+    parser.add_argument('--iterations', type=int, default=3, help="Resolver iterations per scenario")
+    parser.add_argument('--font', help="CJK font file (auto-detected if omitted)")
+    parser.add_argument('--workdir', help="Keep generated media here instead of a temp dir")
+    parser.add_argument('--output', help="Results JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    font = find_font(args.font)
+    if font is None:
+        print("❌ No CJK font found, pass one with --font")
+        return
+
+    # Stubbed transcription/translation, fresh renders and a fixed iteration budget
+    config = replace(AgentConfig(), max_iterations=args.iterations, similarity=100.0,
+                     font_paths=[font], use_artifact_cache=False)
+    config.validate()
+
+    from utils.ocr_analyzer import OCRAnalyzer
+    start = time.perf_counter()
+    ocr_analyzer = OCRAnalyzer()
+    ocr_load_s = time.perf_counter() - start
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        workdir = Path(args.workdir) if args.workdir else Path(tmp)
+        results = []
+        for scenario in scenarios:
+            print(f"\n🏁 Scenario {scenario.name}: {scenario.width}x{scenario.height}, "
+                  f"{scenario.duration:.0f}s, {scenario.segments_per_min} segments/min")
+            results.append(run_scenario(scenario, workdir, config, ocr_analyzer))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'font': font,
+        'iterations': args.iterations,
+        'ocr_load_s': ocr_load_s,
+        'results': results
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local sentence segmenter vs. the LLM split call
+==========================================================
+Times utils.sentence_segmenter.split_sentences on our transcripts and, with
+--llm, compares its boundaries against translate_tools._split_text_into_sentences.
+
+Transcripts are read from cache/transcripts/*.json (written by the transcript
+cache) and from any .txt files passed with --text; a built-in sample is used
+when neither is available.
+
+Usage:
+    python benchmarks/bench_sentence_segmenter.py
+    python benchmarks/bench_sentence_segmenter.py --llm            # needs Ollama
+    python benchmarks/bench_sentence_segmenter.py --text talk.txt --reference talk_sentences.txt
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+
+from config import DEFAULT_CONFIG
+from utils.sentence_segmenter import split_sentences, join_segments
+
+SAMPLE_TRANSCRIPT = (
+    "Welcome to the onboarding session. Dr. Lee from the U.S. office will cover security, e.g. "
+    "passwords and badges. We deal with a lot of sensitive information, so cell phones are not "
+    "permitted at your desk. It's in the guidelines. Revenue grew 3.5 percent last quarter... "
+    "and that is good news! Questions? Send them to help.example.com before 5 p.m. on Friday. "
+    "As our CEO said, \"Protect the client first.\" Thank you."
+)
+
+
+def load_transcripts(text_files):
+    """Return [(name, text, whisper_boundaries)]"""
+    transcripts = []
+    for path in sorted((AGENT_DIR / DEFAULT_CONFIG.transcript_cache_dir).glob("*.json")):
+        if path.name == "stats.json":
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            segments = json.load(f).get('segments', [])
+        if segments:
+            text, boundaries = join_segments(segments)
+            transcripts.append((path.stem[:12], text, boundaries))
+    for path in text_files:
+        transcripts.append((Path(path).name, Path(path).read_text(encoding='utf-8'), None))
+    if not transcripts:
+        transcripts.append(("sample", SAMPLE_TRANSCRIPT, None))
+    return transcripts
+
+
+def boundary_offsets(sentences):
+    """Sentence ends as offsets into the text with all whitespace removed"""
+    offsets = set()
+    position = 0
+    for sentence in sentences:
+        position += len("".join(sentence.split()))
+        offsets.add(position)
+    return offsets
+
+
+def compare(predicted, reference):
+    """Boundary precision / recall / F1 (the final text end is ignored)"""
+    predicted = boundary_offsets(predicted)
+    reference = boundary_offsets(reference)
+    end = max(predicted | reference, default=0)
+    predicted.discard(end)
+    reference.discard(end)
+    if not predicted and not reference:
+        return 1.0, 1.0, 1.0
+    matched = len(predicted & reference)
+    precision = matched / len(predicted) if predicted else 0.0
+    recall = matched / len(reference) if reference else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def time_call(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local sentence segmenter")
+    parser.add_argument('--text', action='append', default=[], help="Plain-text transcript file")
+    parser.add_argument('--reference', help="Reference split for --text (one sentence per line)")
+    parser.add_argument('--llm', action='store_true', help="Compare against the Ollama split call")
+    parser.add_argument('--repeat', type=int, default=20, help="Local segmenter repetitions per text")
+    args = parser.parse_args()
+
+    transcripts = load_transcripts(args.text)
+    reference_split = None
+    if args.reference:
+        reference_split = [line.strip() for line in Path(args.reference).read_text(encoding='utf-8').splitlines()
+                           if line.strip()]
+
+    if args.llm:
+        from utils.translate_tools import _split_text_into_sentences
+
+    print(f"{'transcript':<14} {'chars':>7} {'local':>7} {'local ms':>9} {'llm':>5} {'llm s':>7} "
+          f"{'P':>5} {'R':>5} {'F1':>5}")
+    totals = {'local': 0.0, 'llm': 0.0, 'f1': []}
+    for name, text, boundaries in transcripts:
+        local, local_s = time_call(lambda: split_sentences(text, boundaries), args.repeat)
+        totals['local'] += local_s
+        row = f"{name:<14} {len(text):>7} {len(local):>7} {local_s * 1000:>9.3f}"
+
+        reference = None
+        if args.llm:
+            reference, llm_s = time_call(lambda: _split_text_into_sentences(text), 1)
+            totals['llm'] += llm_s
+            row += f" {len(reference):>5} {llm_s:>7.2f}"
+        else:
+            row += f" {'-':>5} {'-':>7}"
+        if reference_split is not None and name == Path(args.text[0]).name:
+            reference = reference_split
+
+        if reference is not None:
+            precision, recall, f1 = compare(local, reference)
+            totals['f1'].append(f1)
+            row += f" {precision:>5.2f} {recall:>5.2f} {f1:>5.2f}"
+        print(row)
+
+    print(f"\nLocal segmenter: {totals['local'] * 1000:.2f} ms total over {len(transcripts)} transcripts")
+    if args.llm:
+        print(f"LLM split:       {totals['llm']:.2f} s total "
+              f"({len(transcripts)} model calls saved by the local segmenter)")
+    if totals['f1']:
+        print(f"Mean boundary F1 vs. reference: {statistics.mean(totals['f1']):.3f}")
+
+
+if __name__ == "__main__":
+    main()
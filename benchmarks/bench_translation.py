@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: translation throughput per mode and concurrency
+==========================================================
+Runs utils.translate_tools against the local mock Ollama server (or a real
+server with --url) and reports segments/sec, p50/p99 per-segment latency and
+the fallback rate for each translation mode and concurrency level.
+
+The translation memory is disabled so every segment reaches the server.
+
+Usage:
+    python benchmarks/bench_translation.py
+    python benchmarks/bench_translation.py --segments 400 --concurrency 1 4 8 16 --ttft-ms 300
+    python benchmarks/bench_translation.py --fail-rate 0.1 --drop-line-rate 0.05 --json results.json
+    python benchmarks/bench_translation.py --url http://localhost:11434/api/generate
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import DEFAULT_CONFIG
+from utils import translate_tools
+from utils.ollama_client import close_clients
+from mock_ollama import MockOllama, profile_args, profile_from_args
+
+SUBJECTS = ["Our team", "The client", "Every employee", "The manager", "This policy", "The new system"]
+VERBS = ["protects", "reviews", "explains", "updates", "requires", "supports"]
+OBJECTS = ["sensitive information", "the quarterly report", "your desk setup", "account security",
+           "the onboarding guidelines", "customer feedback from last week"]
+
+
+def synthetic_segments(count, seed=0):
+    """Subtitle-length English sentences"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+            f"{'' if rng.random() < 0.5 else ' every single day'}." for _ in range(count)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_once(texts, mode, concurrency):
+    """Translate texts once and return the measurements"""
+    DEFAULT_CONFIG.translation_concurrency = concurrency
+    close_clients()
+    translate_tools.reset_fallback_count()
+
+    def timed_segment(text):
+        start = time.perf_counter()
+        translate_tools.translate_text(text)
+        return [time.perf_counter() - start]
+
+    def timed_batch(batch):
+        # Every segment of a batch becomes available when the batch returns
+        start = time.perf_counter()
+        translate_tools.translate_batch(batch)
+        return [time.perf_counter() - start] * len(batch)
+
+    units = translate_tools.pack_batches(texts) if mode == "batch" else texts
+    work = timed_batch if mode == "batch" else timed_segment
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [latency for unit in pool.map(work, units) for latency in unit]
+    elapsed = time.perf_counter() - start
+
+    client = translate_tools.client_stats()
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'segments': len(texts),
+        'requests': client['requests'],
+        'seconds': elapsed,
+        'segments_per_s': len(texts) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'fallback_rate': translate_tools.fallback_count() / len(texts),
+        'retries': client['retries'],
+        'short_circuited': client['short_circuited']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translation throughput benchmark")
+    parser.add_argument('--url', help="Benchmark a real Ollama server instead of the mock")
+    parser.add_argument('--segments', type=int, default=120)
+    parser.add_argument('--modes', nargs='+', default=["segment", "batch"], choices=["segment", "batch"])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 2, 4, 8])
+    parser.add_argument('--stream', choices=["on", "off"], default="on", help="Client streaming mode")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show translate_tools logging")
+    profile_args(parser)
+    args = parser.parse_args()
+
+    DEFAULT_CONFIG.use_translation_memory = False
+    DEFAULT_CONFIG.ollama_stream = args.stream == "on"
+
+    mock = None
+    if args.url:
+        DEFAULT_CONFIG.ollama_url = args.url
+    else:
+        mock = MockOllama(profile_from_args(args)).start()
+        DEFAULT_CONFIG.ollama_url = mock.url
+        # Injected stalls should trip the TTFT guard rather than the 180 s timeout
+        DEFAULT_CONFIG.ollama_ttft_timeout_s = min(DEFAULT_CONFIG.ollama_ttft_timeout_s, args.stall_s / 2)
+    print(f"🎯 Target: {DEFAULT_CONFIG.ollama_url} ({args.segments} segments, stream {args.stream})")
+
+    texts = synthetic_segments(args.segments, seed=args.seed or 0)
+    results = []
+    print(f"\n{'mode':<8} {'conc':>4} {'reqs':>5} {'seg/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'fallback':>8} {'retries':>7}")
+    try:
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with log:
+                    result = run_once(texts, mode, concurrency)
+                results.append(result)
+                print(f"{mode:<8} {concurrency:>4} {result['requests']:>5} {result['segments_per_s']:>8.2f} "
+                      f"{result['p50_ms']:>8.0f} {result['p99_ms']:>8.0f} "
+                      f"{result['fallback_rate']:>8.1%} {result['retries']:>7}")
+    finally:
+        close_clients()
+        if mock:
+            mock.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Check: CLI startup cost
+=======================
+Runs fresh interpreters that import auto_improve_subtitles and run the
+light `translate` subcommand (against the mock Ollama server), and checks
+that neither pulls in the heavy media/ML stacks (moviepy, OpenCV, EasyOCR,
+faster-whisper, torch) and that each stays under the time budget.
+
+Exits non-zero if a forbidden module is imported or a budget is exceeded,
+so a stray top-level import shows up as a failure rather than a slow CLI.
+
+Usage:
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --budget 0.5 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_ollama import MockOllama, MockProfile
+
+# Modules a light subcommand must never import
+FORBIDDEN = ('moviepy', 'cv2', 'easyocr', 'faster_whisper', 'ctranslate2', 'torch')
+
+# Child process: time the scenario, then report the heavy modules it loaded
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {agent_dir!r})
+start = time.perf_counter()
+import auto_improve_subtitles
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed,
+                   'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+SAMPLE_SEGMENTS = [
+    {'start': 0.0, 'end': 2.0, 'text': "You can't use your phone at your desk."},
+    {'start': 2.0, 'end': 4.5, 'text': "Please put it away before the meeting starts."},
+]
+
+
+def run_child(body, cwd):
+    script = CHILD.format(agent_dir=str(AGENT_DIR), body=body, forbidden=FORBIDDEN)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"child failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI import time and heavy imports")
+    parser.add_argument('--budget', type=float, default=1.0, help="Seconds allowed per scenario (median)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per scenario")
+    args = parser.parse_args()
+
+    mock = MockOllama(MockProfile(ttft_ms=0, tokens_per_s=0)).start()
+    failures = 0
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            scratch = Path(scratch)
+            segments = scratch / "segments.json"
+            segments.write_text(json.dumps(SAMPLE_SEGMENTS), encoding='utf-8')
+            translate_argv = ['translate', str(segments), '-o', str(scratch / "translated.json"),
+                              '--set', f"ollama_url={mock.url}", '--set', "use_translation_memory=false"]
+            scenarios = {
+                'import': "",
+                'translate': (
+                    "import contextlib, io\n"
+                    "with contextlib.redirect_stdout(io.StringIO()):\n"
+                    f"    code = auto_improve_subtitles.main({translate_argv!r})\n"
+                    "assert not code, code"
+                ),
+            }
+
+            print(f"{'scenario':<10} {'median s':>9} {'max s':>7}  heavy modules")
+            for name, body in scenarios.items():
+                runs = [run_child(body, scratch) for _ in range(args.repeat)]
+                times = [run['elapsed'] for run in runs]
+                loaded = sorted({m for run in runs for m in run['loaded']})
+                median = statistics.median(times)
+                ok = median <= args.budget and not loaded
+                failures += not ok
+                print(f"{name:<10} {median:>9.3f} {max(times):>7.3f}  {', '.join(loaded) or '-'} "
+                      f"{'✅' if ok else '❌'}")
+    finally:
+        mock.stop()
+
+    if failures:
+        print(f"❌ {failures} scenario(s) over the {args.budget:.2f}s budget or importing heavy modules")
+        return 1
+    print(f"✅ CLI startup within {args.budget:.2f}s without heavy imports")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama Server
+==================
+Local stand-in for Ollama's /api/generate (streaming and non-streaming) with
+configurable latency, throughput and failure injection, so translate_tools
+can be load-tested without a model.
+
+Translation prompts get a Chinese reply sized to the source text; numbered
+batch prompts get one numbered Chinese line per input line.
+
+Usage:
+    python benchmarks/mock_ollama.py --port 11435 --ttft-ms 150 --tokens-per-s 40
+    python benchmarks/mock_ollama.py --fail-rate 0.1 --stall-rate 0.05 --drop-line-rate 0.02
+
+Then point AgentConfig.ollama_url at http://127.0.0.1:11435/api/generate.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+_NUMBERED = re.compile(r'^\s*(\d+)\.\s+(.*)$')
+_FILLER = "这是一个用于基准测试的模拟翻译结果"
+
+
+@dataclass
+class MockProfile:
+    """Latency, throughput and failure behaviour of the mock server"""
+    ttft_ms: float = 100.0           # Delay before the first token
+    tokens_per_s: float = 50.0       # Streaming rate after the first token (0 = instant)
+    jitter: float = 0.2              # +/- fraction applied to ttft and token delay
+    fail_rate: float = 0.0           # Fraction of requests answered with fail_status
+    fail_status: int = 500
+    stall_rate: float = 0.0          # Fraction of requests that sleep stall_s before the first token
+    stall_s: float = 60.0
+    garbage_rate: float = 0.0        # Fraction of replies in English (rejected as non-Chinese)
+    drop_line_rate: float = 0.0      # Per-line chance of omitting a numbered batch line
+    seed: Optional[int] = None
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Ignores clients that drop keep-alive connections (timeouts, pool shutdown)"""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def _source_lines(prompt: str):
+    """Numbered lines of a batch prompt, or None for a single-text prompt"""
+    body = prompt.rsplit("\n\n", 1)[-1]
+    lines = [_NUMBERED.match(line) for line in body.splitlines()]
+    if lines and all(lines):
+        return [(int(m.group(1)), m.group(2)) for m in lines]
+    return None
+
+
+def _fake_translation(text: str) -> str:
+    """Chinese filler roughly half as long as the source"""
+    length = max(4, len(text) // 2)
+    return (_FILLER * (length // len(_FILLER) + 1))[:length] + "。"
+
+
+class MockOllama:
+    """
+    Threaded mock server
+
+    Usage:
+        with MockOllama(MockProfile(ttft_ms=50)) as mock:
+            url = mock.url
+    """
+
+    def __init__(self, profile: Optional[MockProfile] = None, host: str = '127.0.0.1', port: int = 0):
+        self.profile = profile or MockProfile()
+        self.random = random.Random(self.profile.seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.httpd = _QuietHTTPServer((host, port), self._make_handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-ollama", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _chance(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def _jittered(self, seconds: float) -> float:
+        with self.lock:
+            return seconds * (1 + self.random.uniform(-self.profile.jitter, self.profile.jitter))
+
+    def reply_for(self, prompt: str) -> str:
+        """Build the reply text for a prompt"""
+        if self._chance(self.profile.garbage_rate):
+            return "Sorry, I cannot translate this."
+        lines = _source_lines(prompt)
+        if lines is None:
+            return _fake_translation(prompt.rsplit("\n\n", 1)[-1])
+        return "\n".join(f"{number}. {_fake_translation(text)}" for number, text in lines
+                         if not self._chance(self.profile.drop_line_rate))
+
+    def _make_handler(self):
+        mock = self
+
+        class MockOllamaHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                if self.path != '/api/generate':
+                    self._send_json(404, {'error': 'not found'})
+                    return
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with mock.lock:
+                    mock.requests += 1
+                profile = mock.profile
+
+                if mock._chance(profile.fail_rate):
+                    self._send_json(profile.fail_status, {'error': 'injected failure'})
+                    return
+                if mock._chance(profile.stall_rate):
+                    time.sleep(profile.stall_s)
+
+                reply = mock.reply_for(payload.get('prompt', ''))
+                time.sleep(mock._jittered(profile.ttft_ms / 1000))
+                token_delay = 1 / profile.tokens_per_s if profile.tokens_per_s else 0
+
+                try:
+                    if not payload.get('stream', True):
+                        time.sleep(mock._jittered(token_delay * len(reply)))
+                        self._send_json(200, {'model': payload.get('model'), 'response': reply, 'done': True})
+                        return
+
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    for i, token in enumerate(reply):
+                        if i and token_delay:
+                            time.sleep(mock._jittered(token_delay))
+                        self._write_chunk({'model': payload.get('model'), 'response': token, 'done': False})
+                    self._write_chunk({'model': payload.get('model'), 'response': '', 'done': True,
+                                       'eval_count': len(reply)})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (TTFT / throughput guard)
+                    self.close_connection = True
+
+            def _write_chunk(self, obj):
+                data = (json.dumps(obj, ensure_ascii=False) + "\n").encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, obj):
+                data = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MockOllamaHandler
+
+
+def profile_args(parser: argparse.ArgumentParser):
+    """Add MockProfile options to a parser"""
+    parser.add_argument('--ttft-ms', type=float, default=100.0, help="Delay before the first token")
+    parser.add_argument('--tokens-per-s', type=float, default=50.0, help="Streaming rate (0 = instant)")
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of HTTP errors")
+    parser.add_argument('--fail-status', type=int, default=500)
+    parser.add_argument('--stall-rate', type=float, default=0.0, help="Fraction of stalled requests")
+    parser.add_argument('--stall-s', type=float, default=60.0)
+    parser.add_argument('--garbage-rate', type=float, default=0.0, help="Fraction of non-Chinese replies")
+    parser.add_argument('--drop-line-rate', type=float, default=0.0, help="Batch lines omitted")
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def profile_from_args(args) -> MockProfile:
+    return MockProfile(ttft_ms=args.ttft_ms, tokens_per_s=args.tokens_per_s, jitter=args.jitter,
+                       fail_rate=args.fail_rate, fail_status=args.fail_status,
+                       stall_rate=args.stall_rate, stall_s=args.stall_s,
+                       garbage_rate=args.garbage_rate, drop_line_rate=args.drop_line_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama /api/generate server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    profile_args(parser)
+    args = parser.parse_args()
+
+    mock = MockOllama(profile_from_args(args), host=args.host, port=args.port)
+    print(f"🚀 Mock Ollama listening on {mock.url}")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        mock.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
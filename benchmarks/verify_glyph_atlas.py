@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Verify: glyph atlas renderer against the PIL renderer
+=====================================================
+Renders sample subtitles with both paths of create_subtitle_image() over a
+grid of font sizes and stroke widths, checks that the atlas output matches
+PIL pixel for pixel (within --tolerance), and reports ms/segment for both.
+
+Exits non-zero if any image differs by more than the tolerance.
+
+Usage:
+    python benchmarks/verify_glyph_atlas.py
+    python benchmarks/verify_glyph_atlas.py --font /path/to/NotoSansCJK-Regular.ttc --sizes 36 48
+    python benchmarks/verify_glyph_atlas.py --text "另一句字幕" --tolerance 2
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.glyph_atlas import atlas_stats, render_subtitle_image
+from utils.subtitle_renderer import create_subtitle_image
+from bench_pipeline import PHRASES, find_font
+
+
+def time_render(text, size, stroke, font, use_atlas, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        create_subtitle_image(text, 1280, 120, size, stroke, font, use_atlas=use_atlas)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check glyph atlas output against PIL")
+    parser.add_argument('--font', help="Font file (auto-detected CJK font if omitted)")
+    parser.add_argument('--text', action='append', help="Sample subtitle (repeatable)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[28, 36, 48])
+    parser.add_argument('--strokes', nargs='+', type=int, default=[0, 1, 2, 3])
+    parser.add_argument('--tolerance', type=int, default=0,
+                        help="Largest allowed per-channel difference")
+    parser.add_argument('--repeat', type=int, default=10, help="Timing repetitions")
+    args = parser.parse_args()
+
+    font = find_font(args.font)
+    if font is None:
+        print("❌ No CJK font found, pass one with --font")
+        return 1
+    texts = args.text or PHRASES
+    print(f"🔤 Font: {font}")
+
+    failures = 0
+    fallbacks = 0
+    print(f"\n{'size':>4} {'stroke':>6} {'max diff':>8} {'diff px':>8} {'pil ms':>8} {'atlas ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        for stroke in args.strokes:
+            worst = 0
+            differing = 0
+            for text in texts:
+                if render_subtitle_image(text, 1280, 120, size, stroke, font) is None:
+                    fallbacks += 1
+                    continue
+                pil = np.asarray(create_subtitle_image(text, 1280, 120, size, stroke, font,
+                                                       use_atlas=False), dtype=np.int16)
+                atlas = np.asarray(create_subtitle_image(text, 1280, 120, size, stroke, font),
+                                   dtype=np.int16)
+                diff = np.abs(pil - atlas).max(axis=-1)
+                worst = max(worst, int(diff.max()))
+                differing += int((diff > args.tolerance).sum())
+            if worst > args.tolerance:
+                failures += 1
+
+            pil_ms = sum(time_render(t, size, stroke, font, False, args.repeat) for t in texts) / len(texts)
+            atlas_ms = sum(time_render(t, size, stroke, font, True, args.repeat) for t in texts) / len(texts)
+            icon = "✅" if worst <= args.tolerance else "❌"
+            print(f"{size:>4} {stroke:>6} {worst:>8} {differing:>8} {pil_ms:>8.2f} {atlas_ms:>9.2f} "
+                  f"{pil_ms / atlas_ms:>7.1f}x {icon}")
+
+    stats = atlas_stats()
+    print(f"\n📦 {stats['atlases']} atlases, {stats['glyphs']} cached glyph rasters")
+    if fallbacks:
+        print(f"↩️  {fallbacks} renders needed PIL shaping (not compared)")
+    if failures:
+        print(f"❌ {failures} size/stroke combinations exceed tolerance {args.tolerance}")
+        return 1
+    print(f"✅ Atlas output matches PIL within tolerance {args.tolerance}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -49,27 +49,86 @@ class AgentConfig:
         "C:/Windows/Fonts/simhei.ttf",  # SimHei
     ])
     
+    # Whisper transcription configuration
+    # Models are loaded once per (size, device, compute type, threads, workers) and shared
+    whisper_model_size: str = "base"
+    whisper_language: str = "en"      # Spoken language of the source video
+    whisper_device: str = "cpu"
+    whisper_compute_type: str = "int8"  # int8 = quantized CPU inference; "float32" for full precision
+    whisper_cpu_threads: int = 0        # 0 = let CTranslate2 decide
+    whisper_num_workers: int = 1        # Concurrent transcriptions one model can serve
+    pipeline_queue_size: int = 8        # Transcribed segments buffered ahead of translation
+    
+    # Long-media mode: VAD-split the audio and transcribe chunks in a process pool
+    long_media_threshold_s: float = 600.0  # Audio at least this long uses parallel mode (0 = never)
+    vad_max_chunk_s: float = 120.0         # Upper bound on speech per chunk
+    vad_min_silence_ms: int = 500          # Silence needed to cut between speech spans
+    transcribe_processes: int = 0          # Worker processes (0 = half the CPU cores)
+    
+    # Decoded 16 kHz PCM, memory-mapped and shared by Whisper, VAD and transcription workers
+    audio_cache_dir: str = "cache/audio"  # Relative to the agent folder
+    audio_cache_max_files: int = 8        # Older decoded files are deleted
+    
+    # Transcript cache: keyed by decoded audio hash + model, language and decoding options
+    use_transcript_cache: bool = True
+    transcript_cache_dir: str = "cache/transcripts"  # Relative to the agent folder
+    
     # Translation configuration
     ollama_url: str = "http://localhost:11434/api/generate"
     # 1000 characters gives you plenty of room for complete sentences with proper punctuation. It's designed to handle even the longest, 
     # most complex sentences while ensuring complete context and proper sentence boundaries for high-quality translation.
     max_chunk_size: int = 1000
     translation_model: str = "llama3.1:8b"
+    translation_concurrency: int = 4       # Segments translated in parallel over pooled keep-alive connections
+    translation_timeout_s: float = 180.0   # Per-attempt timeout
+    translation_deadline_s: float = 0.0    # Whole-job budget for translation calls (0 = none)
+    
+    # Ollama resilience: streamed responses are abandoned early when the server stalls or crawls
+    ollama_stream: bool = True
+    ollama_ttft_timeout_s: float = 30.0    # Max wait for the first token (and between tokens)
+    ollama_min_tokens_per_s: float = 2.0   # Abort attempts streaming slower than this (0 = off)
+    ollama_max_retries: int = 2            # Extra attempts with jittered exponential backoff
+    ollama_backoff_base_s: float = 0.5
+    ollama_backoff_max_s: float = 8.0
+    ollama_breaker_failures: int = 5       # Consecutive failures that open the circuit breaker
+    ollama_breaker_reset_s: float = 30.0   # Open circuit lets one trial call through after this
     
     # Translation prompt configuration (easily customizable)
     source_language: str = "English"
     target_language: str = "Simplified Chinese"
+    # {target_language} in the instructions is replaced by the language being translated into
     translation_instruction: str = ("Provide a natural, conversational translation while maintaining technical terms and accuracy. "
-                                   "Only return the Chinese translation, nothing else")
+                                   "Only return the {target_language} translation, nothing else")
+    
+    # Multi-target mode: transcribe once, translate into every language concurrently, tune the style on
+    # the first language and render the others from one decode of the source (empty = target_language only)
+    target_languages: List[str] = field(default_factory=list)
+    target_language_fonts: Dict[str, str] = field(default_factory=dict)  # Per-language font (default: tuned font)
     translation_prompt_template: str = "Please translate the following {source_language} text to {target_language}. {instruction}:\n\n{text}"
     
+    # Batch mode packs consecutive segments into one prompt as numbered lines
+    translation_mode: str = "segment"      # "segment" = one request per segment, "batch" = numbered-line batches
+    batch_token_budget: int = 600          # Estimated source tokens per batch
+    batch_max_segments: int = 30
+    batch_max_wait_s: float = 2.0          # Streaming: flush a partial batch after waiting this long
+    batch_translation_instruction: str = ("Translate every line naturally while maintaining technical terms and accuracy. "
+                                         "Use the surrounding lines as context but translate each line on its own")
+    batch_translation_prompt_template: str = ("Please translate the following numbered {source_language} lines to {target_language}. "
+                                             "{instruction}. Return exactly {count} lines formatted as '<number>. <translation>', "
+                                             "one per input line, with nothing else:\n\n{lines}")
+    
+    # Translation memory: reuses earlier translations keyed by source text, model, prompt and options
+    use_translation_memory: bool = True
+    translation_memory_path: str = "cache/translation_memory.sqlite"  # Relative to the agent folder
+    translation_memory_fuzzy: bool = False  # Also match ignoring case, punctuation and whitespace
+    
     translation_options: Dict[str, float] = field(default_factory=lambda: {
         "temperature": 0.1, # Temperature: 0.1 (Low = Consistent)
         "top_p": 0.9 # Top_p: 0.9 (High = Quality Focus)
     })
     
-    # Sentence splitting configuration (now uses LLM for intelligent splitting)
-    use_llm_sentence_splitting: bool = True  # Use LLM for smart sentence splitting
+    # Sentence splitting configuration (local rule-based segmenter; the LLM split costs a full model call)
+    use_llm_sentence_splitting: bool = False  # Use the LLM for sentence splitting instead of utils.sentence_segmenter
     sentence_split_fallback_pattern: str = r'(?<=[.!?;])\s+'  # Fallback regex if LLM fails
     sentence_split_prompt_template: str = ("Split the following text into separate sentences. "
                                           "Return only the sentences, one per line, with no numbering or extra text:\n\n{text}")
@@ -78,6 +137,26 @@ class AgentConfig:
         "top_p": 0.8         # Focus on high-probability words
     })
     
+    # Artifact cache for rendered videos and probe frames (keyed by content hash)
+    use_artifact_cache: bool = True
+    artifact_cache_dir: str = "cache/artifacts"  # Relative to the agent folder
+    artifact_cache_max_gb: float = 5.0           # Least-recently-used artifacts are evicted beyond this
+    # Incremental re-render (needs the artifact cache): renders get a fixed keyframe grid, and a render
+    # whose subtitles differ from the previous one only re-encodes the changed keyframe spans
+    incremental_render: bool = True
+    incremental_keyframe_interval_s: float = 2.0
+    incremental_max_fraction: float = 0.5        # Full re-encode when more than this share changed
+    # Keyframe timestamps of source videos seeked by the frame source, reused across runs (oldest pruned)
+    keyframe_index_dir: str = "cache/keyframes"  # Relative to the agent folder
+    
+    # Tuned style profiles: winning parameters per (reference image, video resolution, font)
+    use_style_profiles: bool = True
+    style_profile_path: str = "cache/style_profiles.json"  # Relative to the agent folder
+    style_profile_mode: str = "verify"     # "verify" = re-score the stored parameters, "trust" = render only
+    style_profile_verify_iterations: int = 1  # Iterations allowed to reach the stored score (1-2)
+    style_profile_tolerance: float = 3.0   # Accept a verification scoring this much below the stored score
+    style_profile_min_score: float = 70.0  # Only remember tunings at least this good
+    
     def validate(self):
         """Validate configuration"""
         # Check weights sum to 1.0
@@ -92,6 +171,52 @@ class AgentConfig:
         if not (0 < self.similarity <= 100):
             raise ValueError("similarity must be between 0 and 100")
         
+        if self.whisper_compute_type not in ("default", "auto", "int8", "int8_float32", "int8_float16",
+                                             "int8_bfloat16", "int16", "float16", "bfloat16", "float32"):
+            raise ValueError(f"Unknown whisper_compute_type: {self.whisper_compute_type}")
+        
+        if self.whisper_cpu_threads < 0 or self.whisper_num_workers < 1:
+            raise ValueError("whisper_cpu_threads must be >= 0 and whisper_num_workers >= 1")
+        
+        if self.vad_max_chunk_s <= 0 or self.transcribe_processes < 0:
+            raise ValueError("vad_max_chunk_s must be > 0 and transcribe_processes >= 0")
+        
+        if self.audio_cache_max_files < 1:
+            raise ValueError("audio_cache_max_files must be >= 1")
+        
+        if self.translation_concurrency < 1 or self.translation_timeout_s <= 0:
+            raise ValueError("translation_concurrency must be >= 1 and translation_timeout_s > 0")
+        
+        if self.translation_deadline_s < 0 or self.ollama_ttft_timeout_s <= 0 or self.ollama_max_retries < 0:
+            raise ValueError("translation_deadline_s and ollama_max_retries must be >= 0, ollama_ttft_timeout_s > 0")
+        
+        if self.ollama_breaker_failures < 1:
+            raise ValueError("ollama_breaker_failures must be >= 1")
+        
+        if self.translation_mode not in ("segment", "batch"):
+            raise ValueError(f"translation_mode must be 'segment' or 'batch', got {self.translation_mode}")
+        
+        if len(set(self.target_languages)) != len(self.target_languages):
+            raise ValueError(f"target_languages contains duplicates: {self.target_languages}")
+        
+        if set(self.target_language_fonts) - set(self.target_languages or [self.target_language]):
+            raise ValueError("target_language_fonts has languages that are not in target_languages")
+        
+        if self.pipeline_queue_size < 1:
+            raise ValueError("pipeline_queue_size must be >= 1")
+        
+        if self.style_profile_mode not in ("verify", "trust"):
+            raise ValueError(f"style_profile_mode must be 'verify' or 'trust', got {self.style_profile_mode}")
+        
+        if self.style_profile_verify_iterations < 1:
+            raise ValueError("style_profile_verify_iterations must be >= 1")
+        
+        if self.incremental_keyframe_interval_s <= 0 or not (0 < self.incremental_max_fraction <= 1):
+            raise ValueError("incremental_keyframe_interval_s must be > 0 and incremental_max_fraction in (0, 1]")
+        
+        if self.artifact_cache_max_gb <= 0:
+            raise ValueError("artifact_cache_max_gb must be > 0")
+        
         return True
 
 # Default configuration instance
@@ -0,0 +1,108 @@
+"""
+Checkpoint Journal - Compact per-node GraphState deltas for crash recovery
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from core.state import GraphState, convert_to_native
+
+
+# Nodes after which the graph can safely pick up again. Only these are
+# journaled; a crash in a mid-iteration node (generate_video, take_screenshot,
+# analyze_current) restarts the interrupted iteration.
+RESUME_POINTS = ('translate', 'analyze_target', 'compare', 'adjust_parameters')
+
+# Written once by the 'translate' entry / appended per entry as new iterations
+# instead of being repeated in every snapshot. current_metrics is only read by
+# compare within the iteration, so it is not needed to resume.
+_SEPARATE_FIELDS = ('subtitle_segments', 'all_iterations', 'current_metrics')
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of resume points.
+
+    The 'translate' entry holds the subtitle segments; every later entry holds
+    the small per-node fields plus the iteration records completed since the
+    previous entry, so the journal grows linearly with the iterations.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Iteration records already in the journal
+        self._journaled_iterations = 0
+
+    def record(self, node_name: str, state: GraphState):
+        """
+        Append the state after a node finished (ignored for non-resumable nodes)
+
+        Args:
+            node_name: Name of the node that just completed
+            state: Graph state after the node
+        """
+        if node_name not in RESUME_POINTS:
+            return
+
+        entry = {'node': node_name, 'timestamp': datetime.now().isoformat()}
+        if node_name == 'translate':
+            entry['segments'] = convert_to_native(state.subtitle_segments)
+            self._journaled_iterations = 0
+        else:
+            snapshot = state.to_dict()
+            entry['state'] = {k: v for k, v in snapshot.items() if k not in _SEPARATE_FIELDS}
+            entry['iterations'] = snapshot['all_iterations'][self._journaled_iterations:]
+            self._journaled_iterations = len(snapshot['all_iterations'])
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_latest(self) -> Optional[Tuple[str, GraphState]]:
+        """
+        Rebuild the state at the most recent resume point
+
+        Returns:
+            (node_name, state) tuple, or None if there is nothing to resume
+        """
+        if not self.path.exists():
+            return None
+
+        latest = None
+        segments = None
+        iterations = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial line from a run killed mid-write
+                    continue
+                node = entry.get('node')
+                if node == 'translate':
+                    segments = entry.get('segments')
+                    iterations = []
+                    latest = (node, {})
+                elif node in RESUME_POINTS:
+                    iterations.extend(entry.get('iterations', []))
+                    latest = (node, entry['state'])
+
+        if latest is None:
+            return None
+
+        node, fields = latest
+        self._journaled_iterations = len(iterations)
+        state = GraphState.from_dict(dict(fields, subtitle_segments=segments, all_iterations=iterations))
+        return node, state
+
+    def reset(self):
+        """Discard the journal to start a fresh run"""
+        if self.path.exists():
+            self.path.unlink()
+        self._journaled_iterations = 0
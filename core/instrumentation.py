@@ -0,0 +1,245 @@
+"""
+Instrumentation - Per-stage wall time, CPU time and peak RSS with trace export
+
+cpu_s is the CPU time of the thread that ran the stage; process_cpu_s and
+process_peak_rss_bytes are process-wide (other threads and earlier stages
+count too), so read them as context rather than as the stage's own cost.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process in bytes (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        # peak_wset is the Windows high-water mark
+        return getattr(info, 'peak_wset', info.rss)
+    except ImportError:
+        return None
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one execution of a node or stage"""
+    name: str
+    category: str
+    start: float
+    wall_s: float
+    cpu_s: float
+    process_cpu_s: float
+    process_peak_rss_bytes: Optional[int]
+    thread_id: int
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class Profiler:
+    """Interface for custom profilers attached to individual stages"""
+
+    def wants(self, name: str) -> bool:
+        """Return True if this profiler should run for the given stage"""
+        return True
+
+    def start(self, name: str):
+        """Called right before the stage runs"""
+        pass
+
+    def stop(self, name: str):
+        """Called right after the stage finished (also on error)"""
+        pass
+
+
+class CProfileProfiler(Profiler):
+    """
+    Run cProfile for selected stages and dump one .prof file per execution
+
+    Profiles are kept per (stage, thread), so the same stage running on
+    several threads at once (e.g. translate workers) gets one profile each.
+    """
+
+    def __init__(self, output_dir: Path, stages: Optional[List[str]] = None):
+        self.output_dir = Path(output_dir)
+        self.stages = set(stages) if stages else None
+        self._active = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def wants(self, name: str) -> bool:
+        return self.stages is None or name in self.stages
+
+    def start(self, name: str):
+        import cProfile
+        key = (name, threading.get_ident())
+        with self._lock:
+            if key in self._active:
+                # Nested execution of the same stage on this thread: the outer profile covers it
+                return
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active cProfile per process
+                return
+            self._active[key] = profile
+
+    def stop(self, name: str):
+        with self._lock:
+            profile = self._active.pop((name, threading.get_ident()), None)
+            if profile is None:
+                return
+            profile.disable()
+            count = self._counts.get(name, 0) + 1
+            self._counts[name] = count
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prof_path = self.output_dir / f"{name}_{count}.prof"
+        profile.dump_stats(str(prof_path))
+        print(f"  🔬 cProfile written: {prof_path.name}")
+
+
+class Instrumentation:
+    """Records per-stage measurements and exports them as a trace and summary table"""
+
+    def __init__(self, profilers: Optional[List[Profiler]] = None):
+        self.profilers = list(profilers or [])
+        self.records: List[StageRecord] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_profiler(self, profiler: Profiler):
+        """Attach a custom profiler"""
+        self.profilers.append(profiler)
+
+    @contextmanager
+    def stage(self, name: str, category: str = 'stage', **args):
+        """
+        Measure a block of work
+
+        Args:
+            name: Stage name (node name for graph nodes)
+            category: 'node' for graph nodes, 'stage' for everything else
+            **args: Extra values stored with the record (e.g. iteration)
+        """
+        profilers = [p for p in self.profilers if p.wants(name)]
+        for profiler in profilers:
+            profiler.start(name)
+
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        start_process_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            process_cpu = time.process_time() - start_process_cpu
+            for profiler in reversed(profilers):
+                profiler.stop(name)
+
+            record = StageRecord(
+                name=name,
+                category=category,
+                start=start_wall - self._origin,
+                wall_s=wall,
+                cpu_s=cpu,
+                process_cpu_s=process_cpu,
+                process_peak_rss_bytes=peak_rss_bytes(),
+                thread_id=threading.get_ident(),
+                args=args
+            )
+            with self._lock:
+                self.records.append(record)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregate records per stage name, in order of first start"""
+        rows = {}
+        for record in sorted(self.records, key=lambda r: r.start):
+            row = rows.setdefault(record.name, {
+                'name': record.name,
+                'category': record.category,
+                'count': 0,
+                'total_wall_s': 0.0,
+                'total_cpu_s': 0.0,
+                'total_process_cpu_s': 0.0,
+                'max_wall_s': 0.0,
+                'process_peak_rss_bytes': None
+            })
+            row['count'] += 1
+            row['total_wall_s'] += record.wall_s
+            row['total_cpu_s'] += record.cpu_s
+            row['total_process_cpu_s'] += record.process_cpu_s
+            row['max_wall_s'] = max(row['max_wall_s'], record.wall_s)
+            if record.process_peak_rss_bytes is not None:
+                row['process_peak_rss_bytes'] = max(row['process_peak_rss_bytes'] or 0,
+                                                    record.process_peak_rss_bytes)
+
+        for row in rows.values():
+            row['mean_wall_s'] = row['total_wall_s'] / row['count']
+        return list(rows.values())
+
+    def print_summary(self):
+        """Print the per-stage summary table"""
+        print(f"\n{'='*60}")
+        print(f"⏱️  STAGE TIMINGS")
+        print(f"{'='*60}")
+        print(f"{'Stage':<22}{'Runs':>5}{'Wall s':>9}{'Mean s':>9}{'CPU s':>9}{'Proc CPU s':>11}{'Proc peak MB':>13}")
+        for row in self.summary():
+            peak = row['process_peak_rss_bytes']
+            peak_mb = f"{peak / 1024 / 1024:.0f}" if peak is not None else "-"
+            print(f"{row['name']:<22}{row['count']:>5}{row['total_wall_s']:>9.2f}"
+                  f"{row['mean_wall_s']:>9.2f}{row['total_cpu_s']:>9.2f}"
+                  f"{row['total_process_cpu_s']:>11.2f}{peak_mb:>13}")
+        print("CPU s: stage thread only; Proc CPU s / Proc peak MB: whole process (all threads, high-water mark)")
+        print(f"{'='*60}\n")
+
+    def export_summary(self, path: Path):
+        """Write the per-stage summary table as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path: Path):
+        """Write records as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = dict(record.args)
+            args['thread_cpu_ms'] = round(record.cpu_s * 1000, 3)
+            args['process_cpu_ms'] = round(record.process_cpu_s * 1000, 3)
+            if record.process_peak_rss_bytes is not None:
+                args['process_peak_rss_mb'] = round(record.process_peak_rss_bytes / 1024 / 1024, 1)
+            events.append({
+                'name': record.name,
+                'cat': record.category,
+                'ph': 'X',
+                'ts': round(record.start * 1e6, 1),
+                'dur': round(record.wall_s * 1e6, 1),
+                'pid': pid,
+                'tid': record.thread_id,
+                'args': args
+            })
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+        print(f"💾 Trace saved: {path}")
@@ -0,0 +1,64 @@
+"""
+Iteration Log - Streams each completed iteration to an append-only JSONL file
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Any
+
+from core.state import convert_to_native
+
+
+# Per-box OCR data; large and only needed for offline inspection
+HEAVY_METRIC_KEYS = ('texts', 'confidences', 'positions', 'bbox_sizes')
+
+
+class IterationLog:
+    """
+    Append-only log with one compact record per iteration.
+
+    Per-box OCR data is spilled to one JSON file per iteration so the in-memory
+    history only holds scores, summary metrics and parameters.
+    """
+
+    def __init__(self, path: Path, spill_dir: Path):
+        self.path = Path(path)
+        self.spill_dir = Path(spill_dir)
+
+    def reset(self):
+        """Discard the log and spilled OCR data to start a fresh run"""
+        if self.path.exists():
+            self.path.unlink()
+        if self.spill_dir.exists():
+            shutil.rmtree(self.spill_dir)
+
+    def append(self, iteration_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Spill heavy metrics and append the compact record to the log
+
+        Args:
+            iteration_result: Full iteration dict as stored by CompareNode
+
+        Returns:
+            Compact record to keep in memory instead of the full one
+        """
+        metrics = iteration_result.get('metrics') or {}
+        heavy = {k: metrics[k] for k in HEAVY_METRIC_KEYS if k in metrics}
+        summary = {k: v for k, v in metrics.items() if k not in HEAVY_METRIC_KEYS}
+
+        if heavy:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            ocr_path = self.spill_dir / f"iteration_{iteration_result['iteration']}_ocr.json"
+            with open(ocr_path, 'w', encoding='utf-8') as f:
+                json.dump(convert_to_native(heavy), f, ensure_ascii=False)
+            summary['ocr_path'] = str(ocr_path)
+
+        compact = convert_to_native(dict(iteration_result, metrics=summary))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(compact, ensure_ascii=False) + '\n')
+            f.flush()
+
+        return compact
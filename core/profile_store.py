@@ -0,0 +1,104 @@
+"""
+Style Profile Store - Tuned subtitle parameters reused for known reference styles
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from core.state import convert_to_native
+from utils.artifact_store import artifact_key, hash_file
+
+
+def probe_resolution(video_path: Path) -> Tuple[int, int]:
+    """(width, height) of a video from its header"""
+    from utils.frame_source import probe_video
+
+    info = probe_video(video_path)
+    return info['width'], info['height']
+
+
+def style_profile_key(target_image: Path, resolution: Tuple[int, int], font_path: str) -> str:
+    """
+    Key of a tuned style
+
+    Args:
+        target_image: Reference image (hashed by content)
+        resolution: Output video (width, height)
+        font_path: Subtitle font
+    """
+    return artifact_key('style', hash_file(target_image), list(resolution), font_path)
+
+
+class StyleProfileStore:
+    """
+    JSON file of winning parameters per (reference image, resolution, font).
+
+    A profile keeps the best parameters, their comparison scores and the
+    target metrics, so a later run can skip target OCR and the search.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored profile, or None"""
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, parameters: Dict[str, Any], comparison: Dict[str, Any],
+            target_metrics: Dict[str, Any], source: str = "") -> bool:
+        """
+        Store a tuned profile unless an existing one scored higher
+
+        Args:
+            key: style_profile_key()
+            parameters: Winning render parameters
+            comparison: CompareNode result for those parameters
+            target_metrics: Reference image metrics
+            source: Video the profile was tuned on (informational)
+
+        Returns:
+            bool: True if the profile was written
+        """
+        with self._lock:
+            profiles = self._load()
+            existing = profiles.get(key)
+            if existing and existing['comparison']['overall_score'] > comparison['overall_score']:
+                return False
+            profiles[key] = convert_to_native({
+                'parameters': parameters,
+                'comparison': {k: v for k, v in comparison.items() if k != 'details'},
+                'target_metrics': target_metrics,
+                'source': source,
+                'updated_at': datetime.now().isoformat()
+            })
+            self._save(profiles)
+            return True
+
+    def remove(self, key: str) -> bool:
+        """Forget a profile (e.g. after a failed verification)"""
+        with self._lock:
+            profiles = self._load()
+            if profiles.pop(key, None) is None:
+                return False
+            self._save(profiles)
+            return True
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, profiles: Dict[str, Any]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(profiles, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
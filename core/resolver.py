@@ -3,11 +3,18 @@ Resolver - Orchestrates the graph execution
 """
 
 import json
+import os
+import shutil
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-from core.state import GraphState
+from core.state import GraphState, convert_to_native
 from core.graph import EdgeConditions
+from core.checkpoint import CheckpointJournal
+from core.instrumentation import Instrumentation
+from core.iteration_log import IterationLog
+from core.profile_store import StyleProfileStore
 from config import AgentConfig
 from nodes.analyze_target_node import AnalyzeTargetNode
 from nodes.generate_video_node import GenerateVideoNode
@@ -28,7 +35,12 @@ class SubtitleResolver:
                  compare: CompareNode,
                  adjust_parameters: AdjustParametersNode,
                  output_dir: Path,
-                 subtitle_segments=None):
+                 subtitle_segments=None,
+                 checkpoint: Optional[CheckpointJournal] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 iteration_log: Optional[IterationLog] = None,
+                 style_profiles: Optional[StyleProfileStore] = None,
+                 style_profile_key: Optional[str] = None):
         self.config = config
         self.nodes = {
             'analyze_target': analyze_target,
@@ -41,6 +53,86 @@ class SubtitleResolver:
         self.output_dir = output_dir
         self.state = GraphState()
         self.state.subtitle_segments = subtitle_segments  # Set Whisper segments
+        self.checkpoint = checkpoint
+        self.resume_node = None
+        self.instrumentation = instrumentation or Instrumentation()
+        self.iteration_log = iteration_log
+        self.style_profiles = style_profiles
+        self.style_profile_key = style_profile_key
+        self.profile_used = None
+        # Iteration number of the newest record already streamed to the iteration log
+        self._logged_iteration = None
+        for node in self.nodes.values():
+            node.instrumentation = self.instrumentation
+    
+    def restore(self) -> Optional[str]:
+        """
+        Restore state from the latest checkpoint snapshot
+        
+        Returns:
+            Name of the node the snapshot was taken after, or None if nothing to resume
+        """
+        latest = self.checkpoint.load_latest() if self.checkpoint else None
+        if latest is None:
+            return None
+        
+        self.resume_node, self.state = latest
+        if self.state.all_iterations:
+            self._logged_iteration = self.state.all_iterations[-1]['iteration']
+        print(f"♻️  Resuming after '{self.resume_node}' (iteration {self.state.iteration}, "
+              f"{len(self.state.all_iterations)} completed)")
+        return self.resume_node
+    
+    def _run_node(self, name: str):
+        """Execute a node, measure it, and journal the resulting state"""
+        with self.instrumentation.stage(name, category='node', iteration=self.state.iteration):
+            self.state = self.nodes[name].execute(self.state)
+        if name == 'compare':
+            self._log_iteration()
+            self._keep_best_video()
+        if self.checkpoint:
+            self.checkpoint.record(name, self.state)
+    
+    def _log_iteration(self):
+        """Stream the newest iteration to the log and keep only its compact form in memory"""
+        if self.iteration_log is None or not self.state.all_iterations:
+            return
+        
+        full_result = self.state.all_iterations[-1]
+        # Compare stores no record when nothing was detected; the last one is an earlier iteration
+        if full_result['iteration'] != self.state.iteration or full_result['iteration'] == self._logged_iteration:
+            return
+        compact = self.iteration_log.append(full_result)
+        self._logged_iteration = full_result['iteration']
+        self.state.all_iterations[-1] = compact
+        if self.state.best_result is full_result:
+            self.state.best_result = compact
+    
+    def _keep_best_video(self):
+        """
+        Hardlink (or copy) the best render to output_dir/best_video.mp4 and report that path
+        
+        Renders live in the LRU artifact store, where later renders of this run or
+        other workers sharing the store may evict them.
+        """
+        best = self.state.best_result
+        if not best or not best.get('video_path'):
+            return
+        source = Path(best['video_path'])
+        kept = self.output_dir / f"best_video{source.suffix}"
+        if source == kept or not source.exists():
+            return
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = kept.with_name(f".{kept.name}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, kept)
+        # A copy, so the iteration record keeps the render's own path
+        self.state.best_result = dict(best, video_path=str(kept))
     
     def resolve(self) -> GraphState:
         """Execute the graph until stop condition met"""
@@ -53,35 +145,62 @@ class SubtitleResolver:
         print(f"  - Weights: {self.config.comparison_weights}")
         
         try:
-            # STEP 1: Analyze target image (once)
-            self.state = self.nodes['analyze_target'].execute(self.state)
+            profile = self._lookup_profile() if self.resume_node is None else None
+            skip_to_edges = False
             
-            # Initialize parameters from target
-            if self.state.target_metrics:
-                # Scale down the detected font size to make it fit better
-                detected_size = self.state.target_metrics['estimated_font_size']
-                scaled_size = int(detected_size * self.config.initial_font_scale)
+            if self.resume_node == 'compare' and (self.state.best_result or {}).get('from_profile'):
+                # A tuned-profile render (trust mode) already finished this run
+                print(f"\n⏭️  Tuned-profile render restored from checkpoint")
+                return self.state
+            if self.resume_node in ('analyze_target', 'compare', 'adjust_parameters'):
+                # Target metrics and search history come from the checkpoint
+                print(f"\n⏭️  Skipping target analysis (restored from checkpoint)")
+            elif profile is not None:
+                # Known reference style: target metrics and parameters come from the profile
+                self.state.target_metrics = profile['target_metrics']
+                self.state.parameters = dict(profile['parameters'])
+                if self.checkpoint:
+                    self.checkpoint.record('analyze_target', self.state)
                 
-                self.state.parameters = {
-                    'font_size': scaled_size,
-                    'stroke_width': 2,
-                    'position_pct': self.state.target_metrics['avg_y_position'],
-                    'font_path': self.config.font_paths[0]
-                }
-            
-            # STEP 2-7: Iterate until stop condition
-            while EdgeConditions.should_continue(self.state, self.config):
-                # Generate video
-                self.state = self.nodes['generate_video'].execute(self.state)
-                
-                # Take screenshot
-                self.state = self.nodes['take_screenshot'].execute(self.state)
+                if self.config.style_profile_mode == "trust":
+                    return self._render_profile(profile)
+                if self._verify_profile(profile):
+                    self._save_profile()
+                    return self.state
+                # Verification fell short: drop the stale profile and keep searching from here
+                print(f"\n⚠️  Tuned profile did not verify, continuing the parameter search")
+                self.style_profiles.remove(self.style_profile_key)
+                skip_to_edges = True
+            else:
+                # STEP 1: Analyze target image (once)
+                with self.instrumentation.stage('analyze_target', category='node'):
+                    self.state = self.nodes['analyze_target'].execute(self.state)
                 
-                # Analyze current
-                self.state = self.nodes['analyze_current'].execute(self.state)
+                # Initialize parameters from target
+                if self.state.target_metrics:
+                    # Scale down the detected font size to make it fit better
+                    detected_size = self.state.target_metrics['estimated_font_size']
+                    scaled_size = int(detected_size * self.config.initial_font_scale)
+                    
+                    self.state.parameters = {
+                        'font_size': scaled_size,
+                        'stroke_width': 2,
+                        'position_pct': self.state.target_metrics['avg_y_position'],
+                        'font_path': self.config.font_paths[0]
+                    }
                 
-                # Compare with target
-                self.state = self.nodes['compare'].execute(self.state)
+                if self.checkpoint:
+                    self.checkpoint.record('analyze_target', self.state)
+            
+            # A run killed between compare and adjust picks up at the edge checks
+            skip_to_edges = skip_to_edges or self.resume_node == 'compare'
+            
+            # STEP 2-7: Iterate until stop condition
+            while skip_to_edges or EdgeConditions.should_continue(self.state, self.config):
+                if not skip_to_edges:
+                    # Generate video, take screenshot, analyze current, compare with target
+                    self._run_iteration()
+                skip_to_edges = False
                 
                 # Check stop conditions via edges
                 if EdgeConditions.should_stop_success(self.state, self.config):
@@ -96,7 +215,9 @@ class SubtitleResolver:
                     break
                 
                 # Adjust parameters for next iteration
-                self.state = self.nodes['adjust_parameters'].execute(self.state)
+                self._run_node('adjust_parameters')
+            
+            self._save_profile()
             
             print(f"\n{'='*60}")
             print(f"✅ RESOLVER: Graph Execution Complete")
@@ -111,30 +232,85 @@ class SubtitleResolver:
             self.state.stop_reason = f"Error: {str(e)}"
             return self.state
     
+    def _lookup_profile(self):
+        """Tuned profile for this reference style, resolution and font, if any"""
+        if self.style_profiles is None or self.style_profile_key is None:
+            return None
+        profile = self.style_profiles.get(self.style_profile_key)
+        if profile is not None:
+            params = profile['parameters']
+            print(f"\n📒 Tuned style profile found (score {profile['comparison']['overall_score']:.1f}): "
+                  f"{params['font_size']}px, stroke {params['stroke_width']}px, {params['position_pct']:.1%}")
+            self.profile_used = self.config.style_profile_mode
+        return profile
+    
+    def _run_iteration(self):
+        """Generate, capture, analyze and score one render"""
+        self._run_node('generate_video')
+        self._run_node('take_screenshot')
+        self._run_node('analyze_current')
+        self._run_node('compare')
+    
+    def _verify_profile(self, profile) -> bool:
+        """
+        Render the stored parameters and accept them if they score close to the stored result
+        
+        Runs up to style_profile_verify_iterations iterations (adjusting in between).
+        """
+        expected = profile['comparison']['overall_score']
+        required = min(self.config.similarity, expected - self.config.style_profile_tolerance)
+        budget = min(self.config.style_profile_verify_iterations, self.config.max_iterations)
+        
+        for i in range(budget):
+            if i > 0:
+                self._run_node('adjust_parameters')
+            self._run_iteration()
+            score = self.state.comparison_result['overall_score']
+            if score >= required:
+                self.state.stop_reason = (f"Verified tuned profile: score {score:.1f} "
+                                          f"(stored {expected:.1f}) in {self.state.iteration} iteration(s)")
+                print(f"\n🎉 {self.state.stop_reason}")
+                return True
+        return False
+    
+    def _render_profile(self, profile) -> GraphState:
+        """Render the stored parameters once without re-scoring them"""
+        self._run_node('generate_video')
+        self.state.comparison_result = profile['comparison']
+        self.state.best_result = {
+            'iteration': self.state.iteration,
+            'parameters': dict(self.state.parameters),
+            'comparison': profile['comparison'],
+            'video_path': str(self.state.video_path),
+            'from_profile': True
+        }
+        self.state.all_iterations.append(self.state.best_result)
+        self.state.stop_reason = "Rendered with tuned style profile (no search)"
+        # Like a compared iteration: streamed to the iteration log and journaled for --resume
+        self._log_iteration()
+        self._keep_best_video()
+        if self.checkpoint:
+            self.checkpoint.record('compare', self.state)
+        print(f"\n🎉 {self.state.stop_reason}")
+        return self.state
+    
+    def _save_profile(self):
+        """Remember the best parameters for this reference style"""
+        if self.style_profiles is None or self.style_profile_key is None:
+            return
+        best = self.state.best_result
+        if not best or not self.state.target_metrics:
+            return
+        if best['comparison']['overall_score'] < self.config.style_profile_min_score:
+            return
+        if self.style_profiles.put(self.style_profile_key, best['parameters'], best['comparison'],
+                                   self.state.target_metrics):
+            print(f"📒 Saved tuned style profile (score {best['comparison']['overall_score']:.1f})")
+    
     def save_results(self):
-        """Save results to JSON file"""
+        """Save run summary to JSON file (per-iteration records are streamed to the iteration log)"""
         results_file = self.output_dir / "iteration_results.json"
         
-        # Convert numpy types to native Python types for JSON serialization
-        def convert_to_native(obj):
-            """Recursively convert numpy types to Python native types"""
-            import numpy as np
-            from pathlib import Path
-            
-            if isinstance(obj, Path):
-                return str(obj)
-            elif isinstance(obj, (np.integer, np.floating)):
-                return obj.item()
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {k: convert_to_native(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_to_native(item) for item in obj]
-            elif isinstance(obj, tuple):
-                return [convert_to_native(item) for item in obj]
-            return obj
-        
         results_data = {
             'timestamp': datetime.now().isoformat(),
             'config': {
@@ -146,7 +322,9 @@ class SubtitleResolver:
             'all_iterations': convert_to_native(self.state.all_iterations),
             'best_result': convert_to_native(self.state.best_result),
             'stop_reason': self.state.stop_reason,
-            'total_iterations': self.state.iteration
+            'total_iterations': self.state.iteration,
+            'style_profile': self.profile_used,
+            'iteration_log': str(self.iteration_log.path) if self.iteration_log else None
         }
         
         with open(results_file, 'w', encoding='utf-8') as f:
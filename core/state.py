@@ -2,11 +2,30 @@
 Graph State - Data that flows through the agent graph
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 
+def convert_to_native(obj):
+    """Recursively convert numpy types and paths to JSON-serializable Python types"""
+    import numpy as np
+    
+    if isinstance(obj, Path):
+        return str(obj)
+    elif isinstance(obj, (np.integer, np.floating)):
+        return obj.item()
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {k: convert_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_to_native(item) for item in obj]
+    elif isinstance(obj, tuple):
+        return [convert_to_native(item) for item in obj]
+    return obj
+
+
 @dataclass
 class GraphState:
     """State that flows through the graph nodes"""
@@ -29,6 +48,9 @@ class GraphState:
     video_path: Optional[Path] = None
     screenshot_path: Optional[Path] = None
     
+    # Content key of the current render in the artifact store (None when caching is off)
+    artifact_key: Optional[str] = None
+    
     # History
     all_iterations: List[Dict[str, Any]] = field(default_factory=list)
     
@@ -40,3 +62,18 @@ class GraphState:
     
     # Subtitle segments (for multi-segment dynamic subtitles)
     subtitle_segments: Optional[List[Dict[str, Any]]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize state to a JSON-compatible dict"""
+        return {f.name: convert_to_native(getattr(self, f.name)) for f in fields(self)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GraphState":
+        """Rebuild state from a dict produced by to_dict()"""
+        known = {f.name for f in fields(cls)}
+        state = cls(**{k: v for k, v in data.items() if k in known})
+        if state.video_path is not None:
+            state.video_path = Path(state.video_path)
+        if state.screenshot_path is not None:
+            state.screenshot_path = Path(state.screenshot_path)
+        return state
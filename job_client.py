@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Job Client: Thin CLI for job_server.py
+======================================
+Usage:
+    python job_client.py submit 10_second.mp4 chinese_sample.jpg --wait
+    python job_client.py submit video.mp4 ref.jpg --set max_iterations=3
+    python job_client.py status <job_id>
+    python job_client.py list
+    python job_client.py health
+    python job_client.py --unix /tmp/subtitle_agent.sock health
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float = 30):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class JobClient:
+    """Minimal JSON client for the job server API"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, unix_socket: str = None):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+
+    def _request(self, method: str, path: str, body=None):
+        if self.unix_socket:
+            conn = UnixHTTPConnection(self.unix_socket)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            data = json.dumps(body).encode('utf-8') if body is not None else None
+            headers = {'Content-Type': 'application/json'} if data else {}
+            conn.request(method, path, body=data, headers=headers)
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b'null')
+            if response.status >= 400:
+                raise RuntimeError(f"HTTP {response.status}: {payload.get('error', payload)}")
+            return payload
+        finally:
+            conn.close()
+
+    def submit(self, video: str, target: str, config: dict = None) -> str:
+        """Submit a job and return its id"""
+        body = {
+            'video': str(Path(video).resolve()),
+            'target': str(Path(target).resolve()),
+            'config': config or {}
+        }
+        return self._request('POST', '/jobs', body)['job_id']
+
+    def status(self, job_id: str) -> dict:
+        return self._request('GET', f'/jobs/{job_id}')
+
+    def list_jobs(self) -> list:
+        return self._request('GET', '/jobs')
+
+    def health(self) -> dict:
+        return self._request('GET', '/health')
+
+    def wait(self, job_id: str, poll_interval: float = 1.0) -> dict:
+        """Poll until the job is done or failed"""
+        while True:
+            job = self.status(job_id)
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(poll_interval)
+
+
+def parse_overrides(pairs):
+    """Parse KEY=VALUE config overrides; values are read as JSON when possible"""
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client for the subtitle agent job server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="Connect over a Unix socket")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    submit = sub.add_parser('submit', help="Queue a video")
+    submit.add_argument('video')
+    submit.add_argument('target')
+    submit.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="AgentConfig override, e.g. max_iterations=3")
+    submit.add_argument('--wait', action='store_true', help="Block until the job finishes")
+
+    status = sub.add_parser('status', help="Show one job")
+    status.add_argument('job_id')
+    sub.add_parser('list', help="Show all jobs")
+    sub.add_parser('health', help="Show server status")
+
+    args = parser.parse_args()
+    client = JobClient(args.host, args.port, args.unix)
+
+    try:
+        if args.command == 'submit':
+            job_id = client.submit(args.video, args.target, parse_overrides(args.set))
+            print(job_id)
+            if args.wait:
+                job = client.wait(job_id)
+                print(json.dumps(job, indent=2, ensure_ascii=False))
+                sys.exit(0 if job['status'] == 'done' else 1)
+        elif args.command == 'status':
+            print(json.dumps(client.status(args.job_id), indent=2, ensure_ascii=False))
+        elif args.command == 'list':
+            print(json.dumps(client.list_jobs(), indent=2, ensure_ascii=False))
+        elif args.command == 'health':
+            print(json.dumps(client.health(), indent=2))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Job Server: Warm Subtitle Agent Service
+=======================================
+Keeps Whisper, EasyOCR and the subtitle fonts loaded between runs and executes
+subtitle jobs from a bounded queue on a small worker pool.
+
+Usage:
+    python job_server.py                         # http://127.0.0.1:8765
+    python job_server.py --port 9000 --workers 2
+    python job_server.py --unix /tmp/subtitle_agent.sock
+
+API (JSON):
+    POST /jobs        {"video": "...", "target": "...", "config": {"max_iterations": 3}}
+                      -> 202 {"job_id": "..."}   (503 when the queue is full)
+    GET  /jobs        -> list of jobs
+    GET  /jobs/<id>   -> job status and result
+    GET  /health      -> worker / queue status
+
+Use job_client.py to submit jobs from the command line.
+"""
+
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import AgentConfig
+from core.state import convert_to_native
+
+
+@dataclass
+class Job:
+    """One queued subtitle job"""
+    job_id: str
+    video: str
+    target: str
+    config_overrides: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"  # queued | running | done | failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return convert_to_native({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+class JobServer:
+    """Owns the warm models, the bounded job queue and the worker threads"""
+
+    def __init__(self, output_root: Path, workers: int = 1, queue_size: int = 16):
+        self.output_root = Path(output_root)
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs: Dict[str, Job] = {}
+        self.lock = threading.Lock()
+        self.pipeline = None
+        self.ocr_analyzer = None
+
+    def warm_up(self):
+        """Import the pipeline and load every model once"""
+        print("🔥 Warming up models...")
+        start = time.perf_counter()
+
+        import auto_improve_subtitles as pipeline
+        from utils.ocr_analyzer import OCRAnalyzer
+
+        self.pipeline = pipeline
+        self.ocr_analyzer = OCRAnalyzer()
+        # Primes the shared registry; jobs with other Whisper settings load theirs once
+        pipeline.whisper_tools.load_model(AgentConfig())
+
+        print(f"✅ Models ready in {time.perf_counter() - start:.1f}s")
+
+    def start_workers(self):
+        """Start the worker pool"""
+        for i in range(self.workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        """
+        Queue a job
+
+        Raises:
+            ValueError: Invalid payload
+            queue.Full: Queue at capacity
+        """
+        video = payload.get('video')
+        target = payload.get('target')
+        if not video or not target:
+            raise ValueError("'video' and 'target' are required")
+        for path in (video, target):
+            if not Path(path).exists():
+                raise ValueError(f"File not found: {path}")
+
+        overrides = payload.get('config') or {}
+        known = {f.name for f in fields(AgentConfig)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown config fields: {sorted(unknown)}")
+        # Fail fast on invalid overrides instead of inside a worker
+        replace(AgentConfig(), **overrides).validate()
+
+        job = Job(job_id=uuid.uuid4().hex[:12], video=str(video), target=str(target),
+                  config_overrides=overrides)
+        with self.lock:
+            self.queue.put_nowait(job)
+            self.jobs[job.job_id] = job
+        print(f"📥 Job {job.job_id} queued: {Path(video).name}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def health(self) -> Dict[str, Any]:
+        with self.lock:
+            running = sum(1 for job in self.jobs.values() if job.status == "running")
+        return {
+            'status': 'ok' if self.pipeline is not None else 'warming_up',
+            'workers': self.workers,
+            'running': running,
+            'queued': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize
+        }
+
+    def _worker_loop(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+    def _run_job(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+        print(f"▶️  Job {job.job_id} started")
+
+        try:
+            config = replace(AgentConfig(), **job.config_overrides)
+            config.validate()
+            job_dir = self.output_root / job.job_id
+            job.result = self.pipeline.run_pipeline(
+                Path(job.video), Path(job.target),
+                job_dir / "output", job_dir / "screenshots", config,
+                ocr_analyzer=self.ocr_analyzer
+            )
+            job.status = "done"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            print(f"⏹️  Job {job.job_id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+
+
+def make_handler(server: JobServer):
+    """Build the HTTP request handler bound to a JobServer"""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, server.health())
+            elif self.path == '/jobs':
+                self._send(200, server.list_jobs())
+            elif self.path.startswith('/jobs/'):
+                job = server.get(self.path[len('/jobs/'):])
+                if job is None:
+                    self._send(404, {'error': 'job not found'})
+                else:
+                    self._send(200, job.to_dict())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                job = server.submit(payload)
+                self._send(202, {'job_id': job.job_id})
+            except queue.Full:
+                self._send(503, {'error': 'job queue is full, retry later'})
+            except (ValueError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+
+        def _send(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port) address
+            return self.client_address[0] if self.client_address else 'unix'
+
+        def log_message(self, format, *args):
+            pass
+
+    return JobRequestHandler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix domain socket"""
+    daemon_threads = True
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Warm job server for the subtitle agent")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="Listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=1, help="Concurrent jobs (models are shared)")
+    parser.add_argument('--queue-size', type=int, default=16, help="Pending jobs before 503")
+    parser.add_argument('--output-root', default=str(Path(__file__).parent / "output" / "jobs"))
+    return parser.parse_args()
+
+
+def main():
+    """Start the server"""
+    args = parse_args()
+
+    server = JobServer(Path(args.output_root), workers=args.workers, queue_size=args.queue_size)
+    server.warm_up()
+    server.start_workers()
+
+    handler = make_handler(server)
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        httpd = ThreadingUnixHTTPServer(args.unix, handler)
+        print(f"🚀 Job server listening on unix:{args.unix}")
+    else:
+        httpd = ThreadingHTTPServer((args.host, args.port), handler)
+        print(f"🚀 Job server listening on http://{args.host}:{args.port}")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        httpd.server_close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,8 @@ class AnalyzeCurrentNode(BaseNode):
         if state.screenshot_path is None:
             raise ValueError("Screenshot path is None, cannot analyze")
         
-        current_metrics = self.ocr.analyze_image(state.screenshot_path, verbose=True)
+        with self.stage('ocr'):
+            current_metrics = self.ocr.analyze_image(state.screenshot_path, verbose=True)
         
         # Validate that Chinese characters are present in the screenshot
         has_chinese = False
@@ -22,7 +22,8 @@ class AnalyzeTargetNode(BaseNode):
         print(f"{'='*60}")
         
         # OCR analysis
-        target_metrics = self.ocr.analyze_image(self.target_image, verbose=True)
+        with self.stage('ocr'):
+            target_metrics = self.ocr.analyze_image(self.target_image, verbose=True)
         
         if not target_metrics['text_detected']:
             self.log("⚠️  No text detected in target image!")
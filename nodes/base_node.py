@@ -3,12 +3,16 @@ Base Node Class
 """
 
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from core.state import GraphState
 
 
 class BaseNode(ABC):
     """Abstract base class for all nodes"""
     
+    # Set by the resolver; core.instrumentation.Instrumentation or None
+    instrumentation = None
+    
     @abstractmethod
     def execute(self, state: GraphState) -> GraphState:
         """
@@ -25,3 +29,9 @@ class BaseNode(ABC):
     def log(self, message: str):
         """Print log message"""
         print(f"  {message}")
+    
+    def stage(self, name: str):
+        """Measure a sub-stage of this node (no-op when not instrumented)"""
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.stage(name)
@@ -2,20 +2,43 @@
 Generate Video Node - Creates video with subtitles
 """
 
+import json
 from pathlib import Path
+from typing import Optional
 from moviepy import VideoFileClip, ImageClip, CompositeVideoClip
 from nodes.base_node import BaseNode
 from core.state import GraphState
-from utils.subtitle_renderer import create_subtitle_image
+from utils.subtitle_renderer import create_subtitle_image, RENDERER_VERSION
+from utils.artifact_store import ArtifactStore, artifact_key
+from utils.frame_source import scan_keyframes
+from utils.incremental_render import (MANIFEST_VERSION, encode_params, incremental_render, lineage_key,
+                                      make_manifest)
 
 
 class GenerateVideoNode(BaseNode):
     """Generate video with Chinese subtitles using current parameters"""
     
-    def __init__(self, source_video: Path, output_dir: Path, screenshots_dir: Path):
+    def __init__(self, source_video: Path, output_dir: Path, screenshots_dir: Path,
+                 artifact_store: Optional[ArtifactStore] = None,
+                 keyframe_interval: Optional[float] = None, incremental_max_fraction: float = 0.5):
+        """
+        Args:
+            source_video: Video to subtitle
+            output_dir: Render location when there is no artifact store
+            screenshots_dir: Scratch location for subtitle images
+            artifact_store: Content-addressed render cache
+            keyframe_interval: Enables incremental re-rendering (needs artifact_store):
+                               renders get a keyframe every this many seconds, and a
+                               render whose subtitles differ from an earlier one only
+                               re-encodes the changed keyframe spans
+            incremental_max_fraction: Fall back to a full render above this changed share
+        """
         self.source_video = source_video
         self.output_dir = output_dir
         self.screenshots_dir = screenshots_dir
+        self.artifact_store = artifact_store
+        self.keyframe_interval = keyframe_interval if artifact_store is not None else None
+        self.incremental_max_fraction = incremental_max_fraction
     
     def execute(self, state: GraphState) -> GraphState:
         """Generate video with current subtitle parameters"""
@@ -28,45 +51,158 @@ class GenerateVideoNode(BaseNode):
         self.log(f"Stroke Width: {state.parameters['stroke_width']}px")
         self.log(f"Position: {state.parameters['position_pct']:.1%}")
         
+        # Reuse an identical earlier render if the artifact store has one
+        state.artifact_key = None
+        if self.artifact_store is not None:
+            state.artifact_key = self._render_key(state)
+            cached_path = self.artifact_store.get(state.artifact_key, '.mp4')
+            if cached_path is not None:
+                self.log(f"♻️  Cache hit, reusing render: {cached_path.name}")
+                state.video_path = cached_path
+                return state
+        
+        # Re-encode only the spans whose subtitles changed since the last render
+        if self.keyframe_interval and state.subtitle_segments:
+            output_path = self._render_incremental(state)
+            if output_path is not None:
+                state.video_path = output_path
+                return state
+        
         # Load video
         video = VideoFileClip(str(self.source_video))
         
-        # Create subtitle clips based on whether we have segments or single subtitle
-        if state.subtitle_segments:
-            # Multi-segment subtitles (dynamic)
-            self.log(f"Creating {len(state.subtitle_segments)} subtitle segments...")
-            subtitle_clips = self._create_multi_segment_subtitles(
-                video, state.subtitle_segments, state.parameters, state.iteration
-            )
-        else:
-            # Single static subtitle (legacy mode)
-            subtitle_clips = [self._create_single_subtitle(
-                video, state.test_subtitle, state.parameters, state.iteration
-            )]
+        with self.stage('render_subtitles'):
+            # Create subtitle clips based on whether we have segments or single subtitle
+            if state.subtitle_segments:
+                # Multi-segment subtitles (dynamic)
+                self.log(f"Creating {len(state.subtitle_segments)} subtitle segments...")
+                subtitle_clips = self._create_multi_segment_subtitles(
+                    video, state.subtitle_segments, state.parameters, state.iteration
+                )
+            else:
+                # Single static subtitle (legacy mode)
+                subtitle_clips = [self._create_single_subtitle(
+                    video, state.test_subtitle, state.parameters, state.iteration
+                )]
         
         # Composite video with all subtitle clips
         final_video = CompositeVideoClip([video] + subtitle_clips)
         
         # Output path
-        output_path = self.output_dir / f"10_second_{state.iteration}.mp4"
+        if self.artifact_store is not None:
+            output_path = self.artifact_store.temp_path(state.artifact_key, '.mp4')
+        else:
+            output_path = self.output_dir / f"10_second_{state.iteration}.mp4"
         self.log(f"💾 Saving: {output_path.name}")
         
         # Write video
-        final_video.write_videofile(
-            str(output_path),
-            codec='libx264',
-            audio_codec='aac',
-            fps=video.fps,
-            logger=None
-        )
+        with self.stage('encode_video'):
+            final_video.write_videofile(
+                str(output_path),
+                codec='libx264',
+                audio_codec='aac',
+                fps=video.fps,
+                ffmpeg_params=encode_params(video.fps, self.keyframe_interval) if self.keyframe_interval else None,
+                logger=None
+            )
+        fps, duration = video.fps, video.duration
         
         # Cleanup
         video.close()
         final_video.close()
         
+        if self.artifact_store is not None:
+            output_path = self.artifact_store.put(state.artifact_key, output_path)
+            self.log(f"📦 Stored render: {output_path.name}")
+            if self.keyframe_interval and state.subtitle_segments:
+                self._write_manifest(state, output_path, duration, fps)
+        
         state.video_path = output_path
         return state
     
+    def _render_key(self, state: GraphState) -> str:
+        """Content key of the render: source video, subtitles, parameters, renderer version"""
+        if state.subtitle_segments:
+            subtitles = [[seg['start'], seg['end'], seg['text']] for seg in state.subtitle_segments]
+        else:
+            subtitles = state.test_subtitle
+        
+        return artifact_key(
+            'render',
+            self.artifact_store.source_digest(self.source_video),
+            subtitles,
+            state.parameters,
+            RENDERER_VERSION
+        )
+    
+    def _write_manifest(self, state: GraphState, video_path: Path, duration: float, fps: float):
+        """Record the segments and real keyframe times of the newest render for later incremental renders"""
+        manifest = make_manifest(state.artifact_key, state.subtitle_segments, state.parameters,
+                                 duration, fps, self.keyframe_interval, scan_keyframes(video_path))
+        key = lineage_key(self.artifact_store.source_digest(self.source_video), state.parameters)
+        tmp_path = self.artifact_store.temp_path(key, '.json')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        self.artifact_store.put(key, tmp_path)
+    
+    def _render_incremental(self, state: GraphState) -> Optional[Path]:
+        """
+        Patch the previous render of this source and parameters
+        
+        Returns:
+            Path of the stored render, or None when a full render is needed
+        """
+        key = lineage_key(self.artifact_store.source_digest(self.source_video), state.parameters)
+        manifest_path = self.artifact_store.get(key, '.json')
+        if manifest_path is None:
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('keyframe_interval') != self.keyframe_interval:
+            return None
+        previous_video = self.artifact_store.get(manifest['video_key'], '.mp4')
+        if previous_video is None:
+            return None
+        
+        def render_span(start, end, path):
+            source = VideoFileClip(str(self.source_video))
+            span_video = None
+            try:
+                video = source.subclipped(start, end)
+                # Segments overlapping the span, shifted to span time
+                segments = [dict(seg, start=max(seg['start'], start) - start, end=min(seg['end'], end) - start)
+                            for seg in state.subtitle_segments if seg['start'] < end and seg['end'] > start]
+                clips = self._create_multi_segment_subtitles(video, segments, state.parameters, state.iteration)
+                span_video = CompositeVideoClip([video] + clips)
+                span_video.write_videofile(str(path), codec='libx264', fps=manifest['fps'], audio=False,
+                                           ffmpeg_params=encode_params(manifest['fps'], self.keyframe_interval),
+                                           logger=None)
+            finally:
+                if span_video is not None:
+                    span_video.close()
+                source.close()
+        
+        output_path = self.artifact_store.temp_path(state.artifact_key, '.mp4')
+        try:
+            with self.stage('incremental_render'):
+                stats = incremental_render(previous_video, manifest, state.subtitle_segments, render_span,
+                                           output_path, self.artifact_store.tmp_dir / state.artifact_key[:16],
+                                           self.incremental_max_fraction)
+        except Exception as e:
+            # ffmpeg/moviepy failure or a damaged previous render: the full render still works
+            self.log(f"⚠️  Incremental render failed ({type(e).__name__}: {e}), re-encoding everything")
+            output_path.unlink(missing_ok=True)
+            return None
+        if stats is None:
+            self.log("Too much changed for an incremental render, re-encoding everything")
+            return None
+        
+        self.log(f"✂️  Incremental render: {stats['changed_segments']} changed segments, "
+                 f"{stats['rendered_seconds']:.1f}s re-encoded, {stats['copied_seconds']:.1f}s copied")
+        output_path = self.artifact_store.put(state.artifact_key, output_path)
+        self._write_manifest(state, output_path, manifest['duration'], manifest['fps'])
+        return output_path
+    
     def _create_single_subtitle(self, video, text, parameters, iteration):
         """Create a single static subtitle for entire video duration"""
         subtitle_img = create_subtitle_image(
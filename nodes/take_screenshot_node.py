@@ -2,18 +2,30 @@
 Take Screenshot Node - Captures frame from video
 """
 
+import shutil
 from pathlib import Path
+from typing import Optional
 import cv2
-from moviepy import VideoFileClip
 from nodes.base_node import BaseNode
 from core.state import GraphState
+from utils.artifact_store import ArtifactStore, artifact_key
+from utils.frame_source import FrameSource
+
+# Probe frames are taken at min(PROBE_TIME, duration / 2)
+PROBE_TIME = 5.0
 
 
 class TakeScreenshotNode(BaseNode):
     """Take screenshot from generated video for analysis"""
     
-    def __init__(self, screenshots_dir: Path):
+    def __init__(self, screenshots_dir: Path, artifact_store: Optional[ArtifactStore] = None):
+        """
+        Args:
+            screenshots_dir: Where probe frames are written
+            artifact_store: Content-addressed cache for probe frames
+        """
         self.screenshots_dir = screenshots_dir
+        self.artifact_store = artifact_store
     
     def execute(self, state: GraphState) -> GraphState:
         """Capture screenshot from video"""
@@ -21,11 +33,24 @@ class TakeScreenshotNode(BaseNode):
         print(f"📸 NODE: Take Screenshot")
         print(f"{'='*60}")
         
-        video = VideoFileClip(str(state.video_path))
+        # Probe frames of a cached render are cached alongside it
+        probe_key = None
+        if self.artifact_store is not None and state.artifact_key:
+            probe_key = artifact_key('probe', state.artifact_key, PROBE_TIME)
+            cached_path = self.artifact_store.get(probe_key, '.png')
+            if cached_path is not None:
+                state.screenshot_path = cached_path
+                self.log(f"♻️  Cache hit, reusing probe frame: {cached_path.name}")
+                return state
         
-        # Take screenshot at middle of video
-        screenshot_time = min(5.0, video.duration / 2)
-        frame = video.get_frame(screenshot_time)
+        with self.stage('decode_frame'):
+            # One input seek to the probe time instead of opening the whole clip; every
+            # iteration is a new render, so a keyframe index would be scanned for one frame
+            video = FrameSource(state.video_path)
+            
+            # Take screenshot at middle of video
+            screenshot_time = min(PROBE_TIME, video.duration / 2)
+            frame = video.get_frame(screenshot_time)
         
         if frame is None:
             raise ValueError("Failed to capture frame from video")
@@ -35,9 +60,17 @@ class TakeScreenshotNode(BaseNode):
         frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
         cv2.imwrite(str(screenshot_path), frame_bgr)
         
-        video.close()
+        if probe_key is not None:
+            # Keep the per-iteration file for inspection, store a copy for reuse
+            self.artifact_store.put(probe_key, self._copy_to_temp(screenshot_path, probe_key))
         
         state.screenshot_path = screenshot_path
         self.log(f"✅ Screenshot saved: {screenshot_path.name}")
         
         return state
+    
+    def _copy_to_temp(self, screenshot_path: Path, probe_key: str) -> Path:
+        """Copy a screenshot to the store's scratch area so put() can adopt it"""
+        temp_path = self.artifact_store.temp_path(probe_key, '.png')
+        shutil.copyfile(screenshot_path, temp_path)
+        return temp_path
@@ -0,0 +1,135 @@
+"""
+Content-addressed artifact store for rendered videos and probe frames
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+
+def artifact_key(*parts) -> str:
+    """
+    Build a content key from JSON-serializable parts
+
+    Args:
+        *parts: Anything that determines the artifact (hashes, segments, parameters, versions)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Directory of artifacts named by content key, evicted least-recently-used
+    under a disk budget.
+
+    Access time is tracked through each file's mtime, so several processes can
+    share one store without a central index.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._source_digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    def source_digest(self, path: Path) -> str:
+        """Content hash of a source file, memoized on (path, size, mtime)"""
+        stat = os.stat(path)
+        memo_key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._source_digests:
+            self._source_digests[memo_key] = hash_file(path)
+        return self._source_digests[memo_key]
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        """Final location of an artifact inside the store"""
+        return self.root / f"{key}{suffix}"
+
+    def temp_path(self, key: str, suffix: str) -> Path:
+        """Scratch location to write an artifact before put()"""
+        return self.tmp_dir / f"{key}.{os.getpid()}{suffix}"
+
+    def get(self, key: str, suffix: str) -> Optional[Path]:
+        """
+        Look up an artifact and mark it as recently used
+
+        Returns:
+            Path to the artifact, or None on a miss
+        """
+        path = self.path_for(key, suffix)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        os.utime(path, None)
+        self.hits += 1
+        return path
+
+    def put(self, key: str, source_path: Path) -> Path:
+        """
+        Move a freshly written file into the store and enforce the disk budget
+
+        Args:
+            key: Content key from artifact_key()
+            source_path: File to adopt (moved, not copied)
+
+        Returns:
+            Path of the stored artifact
+        """
+        source_path = Path(source_path)
+        target = self.path_for(key, source_path.suffix)
+        # os.replace is atomic, so concurrent writers of the same key are harmless
+        try:
+            os.replace(source_path, target)
+        except OSError:
+            shutil.move(str(source_path), str(target))
+        os.utime(target, None)
+
+        self.evict(protect=target)
+        return target
+
+    def evict(self, protect: Optional[Path] = None):
+        """Delete least-recently-used artifacts until the store fits the budget"""
+        entries = []
+        total = 0
+        for path in self.root.iterdir():
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if protect is not None and path == protect:
+                continue
+            try:
+                path.unlink()
+                total -= size
+                print(f"  🧹 Evicted cached artifact: {path.name}")
+            except FileNotFoundError:
+                total -= size
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process"""
+        return {'hits': self.hits, 'misses': self.misses}
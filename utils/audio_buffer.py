@@ -0,0 +1,121 @@
+"""
+One-time audio extraction to a memory-mapped 16 kHz mono float32 PCM file
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+# Whisper and Silero VAD both expect 16 kHz mono
+SAMPLE_RATE = 16000
+
+
+class AudioBuffer:
+    """
+    Decoded PCM samples backed by a memory-mapped file.
+
+    Pickling only carries the file path, so worker processes map the same
+    pages instead of receiving a copy of the samples.
+    """
+
+    def __init__(self, path: Path, sample_rate: int = SAMPLE_RATE):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self._samples = None
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Read-only float32 view of the whole buffer"""
+        if self._samples is None:
+            if self.path.stat().st_size == 0:
+                self._samples = np.zeros(0, dtype=np.float32)
+            else:
+                self._samples = np.memmap(self.path, dtype=np.float32, mode='r')
+        return self._samples
+
+    @property
+    def num_samples(self) -> int:
+        return self.path.stat().st_size // 4
+
+    @property
+    def duration(self) -> float:
+        return self.num_samples / self.sample_rate
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getstate__(self):
+        return {'path': self.path, 'sample_rate': self.sample_rate}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self.sample_rate = state['sample_rate']
+        self._samples = None
+
+
+def ffmpeg_exe():
+    """ffmpeg on PATH, else the binary bundled with moviepy's imageio-ffmpeg"""
+    exe = shutil.which('ffmpeg')
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return None
+
+
+def _source_id(source_path: Path) -> str:
+    """Cheap identity of a source file: resolved path, size and mtime"""
+    stat = os.stat(source_path)
+    ident = f"{Path(source_path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha256(ident.encode('utf-8')).hexdigest()[:32]
+
+
+def _prune(cache_dir: Path, max_files: int, keep: Path):
+    """Delete the oldest PCM files beyond max_files"""
+    files = sorted(cache_dir.glob("*.f32"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[max_files:]:
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+def extract_audio(source_path: Path, cache_dir: Path, max_files: int = 8) -> AudioBuffer:
+    """
+    Decode a media file's audio once into a memory-mapped PCM buffer
+
+    Args:
+        source_path: Video or audio file
+        cache_dir: Directory holding decoded .f32 files (reused across runs)
+        max_files: Decoded files to keep; older ones are deleted
+
+    Returns:
+        AudioBuffer: 16 kHz mono float32 samples
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pcm_path = cache_dir / f"{_source_id(source_path)}.f32"
+
+    if pcm_path.exists():
+        os.utime(pcm_path, None)
+        return AudioBuffer(pcm_path)
+
+    tmp_path = cache_dir / f"{pcm_path.stem}.{os.getpid()}.tmp"
+    ffmpeg = ffmpeg_exe()
+    if ffmpeg:
+        subprocess.run([
+            ffmpeg, '-nostdin', '-v', 'error', '-y', '-i', str(source_path),
+            '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 'f32le', str(tmp_path)
+        ], check=True)
+    else:
+        # PyAV decode through faster-whisper when no ffmpeg binary is around
+        from faster_whisper.audio import decode_audio
+        decode_audio(str(source_path), sampling_rate=SAMPLE_RATE).astype(np.float32).tofile(tmp_path)
+
+    os.replace(tmp_path, pcm_path)
+    _prune(cache_dir, max_files, keep=pcm_path)
+    return AudioBuffer(pcm_path)
@@ -0,0 +1,265 @@
+"""
+Frame source: random access (keyframe-indexed for sources seeked repeatedly)
+and prefetched sequential decoding
+"""
+
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.artifact_store import artifact_key
+from utils.audio_buffer import ffmpeg_exe
+
+INDEX_VERSION = 1
+
+_PTS_TIME = re.compile(r'pts_time:\s*(-?[\d.]+)')
+
+# Sentinel closing the prefetch queue
+_END = object()
+
+# Index files kept in the cache directory; older ones are deleted
+INDEX_MAX_FILES = 64
+
+# In-process memo of loaded indexes by source identity, least recently used dropped first
+INDEX_MEMO_SIZE = 32
+_INDEX_MEMO: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_INDEX_LOCK = threading.Lock()
+
+
+def _source_identity(path: Path) -> str:
+    """Cheap identity of a video file: resolved path, size and mtime"""
+    stat = os.stat(path)
+    return artifact_key('frames', str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns, INDEX_VERSION)
+
+
+def scan_keyframes(path: Path) -> List[float]:
+    """Timestamps of the video stream's keyframes (decodes keyframes only)"""
+    result = subprocess.run(
+        [ffmpeg_exe(), '-nostdin', '-hide_banner', '-loglevel', 'info', '-skip_frame', 'nokey',
+         '-i', str(path), '-map', '0:v:0', '-vf', 'showinfo', '-f', 'null', '-'],
+        capture_output=True, text=True, errors='replace', check=True
+    )
+    times = sorted({round(float(m.group(1)), 6) for m in _PTS_TIME.finditer(result.stderr)})
+    return times or [0.0]
+
+
+def probe_video(path: Path) -> Dict[str, Any]:
+    """Width, height, fps and duration from the container header"""
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    infos = ffmpeg_parse_infos(str(path))
+    width, height = infos['video_size']
+    return {'width': int(width), 'height': int(height), 'fps': float(infos['video_fps']),
+            'duration': float(infos['duration'])}
+
+
+def _prune(cache_dir: Path, max_files: int, keep: Path):
+    """Delete the oldest index files beyond max_files"""
+    files = sorted(cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[max_files:]:
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+def load_index(path: Path, cache_dir: Optional[Path] = None, max_files: int = INDEX_MAX_FILES) -> Dict[str, Any]:
+    """
+    Stream info and keyframe timestamps of a video, scanned once per file
+
+    Meant for sources that are seeked repeatedly (and across runs); a one-off
+    seek is cheaper without it, see FrameSource.
+
+    Args:
+        path: Video file
+        cache_dir: Directory of JSON indexes reused across runs (memory only if None)
+        max_files: Index files to keep in cache_dir; older ones are deleted
+
+    Returns:
+        dict: width, height, fps, duration and keyframes
+    """
+    identity = _source_identity(path)
+    with _INDEX_LOCK:
+        index = _INDEX_MEMO.get(identity)
+        if index is not None:
+            _INDEX_MEMO.move_to_end(identity)
+    if index is not None:
+        return index
+
+    index_path = Path(cache_dir) / f"{identity}.json" if cache_dir else None
+    if index_path is not None and index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        os.utime(index_path, None)
+    else:
+        index = probe_video(path)
+        index['keyframes'] = scan_keyframes(path)
+        if index_path is not None:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+            _prune(index_path.parent, max_files, keep=index_path)
+
+    with _INDEX_LOCK:
+        _INDEX_MEMO[identity] = index
+        while len(_INDEX_MEMO) > INDEX_MEMO_SIZE:
+            _INDEX_MEMO.popitem(last=False)
+    return index
+
+
+class FrameSource:
+    """
+    RGB frames of one video file.
+
+    With an index directory, seeks start at the keyframe before the requested
+    time from a keyframe index scanned once per file and cached (for sources
+    seeked repeatedly); without one they are plain input seeks through the
+    container index, which is cheapest for a one-off frame of a fresh render.
+    iter_frames() decodes sequentially on a background thread into a bounded
+    queue so decoding overlaps the consumer.
+    """
+
+    def __init__(self, path: Path, index_dir: Optional[Path] = None):
+        """
+        Args:
+            path: Video file
+            index_dir: Where keyframe indexes are cached (see load_index); the
+                       index is only loaded or scanned at the first seek
+        """
+        self.path = Path(path)
+        self.index_dir = index_dir
+        self.index = probe_video(self.path)
+        self._keyframes = None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.index['width'], self.index['height']
+
+    @property
+    def fps(self) -> float:
+        return self.index['fps']
+
+    @property
+    def duration(self) -> float:
+        return self.index['duration']
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.index['width'] * self.index['height'] * 3
+
+    @property
+    def keyframes(self) -> Optional[List[float]]:
+        """Keyframe timestamps, or None when seeks go through the container index"""
+        if self._keyframes is None and self.index_dir is not None:
+            self._keyframes = load_index(self.path, self.index_dir)['keyframes']
+        return self._keyframes
+
+    def keyframe_before(self, t: float) -> float:
+        keyframes = self.keyframes or [0.0]
+        return keyframes[max(0, bisect_right(keyframes, t + 1e-6) - 1)]
+
+    def _seek_args(self, t: float) -> List[str]:
+        """Input arguments positioning the decoder at time t"""
+        if self.keyframes is None:
+            # ffmpeg seeks to the preceding keyframe itself and decodes up to t
+            return ['-ss', f"{t:.6f}", '-i', str(self.path)]
+        keyframe = self.keyframe_before(t)
+        return ['-ss', f"{keyframe:.6f}", '-i', str(self.path), '-ss', f"{t - keyframe:.6f}"]
+
+    def get_frame(self, t: float) -> np.ndarray:
+        """
+        Decode the frame shown at time t
+
+        Returns:
+            np.ndarray: (height, width, 3) uint8 RGB
+        """
+        t = min(max(t, 0.0), max(self.duration - 1.0 / self.fps, 0.0))
+        result = subprocess.run(
+            [ffmpeg_exe(), '-nostdin', '-v', 'error'] + self._seek_args(t) +
+            ['-map', '0:v:0', '-frames:v', '1', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'],
+            capture_output=True, check=True
+        )
+        if len(result.stdout) < self.frame_bytes:
+            raise ValueError(f"No frame at {t:.3f}s in {self.path.name}")
+        width, height = self.size
+        return np.frombuffer(result.stdout[:self.frame_bytes], dtype=np.uint8).reshape(height, width, 3)
+
+    def iter_frames(self, start: float = 0.0, end: Optional[float] = None,
+                    prefetch: int = 8) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode frames in order on a background thread
+
+        Args:
+            start: First timestamp
+            end: Stop before this timestamp (end of video if None)
+            prefetch: Decoded frames buffered ahead of the consumer
+
+        Yields:
+            (t, frame): Timestamp and read-only (height, width, 3) uint8 RGB frame
+        """
+        command = [ffmpeg_exe(), '-nostdin', '-v', 'error']
+        if start > 0:
+            command += self._seek_args(start)
+        else:
+            command += ['-i', str(self.path)]
+        if end is not None:
+            command += ['-t', f"{end - start:.6f}"]
+        command += ['-map', '0:v:0', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stdin=subprocess.DEVNULL)
+        frames = queue.Queue(maxsize=max(1, prefetch))
+        stop = threading.Event()
+        width, height = self.size
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def decode():
+            try:
+                n = 0
+                while not stop.is_set():
+                    data = process.stdout.read(self.frame_bytes)
+                    if len(data) < self.frame_bytes:
+                        break
+                    frame = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+                    if not put((start + n / self.fps, frame)):
+                        return
+                    n += 1
+            except BaseException as e:
+                put(e)
+                return
+            put(_END)
+
+        reader = threading.Thread(target=decode, name=f"decode-{self.path.name}", daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed decoding {self.path.name} (exit {process.returncode})")
+        finally:
+            stop.set()
+            process.kill()
+            process.wait()
+            process.stdout.close()
+            reader.join()
@@ -0,0 +1,253 @@
+"""
+Glyph atlas renderer - rasterize each glyph once, compose subtitle lines with NumPy
+
+create_subtitle_image() used to rasterize the full string through FreeType
+once per outline offset ((2 * stroke + 1)^2 times per segment). Chinese
+subtitles reuse the same few thousand glyphs across segments and videos, so
+the atlas keeps one coverage mask per (font, size, glyph, sub-pixel phase)
+and builds a line by placing those masks at their advances. The outline and
+fill are then applied to the line mask with the same integer blend PIL uses
+when drawing text onto an RGBA image, so output matches the PIL path.
+
+Text that needs real shaping (kerned pairs, ligatures, combining marks, RTL or
+Indic scripts, missing glyphs) returns None and is rendered by PIL instead.
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageFont
+
+# Sub-pixel pen positions per pixel; PIL renders each glyph at its exact fractional offset
+SUBPIXEL_PHASES = 4
+
+# Scripts whose glyphs change with context: hand them to PIL (and raqm when available)
+_COMPLEX_RANGES = (
+    (0x0590, 0x08FF),    # Hebrew, Arabic, Syriac, Thaana, NKo
+    (0x0900, 0x0DFF),    # Indic
+    (0x0E00, 0x0EFF),    # Thai, Lao
+    (0x0F00, 0x109F),    # Tibetan, Myanmar
+    (0x1780, 0x17FF),    # Khmer
+    (0x1100, 0x11FF),    # Hangul Jamo (conjoining)
+    (0xFB1D, 0xFDFF),    # Hebrew/Arabic presentation forms
+    (0xFE70, 0xFEFF),    # Arabic presentation forms B
+)
+
+Glyph = Tuple[np.ndarray, int, int]
+
+
+def needs_shaping(text: str) -> bool:
+    """True if text cannot be laid out as a plain sequence of advances"""
+    for ch in text:
+        code = ord(ch)
+        if unicodedata.combining(ch) or unicodedata.category(ch) in ('Mn', 'Me', 'Cf'):
+            return True
+        if 0xD800 <= code <= 0xDFFF or 0xFE00 <= code <= 0xFE0F:
+            return True
+        if any(lo <= code <= hi for lo, hi in _COMPLEX_RANGES):
+            return True
+    return False
+
+
+def _div255(value: np.ndarray) -> np.ndarray:
+    tmp = value + 128
+    return (tmp + (tmp >> 8)) >> 8
+
+
+def _blend(dst: np.ndarray, mask: np.ndarray, ink: Tuple[int, int, int, int]):
+    """
+    Draw ink through a coverage mask onto RGBA pixels, exactly as PIL does for text
+
+    Alpha is blended by the mask; colour channels take the ink outright where
+    the pixel was fully transparent, so ink over transparency keeps its colour.
+
+    Args:
+        dst: uint8 (h, w, 4) view, updated in place
+        mask: uint8 (h, w) coverage
+        ink: RGBA ink
+    """
+    m = mask.astype(np.uint32)
+    alpha = dst[..., 3].astype(np.uint32)
+    colour_mask = np.where((m != 0) & (alpha == 0), 255, m)
+    for channel in range(3):
+        dst[..., channel] = _div255(dst[..., channel] * (255 - colour_mask) + ink[channel] * colour_mask)
+    dst[..., 3] = _div255(alpha * (255 - m) + ink[3] * m)
+
+
+class GlyphAtlas:
+    """
+    Cached glyph masks of one font at one size.
+
+    Each glyph is rasterized once per sub-pixel phase; lines are laid out
+    from cached advances and composed into a single coverage mask.
+    """
+
+    def __init__(self, font_path: str, font_size: int, phases: int = SUBPIXEL_PHASES):
+        from utils.subtitle_renderer import load_font
+
+        self.font_path = font_path
+        self.font_size = font_size
+        self.phases = phases
+        self.font = load_font(font_path, font_size)
+        self._glyphs: Dict[Tuple[str, int], Glyph] = {}
+        self._advances: Dict[str, float] = {}
+        self._missing: Dict[str, bool] = {}
+        self._kerned: Dict[Tuple[str, str], bool] = {}
+        self._lock = threading.Lock()
+        self._notdef = None
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def advance(self, ch: str) -> float:
+        value = self._advances.get(ch)
+        if value is None:
+            value = self._advances[ch] = self.font.getlength(ch)
+        return value
+
+    def glyph(self, ch: str, phase: int) -> Glyph:
+        """(coverage mask, x offset, y offset) of ch drawn at pen x + phase / phases"""
+        key = (ch, phase)
+        cached = self._glyphs.get(key)
+        if cached is None:
+            with self._lock:
+                core_mask, (dx, dy) = self.font.getmask2(ch, mode='L', anchor='la',
+                                                         start=(phase / self.phases, 0))
+                width, height = core_mask.size
+                mask = np.asarray(Image.frombytes('L', (width, height), bytes(core_mask)))
+                cached = self._glyphs[key] = (mask, dx, dy)
+        return cached
+
+    def is_missing(self, ch: str) -> bool:
+        """True if the font has no glyph for ch (PIL would draw .notdef)"""
+        missing = self._missing.get(ch)
+        if missing is None:
+            if self._notdef is None:
+                self._notdef = bytes(self.font.getmask('￿', mode='L'))
+            missing = self._missing[ch] = (not ch.isspace() and
+                                           bytes(self.font.getmask(ch, mode='L')) == self._notdef)
+        return missing
+
+    def kerned(self, first: str, second: str) -> bool:
+        """True if PIL places the pair differently from the sum of the two advances (kerning, ligature)"""
+        key = (first, second)
+        value = self._kerned.get(key)
+        if value is None:
+            shaped = self.font.getlength(first + second)
+            value = self._kerned[key] = abs(shaped - self.advance(first) - self.advance(second)) > 0.01
+        return value
+
+    def layout(self, text: str) -> Optional[Tuple[np.ndarray, int, int]]:
+        """
+        Compose text into one coverage mask
+
+        Returns:
+            (mask, x offset, y offset) relative to the 'la' anchor, or None if the
+            text needs PIL (shaping, kerning or missing glyphs)
+        """
+        if not text or needs_shaping(text):
+            return None
+        if any(self.is_missing(ch) for ch in set(text)):
+            return None
+        # Every glyph must sit where PIL puts it: one kerned pair moves the rest of the line
+        if any(self.kerned(a, b) for a, b in zip(text, text[1:])):
+            return None
+
+        pen = 0.0
+        placed = []
+        for ch in text:
+            pen_int = int(pen)
+            phase = int(round((pen - pen_int) * self.phases))
+            if phase == self.phases:
+                pen_int, phase = pen_int + 1, 0
+            mask, dx, dy = self.glyph(ch, phase)
+            if mask.size:
+                placed.append((mask, pen_int + dx, dy))
+            pen += self.advance(ch)
+
+        # Backstop for shaping that spans more than two glyphs
+        if abs(self.font.getlength(text) - pen) > 0.5:
+            return None
+        if not placed:
+            return np.zeros((0, 0), dtype=np.uint8), 0, 0
+
+        left = min(x for _, x, _ in placed)
+        top = min(y for _, _, y in placed)
+        right = max(x + m.shape[1] for m, x, _ in placed)
+        bottom = max(y + m.shape[0] for m, _, y in placed)
+        line = np.zeros((bottom - top, right - left), dtype=np.uint8)
+        for mask, x, y in placed:
+            h, w = mask.shape
+            region = line[y - top:y - top + h, x - left:x - left + w]
+            np.maximum(region, mask, out=region)
+        return line, left, top
+
+
+def _draw_mask(canvas: np.ndarray, mask: np.ndarray, x: int, y: int, ink: Tuple[int, int, int, int]):
+    """Blend ink through mask into canvas at (x, y), clipped to the canvas"""
+    height, width = canvas.shape[:2]
+    h, w = mask.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, width), min(y + h, height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    sub = mask[y0 - y:y1 - y, x0 - x:x1 - x]
+    _blend(canvas[y0:y1, x0:x1], sub, ink)
+
+
+_ATLASES: Dict[Tuple[str, int], GlyphAtlas] = {}
+_ATLASES_LOCK = threading.Lock()
+
+
+def get_atlas(font_path: str, font_size: int) -> GlyphAtlas:
+    """Shared atlas per (font, size)"""
+    key = (font_path, font_size)
+    with _ATLASES_LOCK:
+        atlas = _ATLASES.get(key)
+        if atlas is None:
+            atlas = _ATLASES[key] = GlyphAtlas(font_path, font_size)
+        return atlas
+
+
+def atlas_stats() -> Dict[str, int]:
+    """Number of atlases and cached glyph rasters"""
+    with _ATLASES_LOCK:
+        return {'atlases': len(_ATLASES), 'glyphs': sum(len(a) for a in _ATLASES.values())}
+
+
+def render_subtitle_image(text: str, width: int, height: int, font_size: int,
+                          stroke_width: int, font_path: str) -> Optional[Image.Image]:
+    """
+    Atlas version of create_subtitle_image()
+
+    Same placement as the PIL path: centered by the text bbox, black outline
+    drawn at every offset within stroke_width, white fill on top.
+
+    Returns:
+        RGBA image, or None when the text must be rendered by PIL
+    """
+    try:
+        atlas = get_atlas(font_path, font_size)
+    except OSError:
+        return None
+    if not isinstance(atlas.font, ImageFont.FreeTypeFont):
+        return None
+    composed = atlas.layout(text)
+    if composed is None:
+        return None
+    line, left, top = composed
+
+    bbox = atlas.font.getbbox(text, anchor='la')
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    if line.size:
+        for adj_x in range(-stroke_width, stroke_width + 1):
+            for adj_y in range(-stroke_width, stroke_width + 1):
+                if adj_x != 0 or adj_y != 0:
+                    _draw_mask(canvas, line, x + adj_x + left, y + adj_y + top, (0, 0, 0, 255))
+        _draw_mask(canvas, line, x + left, y + top, (255, 255, 255, 255))
+    return Image.fromarray(canvas, 'RGBA')
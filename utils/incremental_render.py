@@ -0,0 +1,177 @@
+"""
+Incremental re-render: re-encode only the keyframe-aligned spans whose subtitles changed
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+from utils.artifact_store import artifact_key
+from utils.audio_buffer import ffmpeg_exe
+from utils.subtitle_renderer import RENDERER_VERSION
+
+# 2: keyframes are the render's actual keyframe timestamps
+MANIFEST_VERSION = 2
+
+Span = Tuple[float, float]
+
+
+def lineage_key(source_digest: str, parameters: Dict[str, Any]) -> str:
+    """Key of the latest render of a source with given parameters (any subtitles)"""
+    return artifact_key('render_lineage', source_digest, parameters, RENDERER_VERSION)
+
+
+def encode_params(fps: float, keyframe_interval: float) -> List[str]:
+    """
+    x264 settings giving a fixed keyframe grid and identical stream parameters,
+    so re-encoded spans can be concatenated with stream-copied ones
+    """
+    gop = max(1, round(fps * keyframe_interval))
+    return ['-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+            '-pix_fmt', 'yuv420p', '-video_track_timescale', '90000']
+
+
+def segment_tuples(segments: Sequence[Dict[str, Any]]) -> List[List[Any]]:
+    return [[round(float(seg['start']), 3), round(float(seg['end']), 3), seg['text']] for seg in segments]
+
+
+def make_manifest(video_key: str, segments, parameters: Dict[str, Any], duration: float,
+                  fps: float, keyframe_interval: float, keyframes: Sequence[float]) -> Dict[str, Any]:
+    """
+    Segment manifest stored alongside a render
+
+    Args:
+        keyframes: The render's actual keyframe timestamps (see utils.frame_source.scan_keyframes);
+                   stream copies must start exactly on one
+    """
+    return {
+        'version': MANIFEST_VERSION,
+        'video_key': video_key,
+        'segments': segment_tuples(segments),
+        'parameters': parameters,
+        'duration': duration,
+        'fps': fps,
+        'keyframe_interval': keyframe_interval,
+        'keyframes': list(keyframes)
+    }
+
+
+def changed_segments(old_segments: List[List[Any]], new_segments: List[List[Any]]) -> set:
+    """Segments that were added, removed or edited (old and new versions of an edit both count)"""
+    return {tuple(seg) for seg in old_segments} ^ {tuple(seg) for seg in new_segments}
+
+
+def changed_spans(changed: set) -> List[Span]:
+    """Time ranges covered by changed_segments()"""
+    return _merge(sorted((start, end) for start, end, _ in changed))
+
+
+def _merge(spans: List[Span]) -> List[Span]:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def align_to_keyframes(spans: List[Span], keyframes: List[float], duration: float) -> List[Span]:
+    """Widen spans to start on a keyframe and end on the next keyframe (or the end)"""
+    aligned = []
+    for start, end in spans:
+        a = max([k for k in keyframes if k <= start], default=0.0)
+        b = min([k for k in keyframes if k >= end], default=duration)
+        aligned.append((a, b))
+    return _merge(aligned)
+
+
+def plan_spans(dirty: List[Span], duration: float) -> List[Tuple[float, float, str]]:
+    """Cover [0, duration] with ('render' | 'copy') spans"""
+    plan = []
+    position = 0.0
+    for start, end in dirty:
+        if start > position:
+            plan.append((position, start, 'copy'))
+        plan.append((start, end, 'render'))
+        position = end
+    if position < duration:
+        plan.append((position, duration, 'copy'))
+    return plan
+
+
+def _run(command: List[str]):
+    subprocess.run(command, check=True, stdin=subprocess.DEVNULL)
+
+
+def copy_span(previous_video: Path, start: float, end: float, output_path: Path):
+    """Stream-copy [start, end) of the previous render (start is a keyframe)"""
+    _run([ffmpeg_exe(), '-v', 'error', '-y', '-ss', f"{start:.6f}", '-i', str(previous_video),
+          '-t', f"{end - start:.6f}", '-map', '0:v:0', '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+          str(output_path)])
+
+
+def concat_spans(parts: List[Path], audio_source: Path, output_path: Path, work_dir: Path):
+    """Join video spans losslessly and take the audio track unchanged from audio_source"""
+    list_path = work_dir / "concat.txt"
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for part in parts:
+            f.write(f"file '{part.resolve().as_posix()}'\n")
+    _run([ffmpeg_exe(), '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_path),
+          '-i', str(audio_source), '-map', '0:v:0', '-map', '1:a:0?', '-c', 'copy',
+          '-movflags', '+faststart', str(output_path)])
+
+
+def incremental_render(previous_video: Path, manifest: Dict[str, Any], segments,
+                       render_span: Callable[[float, float, Path], None], output_path: Path,
+                       work_dir: Path, max_fraction: float = 0.5) -> Optional[Dict[str, Any]]:
+    """
+    Build a new render from the previous one, re-encoding only changed spans
+
+    Args:
+        previous_video: Earlier render of the same source and parameters
+        manifest: make_manifest() of previous_video
+        segments: New subtitle segments
+        render_span: Encodes [start, end) of the source with the new subtitles to a path
+                     (using encode_params() so the streams match)
+        output_path: Where the new render goes
+        work_dir: Scratch directory for span files
+        max_fraction: Give up (return None) when more than this share of the video changed
+
+    Returns:
+        dict: Span statistics, or None if a full render is the better option
+    """
+    duration = manifest['duration']
+    changed = changed_segments(manifest['segments'], segment_tuples(segments))
+    dirty = align_to_keyframes(changed_spans(changed), manifest['keyframes'], duration)
+    dirty_seconds = sum(end - start for start, end in dirty)
+    if dirty_seconds > duration * max_fraction:
+        return None
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    parts = []
+    plan = plan_spans(dirty, duration)
+    try:
+        for i, (start, end, action) in enumerate(plan):
+            part = work_dir / f"span_{i:04d}.mp4"
+            if action == 'render':
+                render_span(start, end, part)
+            else:
+                copy_span(previous_video, start, end, part)
+            parts.append(part)
+        concat_spans(parts, previous_video, output_path, work_dir)
+    finally:
+        for part in parts:
+            part.unlink(missing_ok=True)
+        (work_dir / "concat.txt").unlink(missing_ok=True)
+        try:
+            work_dir.rmdir()
+        except OSError:
+            pass
+
+    return {
+        'changed_segments': len(changed),
+        'rendered_spans': sum(1 for *_, action in plan if action == 'render'),
+        'rendered_seconds': dirty_seconds,
+        'copied_seconds': duration - dirty_seconds
+    }
@@ -0,0 +1,276 @@
+"""
+Job queue for distributed batch runs: leases, heartbeats and idempotent results
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+# Job states
+QUEUED, LEASED, DONE, FAILED = 'queued', 'leased', 'done', 'failed'
+
+
+@dataclass
+class Lease:
+    """A job handed to one worker until lease_expires (renewed by heartbeats)"""
+    job_id: str
+    token: str
+    job: Dict[str, Any]
+    attempt: int
+    lease_expires: float
+
+
+class JobQueue(ABC):
+    """
+    Queue of batch jobs shared by many workers.
+
+    A leased job belongs to its worker until the lease expires; workers renew
+    it with heartbeat() while they run. Jobs whose worker stopped heartbeating
+    are leased again, up to max_attempts. complete() and fail() only succeed
+    with the current lease token, so a job gets exactly one published result
+    even when a presumed-dead worker finishes late.
+    """
+
+    @abstractmethod
+    def publish(self, jobs: Iterable[Dict[str, Any]], max_attempts: int = 3) -> int:
+        """
+        Add jobs (dicts with a unique 'id'); ids already in the queue are left alone
+
+        Returns:
+            int: Number of jobs added
+        """
+
+    @abstractmethod
+    def lease(self, worker: str, lease_s: float) -> Optional[Lease]:
+        """Take the oldest runnable job (queued, or leased with an expired lease), or None"""
+
+    @abstractmethod
+    def heartbeat(self, lease: Lease, lease_s: float) -> bool:
+        """Extend a lease; False if the job is no longer held with this token"""
+
+    @abstractmethod
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        """
+        Publish a job's result
+
+        Returns:
+            bool: True if this lease's result is the job's result (also on a
+                  repeated call with the same lease), False if the lease was lost
+        """
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        """Record a failure; the job is queued again while attempts remain and retry is set"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per state"""
+
+    @abstractmethod
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Job records (optionally of one state)"""
+
+    def close(self):
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    JobQueue in one SQLite file.
+
+    Every state change runs in an IMMEDIATE transaction, so worker processes
+    on the same machine (or a directory whose filesystem implements POSIX
+    locks correctly) can share the file. Network filesystems often do not;
+    use a server-backed queue across hosts.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], Any]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def publish(self, jobs: Iterable[Dict[str, Any]], max_attempts: int = 3) -> int:
+        now = time.time()
+        rows = [(job['id'], json.dumps(job, ensure_ascii=False), QUEUED, max_attempts, now + i * 1e-6, now)
+                for i, job in enumerate(jobs)]
+
+        def work(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (id, payload, status, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+
+        return self._transaction(work)
+
+    def lease(self, worker: str, lease_s: float) -> Optional[Lease]:
+        def work(conn):
+            now = time.time()
+            # Dead workers' jobs that have used up their attempts
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = 'lease expired on every attempt', updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, LEASED, now))
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY created_at LIMIT 1", (QUEUED, LEASED, now)).fetchone()
+            if row is None:
+                return None
+            job_id, payload, attempts = row
+            token = uuid.uuid4().hex
+            expires = now + lease_s
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_token = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (LEASED, worker, token, expires, now, job_id))
+            return Lease(job_id, token, json.loads(payload), attempts + 1, expires)
+
+        return self._transaction(work)
+
+    def heartbeat(self, lease: Lease, lease_s: float) -> bool:
+        def work(conn):
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = ?",
+                (now + lease_s, now, lease.job_id, lease.token, LEASED))
+            return cursor.rowcount == 1
+
+        held = self._transaction(work)
+        if held:
+            lease.lease_expires = time.time() + lease_s
+        return held
+
+    def _finish(self, lease: Lease, status: str, result, error) -> bool:
+        def work(conn):
+            # An expired lease nobody else picked up yet still counts
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = ?",
+                (status, result, error, time.time(), lease.job_id, lease.token, LEASED))
+            if cursor.rowcount == 1:
+                return True
+            # Repeated publication of the same result is a no-op success
+            row = conn.execute("SELECT status, lease_token FROM jobs WHERE id = ?",
+                               (lease.job_id,)).fetchone()
+            return row is not None and row[0] == status and row[1] == lease.token
+
+        return self._transaction(work)
+
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        return self._finish(lease, DONE, json.dumps(result, ensure_ascii=False), None)
+
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        def work(conn):
+            row = conn.execute("SELECT status, lease_token, attempts, max_attempts FROM jobs WHERE id = ?",
+                               (lease.job_id,)).fetchone()
+            if row is None or row[1] != lease.token:
+                return False
+            if row[0] != LEASED:
+                return row[0] in (QUEUED, FAILED)
+            status = QUEUED if retry and row[2] < row[3] else FAILED
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), lease.job_id))
+            return True
+
+        return self._transaction(work)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = ("SELECT id, payload, status, attempts, max_attempts, worker, lease_expires, result, error "
+                 "FROM jobs")
+        args = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", args).fetchall()
+        return [{
+            'id': row[0],
+            'job': json.loads(row[1]),
+            'status': row[2],
+            'attempts': row[3],
+            'max_attempts': row[4],
+            'worker': row[5],
+            'lease_expires': row[6],
+            'result': json.loads(row[7]) if row[7] else None,
+            'error': row[8]
+        } for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Queue URL scheme -> factory taking the rest of the URL
+BACKENDS: Dict[str, Callable[[str], JobQueue]] = {
+    'sqlite': lambda location: SQLiteJobQueue(Path(location)),
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], JobQueue]):
+    """Make another queue implementation available to open_queue()"""
+    BACKENDS[scheme] = factory
+
+
+def open_queue(url: str) -> JobQueue:
+    """
+    Open a queue from a URL
+
+    Args:
+        url: 'sqlite:///shared/dir/queue.db', or a bare path (SQLite)
+
+    Returns:
+        JobQueue
+    """
+    scheme, sep, location = url.partition('://')
+    if not sep:
+        scheme, location = 'sqlite', url
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown queue backend '{scheme}' (known: {sorted(BACKENDS)})")
+    return BACKENDS[scheme](location)
@@ -0,0 +1,176 @@
+"""
+Multi-target render: decode the source once, encode one subtitled output per language
+"""
+
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from utils.audio_buffer import ffmpeg_exe
+from utils.frame_source import FrameSource
+from utils.subtitle_renderer import create_subtitle_image
+
+# Subtitle strip height, as in GenerateVideoNode
+SUBTITLE_HEIGHT = 100
+
+# Sentinel closing an encoder's frame queue
+_END = object()
+
+
+class _Overlay:
+    """One segment's subtitle, cropped to its visible pixels and ready to blend"""
+
+    def __init__(self, segment: Dict[str, Any], image: np.ndarray, top: int):
+        self.start = segment['start']
+        self.end = segment['end']
+        alpha = image[..., 3]
+        rows = np.flatnonzero(alpha.any(axis=1))
+        cols = np.flatnonzero(alpha.any(axis=0))
+        if rows.size == 0:
+            self.rgb = None
+            return
+        y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        self.top = top + y0
+        self.left = x0
+        self.rgb = image[y0:y1, x0:x1, :3].astype(np.float32)
+        self.alpha = image[y0:y1, x0:x1, 3:].astype(np.float32) / 255.0
+
+    def apply(self, frame: np.ndarray):
+        """Alpha-blend onto a writable frame (clipped to the frame)"""
+        if self.rgb is None:
+            return
+        height = frame.shape[0]
+        bottom = min(self.top + self.rgb.shape[0], height)
+        if bottom <= self.top:
+            return
+        rows = bottom - self.top
+        region = frame[self.top:bottom, self.left:self.left + self.rgb.shape[1]]
+        alpha = self.alpha[:rows]
+        region[...] = (self.rgb[:rows] * alpha + region * (1.0 - alpha)).astype(np.uint8)
+
+
+def build_overlays(segments: Sequence[Dict[str, Any]], width: int, height: int,
+                   parameters: Dict[str, Any], font_path: Optional[str] = None) -> List[_Overlay]:
+    """Render every segment once at the given style, sorted by start time"""
+    top = int(height * parameters['position_pct'])
+    overlays = []
+    for segment in sorted(segments, key=lambda seg: seg['start']):
+        image = create_subtitle_image(
+            text=segment['text'],
+            width=width,
+            height=SUBTITLE_HEIGHT,
+            font_size=parameters['font_size'],
+            stroke_width=parameters['stroke_width'],
+            font_path=font_path or parameters['font_path']
+        )
+        overlays.append(_Overlay(segment, np.asarray(image), top))
+    return overlays
+
+
+class _Output:
+    """One language: overlays, an ffmpeg encoder and the thread feeding it"""
+
+    def __init__(self, language: str, overlays: List[_Overlay], path: Path, source_video: Path,
+                 width: int, height: int, fps: float, queue_size: int):
+        self.language = language
+        self.overlays = overlays
+        self.path = path
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self._cursor = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.process = subprocess.Popen(
+            [ffmpeg_exe(), '-v', 'error', '-y',
+             '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', f"{fps}", '-i', '-',
+             '-i', str(source_video), '-map', '0:v:0', '-map', '1:a:0?',
+             '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', str(path)],
+            stdin=subprocess.PIPE
+        )
+        self.thread = threading.Thread(target=self._run, name=f"encode-{language}", daemon=True)
+        self.thread.start()
+
+    def _active(self, t: float) -> List[_Overlay]:
+        while self._cursor < len(self.overlays) and self.overlays[self._cursor].end <= t:
+            self._cursor += 1
+        active = []
+        for overlay in self.overlays[self._cursor:]:
+            if overlay.start > t:
+                break
+            if overlay.end > t:
+                active.append(overlay)
+        return active
+
+    def _run(self):
+        try:
+            while True:
+                item = self.frames.get()
+                if item is _END:
+                    break
+                t, frame = item
+                active = self._active(t)
+                if active:
+                    frame = frame.copy()
+                    for overlay in active:
+                        overlay.apply(frame)
+                self.process.stdin.write(np.ascontiguousarray(frame).tobytes())
+        except Exception as e:
+            self.error = e
+            # Keep draining so the decoder never blocks on this output
+            while self.frames.get() is not _END:
+                pass
+        finally:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+
+def render_languages(source_video: Path, outputs: Dict[str, Dict[str, Any]],
+                     parameters: Dict[str, Any], queue_size: int = 8,
+                     index_dir: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Render several subtitle tracks of one source from a single decode pass
+
+    The source is decoded once; every frame is handed to one thread per
+    language that blends that language's subtitles and pipes the frame to its
+    own ffmpeg encoder, so the encoders run in parallel.
+
+    Args:
+        source_video: Video to subtitle
+        outputs: language -> {'segments': [...], 'path': Path, 'font_path': optional font}
+        parameters: Tuned style (font_size, stroke_width, position_pct, font_path)
+        queue_size: Frames buffered per encoder (and decoded ahead of them)
+        index_dir: Keyframe index cache (see utils.frame_source)
+
+    Returns:
+        dict: language -> output path
+    """
+    video = FrameSource(source_video, index_dir)
+    width, height = video.size
+    # Rendering subtitles can fail; do it before any encoder process or thread exists
+    overlays = {language: build_overlays(spec['segments'], width, height, parameters, spec.get('font_path'))
+                for language, spec in outputs.items()}
+    encoders = []
+    try:
+        for language, spec in outputs.items():
+            encoders.append(_Output(language, overlays[language], Path(spec['path']), source_video,
+                                    width, height, video.fps, queue_size))
+        for t, frame in video.iter_frames(prefetch=queue_size):
+            for encoder in encoders:
+                encoder.frames.put((t, frame))
+    finally:
+        for encoder in encoders:
+            encoder.frames.put(_END)
+        for encoder in encoders:
+            encoder.thread.join()
+            encoder.process.wait()
+
+    failed = [f"{e.language}: {e.error or f'ffmpeg exited with {e.process.returncode}'}"
+              for e in encoders if e.error or e.process.returncode != 0]
+    if failed:
+        raise RuntimeError(f"Multi-target render failed ({'; '.join(failed)})")
+    return {encoder.language: str(encoder.path) for encoder in encoders}
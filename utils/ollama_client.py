@@ -0,0 +1,377 @@
+"""
+Pooled keep-alive HTTP client for Ollama's /api/generate
+
+Responses are streamed so a stalled or crawling server is detected from
+time-to-first-token and tokens-per-second instead of waiting out the full
+timeout. Failed attempts are retried with jittered exponential backoff, and a
+circuit breaker short-circuits calls after repeated failures.
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Seconds allowed to open the TCP connection
+CONNECT_TIMEOUT = 5.0
+
+
+class OllamaError(Exception):
+    """Ollama returned an error status or an unusable response"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(OllamaError):
+    """The circuit breaker is open; the call was not attempted"""
+
+
+class DeadlineExceeded(OllamaError):
+    """The job deadline passed before or during the call"""
+
+
+class SlowResponseError(OllamaError):
+    """The stream started too late or produced tokens too slowly"""
+
+
+class Deadline:
+    """Absolute per-job time budget shared by every call of the job"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None for no deadline"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: float) -> float:
+        """Shorten a timeout so it does not run past the deadline"""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded("job deadline exceeded")
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_after` seconds one trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may be attempted now"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """The half-open trial ended without saying anything about the server; allow another"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            trial = self._trial_in_flight
+            self._trial_in_flight = False
+            # A failed half-open trial re-opens; stragglers of an open circuit do not extend it
+            if trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                print(f"🔌 Ollama circuit breaker open after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+
+class OllamaClient:
+    """Thread-safe client reusing pooled keep-alive connections"""
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 180,
+                 stream: bool = True, ttft_timeout: float = 30.0, min_tokens_per_s: float = 0.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            url: Ollama /api/generate URL
+            pool_size: Keep-alive connections kept open
+            timeout: Upper bound on one attempt in seconds
+            stream: Stream tokens and monitor time-to-first-token / throughput
+            ttft_timeout: Seconds to wait for the first token (and between tokens)
+            min_tokens_per_s: Abort an attempt that streams slower than this (0 = off)
+            max_retries: Extra attempts after a retryable failure
+            backoff_base: First backoff ceiling in seconds (doubles per retry)
+            backoff_max: Largest backoff ceiling
+            breaker: Circuit breaker (a default one if None)
+        """
+        self.url = url
+        self.timeout = timeout
+        self.stream = stream
+        self.ttft_timeout = ttft_timeout
+        self.min_tokens_per_s = min_tokens_per_s
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'failures': 0, 'retries': 0, 'short_circuited': 0,
+                       'ttft_total_s': 0.0, 'ttft_count': 0, 'tokens': 0, 'stream_s': 0.0}
+
+    def generate(self, model: str, prompt: str, options: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, deadline: Optional[Deadline] = None) -> str:
+        """
+        Run a generation with retries
+
+        Args:
+            model: Ollama model name
+            prompt: Prompt text
+            options: Sampling options
+            timeout: Per-attempt timeout in seconds (client default if None)
+            deadline: Job deadline capping every attempt and backoff
+
+        Returns:
+            str: Stripped response text
+
+        Raises:
+            CircuitOpenError: Breaker open, nothing was sent
+            DeadlineExceeded: Deadline passed
+            OllamaError: Non-retryable status, or the last attempt's failure
+            requests.RequestException: Connection errors and timeouts of the last attempt
+        """
+        deadline = deadline or Deadline()
+        attempt = 0
+        while True:
+            deadline.check()
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                raise CircuitOpenError("Ollama circuit breaker is open")
+
+            self._count('requests')
+            attempt_timeout = timeout or self.timeout
+            # A read timeout the job's deadline shortened says nothing about the server
+            read_timeout = min(attempt_timeout, self.ttft_timeout) if self.stream else attempt_timeout
+            capped = deadline.cap(read_timeout) < read_timeout
+            try:
+                text = self._attempt(model, prompt, options, attempt_timeout, deadline)
+            except Exception as e:
+                self._count('failures')
+                if self._server_failure(e, capped):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release_trial()
+                if attempt >= self.max_retries or not self._retryable(e):
+                    raise
+                delay = deadline.cap(self._backoff(attempt))
+                print(f"🔁 Ollama attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                self._count('retries')
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return text
+
+    def _attempt(self, model, prompt, options, timeout, deadline) -> str:
+        uncapped_timeout = timeout
+        timeout = deadline.cap(timeout)
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": self.stream,
+            "options": options or {}
+        }
+        if not self.stream:
+            response = self.session.post(self.url, json=payload, timeout=(CONNECT_TIMEOUT, timeout))
+            if response.status_code != 200:
+                raise OllamaError(f"HTTP {response.status_code}: {response.text}", response.status_code)
+            return response.json().get("response", "").strip()
+
+        # The read timeout bounds the wait for the first token and any later stall
+        read_timeout = min(timeout, self.ttft_timeout)
+        start = time.monotonic()
+        with self.session.post(self.url, json=payload, stream=True,
+                               timeout=(CONNECT_TIMEOUT, read_timeout)) as response:
+            if response.status_code != 200:
+                raise OllamaError(f"HTTP {response.status_code}: {response.text}", response.status_code)
+
+            parts = []
+            tokens = 0
+            first_token_at = None
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise OllamaError(chunk["error"])
+                now = time.monotonic()
+                if chunk.get("response"):
+                    if first_token_at is None:
+                        first_token_at = now
+                        self._record_ttft(now - start)
+                    parts.append(chunk["response"])
+                    tokens += 1
+                if chunk.get("done"):
+                    break
+
+                if now - start > timeout:
+                    deadline.check()
+                    if timeout < uncapped_timeout:
+                        raise DeadlineExceeded(f"job deadline cut the response off after {timeout:.0f}s")
+                    raise SlowResponseError(f"response exceeded {timeout:.0f}s")
+                streaming_for = now - (first_token_at or now)
+                if (self.min_tokens_per_s and streaming_for >= 2.0
+                        and tokens / streaming_for < self.min_tokens_per_s):
+                    raise SlowResponseError(f"{tokens / streaming_for:.1f} tokens/s is below "
+                                            f"{self.min_tokens_per_s} tokens/s")
+
+            if first_token_at is not None:
+                self._record_stream(tokens, time.monotonic() - first_token_at)
+        return "".join(parts).strip()
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            return False
+        if isinstance(error, OllamaError) and error.status is not None:
+            return error.status == 429 or error.status >= 500
+        return isinstance(error, (OllamaError, requests.RequestException, ValueError))
+
+    @staticmethod
+    def _server_failure(error: Exception, capped: bool) -> bool:
+        """
+        True if a failure points at an unhealthy server and counts towards the breaker
+
+        Connection errors, 5xx, 429, Ollama stream errors and slow responses count;
+        the caller's own deadline, deadline-capped read timeouts, 4xx and local
+        ValueErrors (e.g. a zero timeout) do not, since the client is shared across jobs.
+        """
+        if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            return False
+        if isinstance(error, OllamaError):
+            return error.status is None or error.status == 429 or error.status >= 500
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.Timeout):
+            return not capped
+        return isinstance(error, requests.ConnectionError)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^attempt)]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _count(self, key: str, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _record_ttft(self, seconds: float):
+        with self._stats_lock:
+            self._stats['ttft_total_s'] += seconds
+            self._stats['ttft_count'] += 1
+
+    def _record_stream(self, tokens: int, seconds: float):
+        with self._stats_lock:
+            self._stats['tokens'] += tokens
+            self._stats['stream_s'] += seconds
+
+    def counters(self) -> Dict[str, Any]:
+        """Raw counters, e.g. to pass to stats(since=...) later"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def stats(self, since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Request counters, mean time-to-first-token and streaming throughput
+
+        Args:
+            since: Earlier counters(); the result then covers only the calls after it
+        """
+        stats = self.counters()
+        if since is not None:
+            stats = {key: value - since.get(key, 0) for key, value in stats.items()}
+        ttft_count = stats.pop('ttft_count')
+        ttft_total = stats.pop('ttft_total_s')
+        stream_s = stats.pop('stream_s')
+        stats['avg_ttft_s'] = ttft_total / ttft_count if ttft_count else None
+        stats['tokens_per_s'] = stats['tokens'] / stream_s if stream_s else None
+        stats['breaker'] = self.breaker.state
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(url: str, pool_size: int = 8, timeout: float = 180, **policy) -> OllamaClient:
+    """
+    Return the shared client for an Ollama URL, creating it on first use
+
+    Args:
+        url: Ollama /api/generate URL
+        pool_size: Keep-alive connections
+        timeout: Per-attempt timeout
+        **policy: Streaming, retry and breaker settings (see OllamaClient)
+    """
+    key = (url, pool_size, timeout, tuple(sorted(policy.items())))
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            breaker = CircuitBreaker(policy.pop('breaker_failures', 5), policy.pop('breaker_reset_s', 30.0))
+            _CLIENTS[key] = OllamaClient(url, pool_size=pool_size, timeout=timeout, breaker=breaker, **policy)
+        return _CLIENTS[key]
+
+
+def close_clients():
+    """Close and forget every shared client (fresh connections and breakers on next use)"""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
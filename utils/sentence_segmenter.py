@@ -0,0 +1,177 @@
+"""
+Deterministic local sentence segmenter (replaces the LLM split round trip)
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple, Dict, Any
+
+# Lower-cased, without the trailing period
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "e.g", "i.e", "cf",
+    "inc", "ltd", "co", "corp", "llc", "dept", "univ", "approx", "est", "fig",
+    "vol", "pp", "ch", "sec", "min", "max", "avg", "ave", "blvd", "rd",
+    "hr", "hrs", "mins", "secs", "km", "kg", "lb", "lbs", "oz", "ft",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "a.m", "p.m", "u.s", "u.k", "u.n", "ph.d", "m.d", "b.a", "m.a",
+})
+
+# Abbreviations that also end sentences ("Wait 5 min. Then go."): a capitalized next word starts a new one
+SENTENCE_FINAL_ABBREVIATIONS = frozenset({
+    "etc", "inc", "ltd", "co", "corp", "llc", "jr", "sr",
+    "min", "mins", "max", "sec", "secs", "hr", "hrs", "avg", "approx", "est",
+    "km", "kg", "lb", "lbs", "oz", "ft",
+    "a.m", "p.m", "ave", "blvd", "rd", "st",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+# Abbreviations only before a number: "No. 5" (but "I said no. Then he left.")
+NUMERAL_ABBREVIATIONS = frozenset({"no", "nos"})
+
+_TERMINATORS = ".!?…。！？"
+_CLOSERS = "\"'”’)]}»」』"
+_OPENERS = "\"'“‘([{«「『¿¡"
+_WORD_BEFORE = re.compile(r"([\w.]+)$")
+_PREVIOUS_WORD = re.compile(r"(\w+)\W*$")
+
+
+def _is_abbreviation(text: str, dot: int) -> bool:
+    """True if the '.' at index dot ends an abbreviation or an initial"""
+    match = _WORD_BEFORE.search(text, 0, dot)
+    if not match:
+        return False
+    word = match.group(1).lower().strip('.')
+    if word in ABBREVIATIONS:
+        return True
+    # Single-letter initials: "J. Smith", "U.S."
+    return len(word) == 1 and word.isalpha()
+
+
+def _is_numeral_abbreviation(text: str, dot: int) -> bool:
+    match = _WORD_BEFORE.search(text, 0, dot)
+    return match is not None and match.group(1).lower().strip('.') in NUMERAL_ABBREVIATIONS
+
+
+def _is_boundary(text: str, end: int, terminator_start: int) -> bool:
+    """
+    Decide whether a terminator run text[terminator_start:end] ends a sentence
+
+    end points just past any closing quotes/brackets.
+    """
+    if end >= len(text):
+        return True
+    terminator = text[terminator_start:end].rstrip(_CLOSERS)
+    # CJK full stops need no following whitespace
+    if terminator[-1] in "。！？":
+        return True
+    if not text[end].isspace():
+        # "3.14", "example.com", "e.g.x"
+        return False
+
+    rest = text[end:].lstrip()
+    if not rest:
+        return True
+    following = rest[0]
+
+    if terminator == "." or terminator.endswith("..") or terminator == "…":
+        if terminator == "." and _is_abbreviation(text, terminator_start):
+            # "Dr. Smith", but some abbreviations can still end a sentence: "... etc. The"
+            match = _WORD_BEFORE.search(text, 0, terminator_start)
+            word = match.group(1).lower().strip('.')
+            if word == "st":
+                # "Main St. It is" ends a sentence, "St. Louis" / "visit St. Paul" does not
+                previous = _PREVIOUS_WORD.search(text, 0, match.start())
+                return following.isupper() and previous is not None and previous.group(1)[0].isupper()
+            return word in SENTENCE_FINAL_ABBREVIATIONS and following.isupper()
+        if terminator == "." and _is_numeral_abbreviation(text, terminator_start):
+            return not following.isdigit() and not following.islower()
+        # A lower-case continuation means it was not a sentence end ("... and then")
+        return not following.islower()
+    return not following.islower()
+
+
+def split_sentences(text: str, boundaries: Optional[Sequence[int]] = None,
+                    max_chars: int = 0) -> List[str]:
+    """
+    Split text into sentences without a model call
+
+    Handles abbreviations ("Dr.", "e.g."), initials, decimals ("3.5"), ellipses
+    and closing quotes/brackets after the terminator.
+
+    Args:
+        text: Source text
+        boundaries: Optional character offsets where Whisper segments end
+                    (see join_segments); used to break unpunctuated runs
+        max_chars: With boundaries, sentences longer than this are split at
+                   the segment boundaries inside them (0 = only when the text
+                   has no sentence punctuation at all)
+
+    Returns:
+        list: Sentences with surrounding whitespace stripped
+    """
+    spans = []
+    start = 0
+    i = 0
+    n = len(text)
+    while i < n:
+        if text[i] in _TERMINATORS:
+            run_start = i
+            while i < n and text[i] in _TERMINATORS:
+                i += 1
+            while i < n and text[i] in _CLOSERS:
+                i += 1
+            if _is_boundary(text, i, run_start):
+                spans.append((start, i))
+                start = i
+            continue
+        i += 1
+    if start < n:
+        spans.append((start, n))
+
+    if boundaries:
+        spans = _split_at_boundaries(text, spans, sorted(boundaries), max_chars)
+
+    sentences = [text[a:b].strip() for a, b in spans]
+    return [sentence for sentence in sentences if sentence]
+
+
+def _split_at_boundaries(text: str, spans: List[Tuple[int, int]], boundaries: List[int],
+                         max_chars: int) -> List[Tuple[int, int]]:
+    """Break long (or unpunctuated) spans at segment boundaries"""
+    unpunctuated = len(spans) <= 1
+    result = []
+    for a, b in spans:
+        if not (unpunctuated or (max_chars and b - a > max_chars)):
+            result.append((a, b))
+            continue
+        start = a
+        for offset in boundaries:
+            if start < offset < b and text[start:offset].strip():
+                result.append((start, offset))
+                start = offset
+        result.append((start, b))
+    return result
+
+
+def join_segments(segments: Sequence[Dict[str, Any]]) -> Tuple[str, List[int]]:
+    """
+    Join Whisper segments into one text and record where each segment ends
+
+    Args:
+        segments: Dicts with 'text'
+
+    Returns:
+        tuple: (joined text, end offset of every segment but the last)
+    """
+    parts = []
+    boundaries = []
+    length = 0
+    for segment in segments:
+        part = segment['text'].strip()
+        if not part:
+            continue
+        if parts:
+            boundaries.append(length)
+            length += 1
+        parts.append(part)
+        length += len(part)
+    return " ".join(parts), boundaries
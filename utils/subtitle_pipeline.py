@@ -0,0 +1,154 @@
+"""
+Streaming transcription -> translation pipeline
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
+
+from utils.translate_tools import estimate_tokens
+
+# Queue sentinel marking the end of the transcription stream
+_END = object()
+
+
+class _StageError:
+    """Wraps an exception raised in a background stage so the consumer can re-raise it"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def stream_translated_segments(segments: Iterable[Dict[str, Any]],
+                               translate_fn: Callable[[str], str],
+                               queue_size: int = 8,
+                               concurrency: int = 1,
+                               instrumentation=None,
+                               batch_translate_fn: Optional[Callable[[List[str]], List[str]]] = None,
+                               batch_token_budget: int = 600,
+                               batch_max_segments: int = 30,
+                               batch_max_wait_s: float = 2.0) -> Iterator[Dict[str, Any]]:
+    """
+    Translate segments while transcription is still running
+
+    A background thread drains the (lazy) Whisper segment iterator into a
+    bounded queue; segments are translated as they arrive, so transcription of
+    segment k+1 overlaps translation of segment k. Up to `concurrency`
+    translations run at once and results are yielded in segment order.
+
+    With batch_translate_fn, consecutive segments are grouped into one request
+    until the token budget or segment limit is reached, or until the oldest
+    buffered segment has waited batch_max_wait_s.
+
+    Args:
+        segments: Iterable of dicts with 'start', 'end', 'text' (e.g. whisper_tools.iter_segments)
+        translate_fn: Function translating one source string
+        queue_size: Maximum transcribed segments waiting for translation
+        concurrency: Maximum translations in flight
+        instrumentation: Optional Instrumentation recording 'whisper' and 'translate' stages
+        batch_translate_fn: Function translating a list of consecutive strings (enables batching)
+        batch_token_budget: Estimated source tokens per batch
+        batch_max_segments: Upper bound on segments per batch
+        batch_max_wait_s: Flush a partial batch once its first segment waited this long
+
+    Yields:
+        dict: Segment with 'text' translated and the source kept in 'original_text'
+    """
+    transcribed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def stage(name, **args):
+        return instrumentation.stage(name, **args) if instrumentation else nullcontext()
+
+    def produce():
+        try:
+            with stage('whisper'):
+                for segment in segments:
+                    if not _put(transcribed, segment, stop):
+                        return
+        except BaseException as e:
+            _put(transcribed, _StageError(e), stop)
+            return
+        _put(transcribed, _END, stop)
+
+    producer = threading.Thread(target=produce, name="whisper-producer", daemon=True)
+    producer.start()
+
+    def translate(index, items):
+        texts = [item['text'] for item in items]
+        with stage('translate', segment=index, count=len(items)):
+            if batch_translate_fn is not None:
+                translations = batch_translate_fn(texts)
+            else:
+                translations = [translate_fn(texts[0])]
+        return [dict(item, text=translated, original_text=source)
+                for item, translated, source in zip(items, translations, texts)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="translate") as pool:
+            pending = deque()
+            batch = []
+            batch_tokens = 0
+            batch_started = 0.0
+            index = 0
+
+            def flush():
+                nonlocal batch, batch_tokens
+                pending.append(pool.submit(translate, index - len(batch) + 1, batch))
+                batch = []
+                batch_tokens = 0
+
+            while True:
+                try:
+                    item = transcribed.get(timeout=0.05)
+                except queue.Empty:
+                    if batch and time.monotonic() - batch_started >= batch_max_wait_s:
+                        flush()
+                    # Whisper is still working: hand out translations that already finished
+                    while pending and pending[0].done():
+                        yield from pending.popleft().result()
+                    continue
+                if item is _END:
+                    break
+                if isinstance(item, _StageError):
+                    raise item.error
+
+                if batch_translate_fn is not None:
+                    cost = estimate_tokens(item['text']) + 2
+                    if batch and (batch_tokens + cost > batch_token_budget or len(batch) >= batch_max_segments):
+                        flush()
+                    if not batch:
+                        batch_started = time.monotonic()
+                    index += 1
+                    batch.append(item)
+                    batch_tokens += cost
+                else:
+                    index += 1
+                    pending.append(pool.submit(translate, index, [item]))
+
+                # Emit finished translations in order; block only when the window is full
+                while pending and (len(pending) >= concurrency or pending[0].done()):
+                    yield from pending.popleft().result()
+
+            if batch:
+                flush()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        # Unblocks the producer if the consumer stops early
+        stop.set()
@@ -2,12 +2,22 @@
 Utility functions for subtitle rendering
 """
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
+# Bump whenever rendering output changes so cached renders are not reused
+RENDERER_VERSION = "2"
+
+
+@lru_cache(maxsize=64)
+def load_font(font_path: str, font_size: int):
+    """Load a TrueType font once per (path, size) and keep it warm"""
+    return ImageFont.truetype(font_path, font_size)
+
 
 def create_subtitle_image(text: str, width: int, height: int, 
                          font_size: int, stroke_width: int, 
-                         font_path: str) -> Image.Image:
+                         font_path: str, use_atlas: bool = True) -> Image.Image:
     """
     Create PIL image with Chinese subtitle
     
@@ -18,17 +28,25 @@ def create_subtitle_image(text: str, width: int, height: int,
         font_size: Font size in pixels
         stroke_width: Outline thickness
         font_path: Path to font file
+        use_atlas: Compose from cached glyphs (utils.glyph_atlas); text that
+                   needs shaping is still drawn by PIL below
     
     Returns:
         PIL Image with subtitle
     """
+    if use_atlas:
+        from utils.glyph_atlas import render_subtitle_image
+        img = render_subtitle_image(text, width, height, font_size, stroke_width, font_path)
+        if img is not None:
+            return img
+
     # Create transparent image
     img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
     # Load font
     try:
-        font = ImageFont.truetype(font_path, font_size)
+        font = load_font(font_path, font_size)
     except Exception as e:
         print(f"⚠️  Font load error: {e}, using default")
         font = ImageFont.load_default()
@@ -0,0 +1,149 @@
+"""
+Persistent transcript cache keyed by decoded audio content and Whisper settings
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Bump when the segment format or stitching logic changes
+CACHE_VERSION = "1"
+
+
+def audio_digest(audio) -> str:
+    """Hex SHA-256 digest of decoded audio samples"""
+    return hashlib.sha256(memoryview(audio).cast('B')).hexdigest()
+
+
+def _audio_prefix(digest: str) -> str:
+    """Leading part of an audio digest used in entry file names"""
+    return digest[:16]
+
+
+class TranscriptCache:
+    """
+    On-disk cache of Whisper segment lists.
+
+    Entries are keyed by (decoded audio hash, model, language, decoding
+    options). Storing a new entry for the same audio drops entries made with
+    other settings, so changed settings invalidate the old transcript.
+    Entry files are named <audio prefix>-<key hash>.json, so finding the
+    entries of one audio is a filename glob rather than a read of every entry.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.stats_path = self.cache_dir / "stats.json"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, digest: str, language: str, options: Dict[str, Any]) -> str:
+        """
+        Build the cache key
+
+        Args:
+            digest: audio_digest() of the decoded samples
+            language: Transcription language
+            options: Model and decoding settings that affect the output
+
+        Returns:
+            str: '<audio prefix>-<hash>', also the entry's file name
+        """
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'audio': digest,
+            'language': language,
+            'options': options
+        }, sort_keys=True)
+        return f"{_audio_prefix(digest)}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached segments, or None on a miss"""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return entry['segments']
+
+    def put(self, key: str, digest: str, language: str, options: Dict[str, Any],
+            segments: List[Dict[str, Any]]):
+        """Store segments and drop entries for the same audio made with other settings"""
+        self.invalidate(digest, keep=key)
+
+        entry = {
+            'audio': digest,
+            'language': language,
+            'options': options,
+            'segments': segments
+        }
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, digest: str, keep: Optional[str] = None) -> int:
+        """
+        Remove every entry for the given audio
+
+        Args:
+            digest: audio_digest() of the audio to invalidate
+            keep: Key to preserve (the entry about to be written)
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        for path in self.cache_dir.glob(f"{_audio_prefix(digest)}-*.json"):
+            if path.stem == keep:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def clear(self):
+        """Remove all entries and statistics"""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counts for this process and across all runs"""
+        lifetime = self._load_stats()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'lifetime_hits': lifetime['hits'],
+            'lifetime_misses': lifetime['misses']
+        }
+
+    def _load_stats(self) -> Dict[str, int]:
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'hits': 0, 'misses': 0}
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            lifetime = self._load_stats()
+            lifetime['hits' if hit else 'misses'] += 1
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump(lifetime, f)
@@ -1,23 +1,152 @@
-import requests
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from config import DEFAULT_CONFIG
+from utils.ollama_client import get_client
+from utils.sentence_segmenter import split_sentences
+from utils.translation_memory import get_memory, prompt_fingerprint
 
-def translate_text(text):
+
+# Segments that ended in _get_fallback_translation (model output unusable or unavailable)
+_FALLBACKS = 0
+_FALLBACKS_LOCK = threading.Lock()
+
+# "3. text", "3) text", "3、text", "3：text"
+_NUMBERED_LINE = re.compile(r'^\s*(\d+)\s*[.)、:：]\s*(.*?)\s*$')
+
+# Multi-target mode: one task per (unit, language), sharing the Ollama connection pool
+_FANOUT_POOLS = {}
+_FANOUT_LOCK = threading.Lock()
+
+
+def _client(config=None):
+    """Shared pooled Ollama client for a config's URL and policy, sized for its concurrency"""
+    config = config or DEFAULT_CONFIG
+    return get_client(config.ollama_url,
+                      pool_size=config.translation_concurrency,
+                      timeout=config.translation_timeout_s,
+                      stream=config.ollama_stream,
+                      ttft_timeout=config.ollama_ttft_timeout_s,
+                      min_tokens_per_s=config.ollama_min_tokens_per_s,
+                      max_retries=config.ollama_max_retries,
+                      backoff_base=config.ollama_backoff_base_s,
+                      backoff_max=config.ollama_backoff_max_s,
+                      breaker_failures=config.ollama_breaker_failures,
+                      breaker_reset_s=config.ollama_breaker_reset_s)
+
+
+def client_counters(config=None):
+    """Raw request counters of config's client, for client_stats(since=...)"""
+    return _client(config).counters()
+
+
+def client_stats(config=None, since=None):
+    """Ollama request counters, latency and circuit breaker state (of config's client, after `since`)"""
+    return _client(config).stats(since)
+
+
+def fallback_count():
+    """Number of translations served by the fallback since start (or the last reset)"""
+    return _FALLBACKS
+
+
+def reset_fallback_count():
+    global _FALLBACKS
+    with _FALLBACKS_LOCK:
+        _FALLBACKS = 0
+
+
+def _memory(config=None):
+    """Shared translation memory of a config, or None when disabled"""
+    config = config or DEFAULT_CONFIG
+    if not config.use_translation_memory:
+        return None
+    path = Path(config.translation_memory_path)
+    if not path.is_absolute():
+        path = Path(__file__).parent.parent / path
+    return get_memory(path, fuzzy=config.translation_memory_fuzzy)
+
+
+def _segment_prompt(target_language=None, config=None):
+    config = config or DEFAULT_CONFIG
+    return prompt_fingerprint(config.translation_prompt_template, config.translation_instruction,
+                              config.source_language, target_language or config.target_language)
+
+
+def _batch_prompt(target_language=None, config=None):
+    config = config or DEFAULT_CONFIG
+    return prompt_fingerprint(config.batch_translation_prompt_template,
+                              config.batch_translation_instruction,
+                              config.source_language, target_language or config.target_language)
+
+
+def _instruction(instruction, target_language):
+    """Instructions may name the language as {target_language}"""
+    return instruction.replace('{target_language}', target_language)
+
+
+def memory_stats(config=None):
+    """Translation memory hit/miss counts, or None when disabled"""
+    memory = _memory(config)
+    return memory.stats() if memory else None
+
+
+def _has_chinese(text):
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+
+def _in_target_script(text, target_language):
+    """Whether text is written in the script of the target language (CJK targets only)"""
+    language = target_language.lower()
+    if 'japanese' in language:
+        return _has_chinese(text) or any('\u3040' <= char <= '\u30ff' for char in text)
+    if 'korean' in language:
+        return any('\uac00' <= char <= '\ud7a3' for char in text)
+    if 'chinese' in language:
+        return _has_chinese(text)
+    return any(char.isalpha() for char in text)
+
+
+def estimate_tokens(text):
+    """Rough token count: one per CJK character, one per ~4 other characters"""
+    cjk = sum(1 for char in text if '\u4e00' <= char <= '\u9fff')
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def translate_text(text, deadline=None, target_language=None, config=None):
+    """
+    Translate one text, splitting long text into sentence chunks
+    
+    Args:
+        text: Source string
+        deadline: Optional ollama_client.Deadline shared by every request
+        target_language: Language to translate into (config.target_language if None)
+        config: AgentConfig with translation settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        str: Translation (fallback text if the model output was unusable)
+    """
+    config = config or DEFAULT_CONFIG
+    target_language = target_language or config.target_language
     try:
         # Handle long text by splitting into smaller chunks to avoid timeout
-        MAX_CHUNK_SIZE = DEFAULT_CONFIG.max_chunk_size
+        MAX_CHUNK_SIZE = config.max_chunk_size
         
         print(f"Total text length: {len(text)} characters")
         
         # If text is short enough, translate directly
         if len(text) <= MAX_CHUNK_SIZE:
             print(f"📝 Text is short, translating directly...")
-            return _translate_single_chunk(text)
+            return _translate_single_chunk(text, deadline, target_language, config)
         
-        # For long text, split by sentences using LLM and translate in chunks
-        print(f"Text is long, splitting into sentences using LLM...")
-
-        sentences = _split_text_into_sentences(text)
+        # For long text, split by sentences and translate in chunks
+        if config.use_llm_sentence_splitting:
+            print(f"Text is long, splitting into sentences using LLM...")
+            sentences = _split_text_into_sentences(text, deadline, config)
+        else:
+            sentences = split_sentences(text)
+            print(f"Text is long, split locally into {len(sentences)} sentences")
         
         translated_chunks = []
         current_chunk = ""
@@ -26,7 +155,7 @@ def translate_text(text):
             # If adding this sentence exceeds chunk size, translate current chunk first
             if len(current_chunk) + len(sentence) > MAX_CHUNK_SIZE and current_chunk:
                 print(f"📦 Translating chunk {len(translated_chunks) + 1} ({len(current_chunk)} chars)...")
-                chunk_result = _translate_single_chunk(current_chunk)
+                chunk_result = _translate_single_chunk(current_chunk, deadline, target_language, config)
                 translated_chunks.append(chunk_result)
                 current_chunk = sentence
             else:
@@ -35,7 +164,7 @@ def translate_text(text):
         # Translate remaining chunk
         if current_chunk:
             print(f"📦 Translating final chunk ({len(current_chunk)} chars)...")
-            chunk_result = _translate_single_chunk(current_chunk)
+            chunk_result = _translate_single_chunk(current_chunk, deadline, target_language, config)
             translated_chunks.append(chunk_result)
         
         # Combine all translated chunks
@@ -45,93 +174,294 @@ def translate_text(text):
             
     except Exception as e:
         print(f"⚠️ Translation failed: {e}")
-        return _get_fallback_translation(text)
+        return _get_fallback_translation(text, target_language, config)
+
+def translate_segments(texts, concurrency=None, mode=None, deadline=None, target_language=None, config=None):
+    """
+    Translate many short texts concurrently over pooled connections
+    
+    Args:
+        texts: Source strings
+        concurrency: Maximum requests in flight (translation_concurrency if None)
+        mode: "segment" (one request per text) or "batch" (translation_mode if None)
+        deadline: Optional ollama_client.Deadline shared by every request
+        target_language: Language to translate into (target_language if None)
+        config: AgentConfig with translation settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        list: Translations in the same order as texts
+    """
+    config = config or DEFAULT_CONFIG
+    concurrency = concurrency or config.translation_concurrency
+    mode = mode or config.translation_mode
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="translate") as pool:
+        if mode == "batch":
+            batches = pack_batches(texts, config=config)
+            translated = pool.map(lambda batch: translate_batch(batch, deadline, target_language, config), batches)
+            return [translation for batch in translated for translation in batch]
+        return list(pool.map(lambda text: translate_text(text, deadline, target_language, config), texts))
+
+
+def _fanout_pool(concurrency):
+    """Shared executor for multi-target translation, one per connection pool size"""
+    with _FANOUT_LOCK:
+        pool = _FANOUT_POOLS.get(concurrency)
+        if pool is None:
+            pool = _FANOUT_POOLS[concurrency] = ThreadPoolExecutor(max_workers=concurrency,
+                                                                   thread_name_prefix="translate-lang")
+        return pool
 
-def _split_text_into_sentences(text):
+
+def translate_text_multi(text, languages, deadline=None, config=None):
+    """
+    Translate one text into several languages concurrently
+    
+    Args:
+        text: Source string
+        languages: Target languages
+        deadline: Optional ollama_client.Deadline shared by every request
+        config: AgentConfig with translation settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        dict: language -> translation
+    """
+    config = config or DEFAULT_CONFIG
+    pool = _fanout_pool(config.translation_concurrency)
+    futures = {language: pool.submit(translate_text, text, deadline, language, config)
+               for language in languages}
+    return {language: future.result() for language, future in futures.items()}
+
+
+def translate_batch_multi(texts, languages, deadline=None, config=None):
+    """
+    Translate consecutive segments into several languages concurrently (one batch request per language)
+    
+    Returns:
+        list: One dict (language -> translation) per text
+    """
+    config = config or DEFAULT_CONFIG
+    pool = _fanout_pool(config.translation_concurrency)
+    futures = {language: pool.submit(translate_batch, texts, deadline, language, config)
+               for language in languages}
+    translated = {language: future.result() for language, future in futures.items()}
+    return [{language: translated[language][i] for language in languages} for i in range(len(texts))]
+
+
+def pack_batches(texts, token_budget=None, max_segments=None, config=None):
+    """
+    Group consecutive texts into batches that fit the prompt token budget
+    
+    Args:
+        texts: Source strings in order
+        token_budget: Estimated source tokens per batch (batch_token_budget if None)
+        max_segments: Upper bound on texts per batch (batch_max_segments if None)
+        config: AgentConfig with batching settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        list: Lists of consecutive texts
+    """
+    config = config or DEFAULT_CONFIG
+    token_budget = token_budget or config.batch_token_budget
+    max_segments = max_segments or config.batch_max_segments
+    
+    batches = []
+    current = []
+    used = 0
+    for text in texts:
+        cost = estimate_tokens(text) + 2  # numbering prefix
+        if current and (used + cost > token_budget or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            used = 0
+        current.append(text)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_numbered_lines(response, count):
+    """Map line number -> text for '<n>. text' lines; ambiguous numbers are dropped"""
+    parsed = {}
+    duplicates = set()
+    for line in response.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if not match:
+            continue
+        number = int(match.group(1))
+        if not 1 <= number <= count:
+            continue
+        if number in parsed:
+            duplicates.add(number)
+        parsed[number] = match.group(2)
+    for number in duplicates:
+        del parsed[number]
+    return parsed
+
+
+def translate_batch(texts, deadline=None, target_language=None, config=None):
+    """
+    Translate consecutive segments in one prompt as numbered lines
+    
+    Segments already in the translation memory are not sent. Segments whose
+    numbered line is missing, duplicated or not in the target script are
+    retried one by one with translate_text().
+    
+    Args:
+        texts: Consecutive source strings
+        deadline: Optional ollama_client.Deadline shared by every request
+        target_language: Language to translate into (target_language if None)
+        config: AgentConfig with translation settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        list: Translations in the same order as texts
+    """
+    config = config or DEFAULT_CONFIG
+    target_language = target_language or config.target_language
+    memory = _memory(config)
+    prompt_key = _batch_prompt(target_language, config)
+    model = config.translation_model
+    options = config.translation_options
+    
+    results = [None] * len(texts)
+    if memory:
+        for i, text in enumerate(texts):
+            results[i] = memory.get(text, model, prompt_key, options)
+    missing = [i for i, cached in enumerate(results) if cached is None]
+    if not missing:
+        print(f"💾 Batch of {len(texts)} segments served from translation memory")
+        return results
+    if len(missing) == 1:
+        results[missing[0]] = translate_text(texts[missing[0]], deadline, target_language, config)
+        return results
+    
+    pending = [texts[i] for i in missing]
+    lines = "\n".join(f"{i}. {' '.join(text.split())}" for i, text in enumerate(pending, 1))
+    prompt = config.batch_translation_prompt_template.format(
+        source_language=config.source_language,
+        target_language=target_language,
+        instruction=_instruction(config.batch_translation_instruction, target_language),
+        count=len(pending),
+        lines=lines
+    )
+    
+    try:
+        print(f"📦 Translating batch of {len(pending)} segments in one request...")
+        response = _client(config).generate(model, prompt, options, deadline=deadline)
+        parsed = _parse_numbered_lines(response, len(pending))
+    except Exception as e:
+        print(f"⚠️ Batch translation failed: {e}")
+        parsed = {}
+    
+    retried = 0
+    for number, (index, text) in enumerate(zip(missing, pending), 1):
+        translation = parsed.get(number)
+        if translation and _in_target_script(translation, target_language):
+            results[index] = translation
+            if memory:
+                memory.put(text, translation, model, prompt_key, options)
+        else:
+            retried += 1
+            results[index] = translate_text(text, deadline, target_language, config)
+    
+    if retried:
+        print(f"🔁 Retried {retried}/{len(pending)} misaligned segments individually")
+    else:
+        print(f"✅ Batch aligned: {len(pending)}/{len(pending)} segments")
+    return results
+
+def _split_text_into_sentences(text, deadline=None, config=None):
     """Split text into sentences using LLM for intelligent parsing"""
+    config = config or DEFAULT_CONFIG
     try:
-        split_prompt = DEFAULT_CONFIG.sentence_split_prompt_template.format(text=text)
-        
-        payload = {
-            "model": DEFAULT_CONFIG.translation_model,
-            "prompt": split_prompt,
-            "stream": False,
-            "options": DEFAULT_CONFIG.sentence_split_options
-        }
+        split_prompt = config.sentence_split_prompt_template.format(text=text)
         
         print(f"Using LLM to split text into sentences...")
         
-        response = requests.post(DEFAULT_CONFIG.ollama_url, json=payload, timeout=60)
+        split_result = _client(config).generate(
+            config.translation_model,
+            split_prompt,
+            config.sentence_split_options,
+            timeout=60,
+            deadline=deadline
+        )
         
-        if response.status_code == 200:
-            result = response.json()
-            split_result = result.get("response", "").strip()
-            
-            # Split by newlines and filter out empty lines
-            sentences = [line.strip() for line in split_result.split('\n') if line.strip()]
-            
-            if sentences and len(sentences) > 0:
-                print(f"✅ LLM split text into {len(sentences)} sentences")
-                return sentences
-            else:
-                print("⚠️ LLM splitting failed, falling back to simple split")
-                return [text]  # Return original text as single sentence
-                
+        # Split by newlines and filter out empty lines
+        sentences = [line.strip() for line in split_result.split('\n') if line.strip()]
+        
+        if sentences and len(sentences) > 0:
+            print(f"✅ LLM split text into {len(sentences)} sentences")
+            return sentences
         else:
-            print(f"⚠️ LLM splitting failed: HTTP {response.status_code}")
-            return [text]  # Fallback to original text
+            print("⚠️ LLM splitting failed, falling back to simple split")
+            return [text]  # Return original text as single sentence
             
     except Exception as e:
         print(f"⚠️ LLM sentence splitting error: {e}")
         # Fallback to regex sentence splitting
-        sentences = re.split(DEFAULT_CONFIG.sentence_split_fallback_pattern, text)
+        sentences = re.split(config.sentence_split_fallback_pattern, text)
         return sentences if sentences else [text]
 
-def _translate_single_chunk(text):
+def _translate_single_chunk(text, deadline=None, target_language=None, config=None):
     """Translate a single chunk of text using Ollama"""
+    config = config or DEFAULT_CONFIG
+    target_language = target_language or config.target_language
+    memory = _memory(config)
+    if memory:
+        cached = memory.get(text, config.translation_model, _segment_prompt(target_language, config),
+                            config.translation_options)
+        if cached is not None:
+            print(f"💾 Translation memory hit: {cached[:100]}")
+            return cached
+    
     try:
-        prompt = DEFAULT_CONFIG.translation_prompt_template.format(
-            source_language=DEFAULT_CONFIG.source_language,
-            target_language=DEFAULT_CONFIG.target_language,
-            instruction=DEFAULT_CONFIG.translation_instruction,
+        prompt = config.translation_prompt_template.format(
+            source_language=config.source_language,
+            target_language=target_language,
+            instruction=_instruction(config.translation_instruction, target_language),
             text=text
         )
         
-        payload = {
-            "model": DEFAULT_CONFIG.translation_model,
-            "prompt": prompt,
-            "stream": False,
-            "options": DEFAULT_CONFIG.translation_options
-        }
-        
-        print(f"🌐 Calling Ollama API at {DEFAULT_CONFIG.ollama_url}...")
+        print(f"🌐 Calling Ollama API at {config.ollama_url}...")
         print(f"📝 Text to translate (first 100 chars): {text[:100]}...")
         
-        response = requests.post(DEFAULT_CONFIG.ollama_url, json=payload, timeout=180)
+        translated_text = _client(config).generate(
+            config.translation_model,
+            prompt,
+            config.translation_options,
+            deadline=deadline
+        )
         
-        if response.status_code == 200:
-            result = response.json()
-            translated_text = result.get("response", "").strip()
-            
-            print(f" Translated text length: {len(translated_text)}")
-            
-            # Check if translation contains Chinese characters
-            has_chinese = any('\u4e00' <= char <= '\u9fff' for char in translated_text)
-            
-            if translated_text and len(translated_text.strip()) > 3 and has_chinese:
-                print(f"✅ Chunk translation successful: {translated_text[:100]}...")
-                return translated_text
-            else:
-                raise Exception(f"Invalid translation response: '{translated_text}' (has_chinese: {has_chinese})")
+        print(f" Translated text length: {len(translated_text)}")
+        
+        # Check if translation is written in the target script (Chinese characters by default)
+        in_script = _in_target_script(translated_text, target_language)
+        
+        if translated_text and len(translated_text.strip()) > 3 and in_script:
+            print(f"✅ Chunk translation successful: {translated_text[:100]}...")
+            # Only validated model output is remembered, never the fallback
+            if memory:
+                memory.put(text, translated_text, config.translation_model, _segment_prompt(target_language, config),
+                           config.translation_options)
+            return translated_text
         else:
-            raise Exception(f"HTTP {response.status_code}: {response.text}")
+            raise Exception(f"Invalid translation response: '{translated_text}' ({target_language} script: {in_script})")
             
     except Exception as e:
         print(f"⚠️ Chunk translation failed: {e}")
-        return _get_fallback_translation(text)
+        return _get_fallback_translation(text, target_language, config)
 
-def _get_fallback_translation(text):
+def _get_fallback_translation(text, target_language=None, config=None):
     """Provide fallback translation when Ollama fails"""
+    global _FALLBACKS
+    with _FALLBACKS_LOCK:
+        _FALLBACKS += 1
+    target_language = target_language or (config or DEFAULT_CONFIG).target_language
+    language = target_language.lower()
+    if 'chinese' not in language or 'traditional' in language:
+        # The canned phrases below are Simplified Chinese only; keep the source text
+        print(f"📝 No {target_language} fallback, keeping the source text...")
+        return text
     print("📝 Using fallback Chinese translation...")
     
     # Complete sentence translations (more accurate than word-by-word)
@@ -0,0 +1,167 @@
+"""
+Persistent translation memory (SQLite) keyed by source text, model, prompt and options
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Bump when normalization changes so old rows stop matching
+MEMORY_VERSION = "1"
+
+
+def normalize_text(text: str) -> str:
+    """Exact-match form: NFC with whitespace collapsed"""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+def loose_text(text: str) -> str:
+    """Fuzzy-match form: case-folded, punctuation removed, whitespace collapsed"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = "".join(" " if unicodedata.category(char).startswith('P') else char for char in text)
+    return " ".join(text.split())
+
+
+def prompt_fingerprint(*parts) -> str:
+    """Short hash of everything that shapes the prompt besides the source text"""
+    payload = json.dumps([MEMORY_VERSION, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """
+    SQLite store of previous translations.
+
+    Rows are keyed by (normalized source, model, prompt fingerprint, options).
+    Lookups try the exact normalized source first and, when fuzzy matching is
+    enabled, fall back to the punctuation/case-insensitive form. Safe to share
+    between threads; WAL mode lets several processes use the same file.
+    """
+
+    def __init__(self, path: Path, fuzzy: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fuzzy = fuzzy
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                source TEXT NOT NULL,
+                loose TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                options TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source, model, prompt, options)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS translations_loose ON translations (loose, model, prompt, options)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _options_key(options: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(options or {}, sort_keys=True)
+
+    def get(self, text: str, model: str, prompt: str,
+            options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Look up a stored translation
+
+        Args:
+            text: Source text
+            model: Translation model name
+            prompt: prompt_fingerprint() of the template and instructions
+            options: Sampling options
+
+        Returns:
+            str: Stored translation, or None on a miss
+        """
+        options_key = self._options_key(options)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rowid, translation FROM translations "
+                "WHERE source = ? AND model = ? AND prompt = ? AND options = ?",
+                (normalize_text(text), model, prompt, options_key)
+            ).fetchone()
+            fuzzy = False
+            if row is None and self.fuzzy:
+                row = self._conn.execute(
+                    "SELECT rowid, translation FROM translations "
+                    "WHERE loose = ? AND model = ? AND prompt = ? AND options = ? "
+                    "ORDER BY hits DESC LIMIT 1",
+                    (loose_text(text), model, prompt, options_key)
+                ).fetchone()
+                fuzzy = row is not None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE translations SET hits = hits + 1 WHERE rowid = ?", (row[0],))
+            self._conn.commit()
+            self.hits += 1
+            if fuzzy:
+                self.fuzzy_hits += 1
+            return row[1]
+
+    def put(self, text: str, translation: str, model: str, prompt: str,
+            options: Optional[Dict[str, Any]] = None):
+        """Store (or replace) the translation of a source text"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations "
+                "(source, loose, model, prompt, options, translation, hits, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                (normalize_text(text), loose_text(text), model, prompt,
+                 self._options_key(options), translation, time.time())
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every stored translation"""
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self.hits = self.fuzzy_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counts for this process and the number of stored entries"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'fuzzy_hits': self.fuzzy_hits,
+            'misses': self.misses,
+            'entries': entries
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_MEMORIES = {}
+_MEMORIES_LOCK = threading.Lock()
+
+
+def get_memory(path: Path, fuzzy: bool = False) -> TranslationMemory:
+    """Return the shared memory for a database path, opening it on first use"""
+    key = (str(Path(path).resolve()), fuzzy)
+    with _MEMORIES_LOCK:
+        if key not in _MEMORIES:
+            _MEMORIES[key] = TranslationMemory(path, fuzzy=fuzzy)
+        return _MEMORIES[key]
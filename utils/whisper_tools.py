@@ -1,42 +1,336 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from config import DEFAULT_CONFIG
+from utils.audio_buffer import AudioBuffer, SAMPLE_RATE, extract_audio
 
-def transcribe_audio(video_path):
+# Process-wide model registry: each configuration is loaded once and shared
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_model(model_size="base", device="cpu", compute_type="int8", cpu_threads=0, num_workers=1):
+    """
+    Return a shared WhisperModel, loading it on first use
+    
+    Args:
+        model_size: Whisper model name ("tiny", "base", "small", ...)
+        device: "cpu" or "cuda"
+        compute_type: CTranslate2 compute type ("int8" for quantized CPU inference)
+        cpu_threads: Intra-op threads (0 = CTranslate2 default)
+        num_workers: Parallel transcriptions the model can serve
+    
+    Returns:
+        WhisperModel: Cached model instance
+    """
+    key = (model_size, device, compute_type, cpu_threads, num_workers)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            print(f"🔧 Loading Whisper '{model_size}' ({device}, {compute_type}, "
+                  f"threads={cpu_threads or 'auto'}, workers={num_workers})...")
+            _MODELS[key] = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers
+            )
+        return _MODELS[key]
+
+
+def load_model(config=None):
+    """Return the shared Whisper model configured in AgentConfig"""
+    config = config or DEFAULT_CONFIG
+    return get_model(
+        config.whisper_model_size,
+        device=config.whisper_device,
+        compute_type=config.whisper_compute_type,
+        cpu_threads=config.whisper_cpu_threads,
+        num_workers=config.whisper_num_workers
+    )
+
+
+def transcribe_audio(video_path, model=None, config=None):
     """
     Transcribe audio from video and return full text
     
     Args:
         video_path: Path to video file
+        model: Preloaded WhisperModel (shared model from AgentConfig if None)
+        config: AgentConfig with Whisper settings (DEFAULT_CONFIG if None)
     
     Returns:
         str: Full transcribed text
     """
-    model = WhisperModel("base", device="cpu")
+    if model is None:
+        model = load_model(config)
     segments, _ = model.transcribe(video_path)
     text = " ".join([seg.text for seg in segments])
     return text.strip()
 
 
-def transcribe_with_timestamps(video_path, language="zh"):
+def iter_segments(video_path, language="zh", model=None, config=None):
     """
-    Transcribe audio from video and return segments with timestamps
+    Lazily transcribe audio, yielding each segment as soon as Whisper emits it
     
     Args:
-        video_path: Path to video file
+        video_path: Path to video file (or 16 kHz float32 samples)
         language: Language code (default: "zh" for Chinese)
+        model: Preloaded WhisperModel (shared model from AgentConfig if None)
+        config: AgentConfig with Whisper settings (DEFAULT_CONFIG if None)
     
-    Returns:
-        list: List of dicts with 'start', 'end', 'text' keys
+    Yields:
+        dict: Segment with 'start', 'end', 'text' keys
     """
-    model = WhisperModel("base", device="cpu")
+    if model is None:
+        model = load_model(config)
     segments, info = model.transcribe(video_path, language=language)
     
-    subtitle_segments = []
     for segment in segments:
-        subtitle_segments.append({
+        yield {
             'start': segment.start,
             'end': segment.end,
             'text': segment.text.strip()
-        })
+        }
+
+
+def transcribe_with_timestamps(video_path, language="zh", model=None, config=None):
+    """
+    Transcribe audio from video and return segments with timestamps
     
-    return subtitle_segments
+    Args:
+        video_path: Path to video file
+        language: Language code (default: "zh" for Chinese)
+        model: Preloaded WhisperModel (shared model from AgentConfig if None)
+        config: AgentConfig with Whisper settings (DEFAULT_CONFIG if None)
+    
+    Returns:
+        list: List of dicts with 'start', 'end', 'text' keys
+    """
+    return list(iter_segments(video_path, language=language, model=model, config=config))
+
+
+def plan_chunks(speech_spans, total_samples, max_chunk_samples):
+    """
+    Group VAD speech spans into chunks of bounded length, cutting only in silence
+    
+    Args:
+        speech_spans: List of {'start', 'end'} sample offsets from VAD
+        total_samples: Length of the audio
+        max_chunk_samples: Upper bound on speech covered by one chunk
+    
+    Returns:
+        list: (start, end) sample ranges covering the whole audio; cuts fall
+              in the middle of the silence between two speech spans
+    """
+    if not speech_spans:
+        return [(0, total_samples)] if total_samples else []
+    
+    groups = [[speech_spans[0]]]
+    for span in speech_spans[1:]:
+        if span['end'] - groups[-1][0]['start'] > max_chunk_samples:
+            groups.append([span])
+        else:
+            groups[-1].append(span)
+    
+    chunks = []
+    start = 0
+    for current, following in zip(groups, groups[1:]):
+        cut = (current[-1]['end'] + following[0]['start']) // 2
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, total_samples))
+    return chunks
+
+
+def _normalize_text(text):
+    return ''.join(ch for ch in text.lower() if ch.isalnum())
+
+
+# Seconds around a chunk cut in which Whisper may transcribe the same words twice
+BOUNDARY_WINDOW_S = 0.5
+
 
+def _is_boundary_duplicate(tail, segment):
+    """True if a segment repeats (the end of) one of the previous chunk's last segments"""
+    text = _normalize_text(segment['text'])
+    if not text:
+        return False
+    for previous in tail:
+        prev_text = _normalize_text(previous['text'])
+        if text == prev_text or prev_text.endswith(text):
+            return True
+    return False
+
+
+def stitch_chunks(chunk_results, window_s=BOUNDARY_WINDOW_S):
+    """
+    Join per-chunk segments in time order, dropping repeats at the cuts
+    
+    Only the new chunk's segments that start within window_s of the cut are
+    compared, and only against the previous chunk's segments ending within
+    window_s of it; repeated lines inside a chunk are kept.
+    
+    Args:
+        chunk_results: (chunk start in seconds, segments) pairs in time order
+        window_s: Half-width of the window around each cut
+    
+    Yields:
+        dict: Segment with absolute 'start', 'end' and 'text'
+    """
+    previous = None
+    tail = []
+    for boundary, chunk_segments in chunk_results:
+        window = [seg for seg in tail if seg['end'] >= boundary - window_s]
+        emitted = []
+        for segment in chunk_segments:
+            if window and segment['start'] <= boundary + window_s and _is_boundary_duplicate(window, segment):
+                continue
+            if previous is not None and segment['start'] < previous['end']:
+                segment['start'] = previous['end']
+            previous = segment
+            emitted.append(segment)
+            yield segment
+        if emitted:
+            tail = emitted
+
+
+# Per-process model for pool workers, loaded once by _init_worker
+_WORKER_MODEL = None
+
+
+def _init_worker(config, cpu_threads):
+    global _WORKER_MODEL
+    _WORKER_MODEL = get_model(
+        config.whisper_model_size,
+        device=config.whisper_device,
+        compute_type=config.whisper_compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=1
+    )
+
+
+def _transcribe_chunk(task):
+    """Transcribe one audio chunk in a pool worker; timestamps are made absolute"""
+    audio, start, end, language = task
+    # The buffer pickles as a path: the worker maps the shared PCM file, no sample copy
+    offset_s = start / SAMPLE_RATE
+    segments, _ = _WORKER_MODEL.transcribe(audio.samples[start:end], language=language)
+    return [{
+        'start': segment.start + offset_s,
+        'end': segment.end + offset_s,
+        'text': segment.text.strip()
+    } for segment in segments]
+
+
+def iter_long_media_segments(audio: AudioBuffer, language="zh", config=None):
+    """
+    Transcribe long audio in parallel: split on silence with VAD, transcribe
+    the chunks in a process pool, and stitch the results back in order
+    
+    Args:
+        audio: Memory-mapped 16 kHz mono PCM shared with the workers
+        language: Language code
+        config: AgentConfig with Whisper and VAD settings (DEFAULT_CONFIG if None)
+    
+    Yields:
+        dict: Segment with absolute 'start', 'end' and 'text', in time order
+    """
+    config = config or DEFAULT_CONFIG
+    
+    vad_options = VadOptions(
+        min_silence_duration_ms=config.vad_min_silence_ms,
+        max_speech_duration_s=config.vad_max_chunk_s
+    )
+    speech_spans = get_speech_timestamps(audio.samples, vad_options, sampling_rate=SAMPLE_RATE)
+    chunks = plan_chunks(speech_spans, len(audio), int(config.vad_max_chunk_s * SAMPLE_RATE))
+    
+    processes = config.transcribe_processes or max(1, (os.cpu_count() or 2) // 2)
+    processes = min(processes, len(chunks)) or 1
+    cpu_threads = max(1, (os.cpu_count() or processes) // processes)
+    print(f"✂️  Split {audio.duration:.0f}s of audio into {len(chunks)} chunks "
+          f"→ {processes} processes × {cpu_threads} threads")
+    
+    tasks = ((audio, start, end, language) for start, end in chunks)
+    
+    # spawn: forking a process that already runs CTranslate2 threads can deadlock
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_init_worker, initargs=(config, cpu_threads)) as pool:
+        # map() keeps chunk order, so segments stream out in time order
+        results = pool.map(_transcribe_chunk, tasks)
+        yield from stitch_chunks((start / SAMPLE_RATE, chunk_segments)
+                                 for (start, _), chunk_segments in zip(chunks, results))
+
+
+def transcription_options(duration, config):
+    """Settings that change the transcript, used as part of the transcript cache key"""
+    options = {
+        'model_size': config.whisper_model_size,
+        'compute_type': config.whisper_compute_type,
+        'mode': 'single'
+    }
+    if 0 < config.long_media_threshold_s <= duration:
+        options.update({
+            'mode': 'vad_parallel',
+            'vad_max_chunk_s': config.vad_max_chunk_s,
+            'vad_min_silence_ms': config.vad_min_silence_ms
+        })
+    return options
+
+
+def iter_media_segments(video_path, language="zh", model=None, config=None, cache=None, audio=None):
+    """
+    Transcribe any length of media, switching to VAD-split parallel
+    transcription when the audio is longer than long_media_threshold_s
+    
+    Args:
+        video_path: Path to video file
+        language: Language code
+        model: Preloaded WhisperModel for the single-process path
+        config: AgentConfig (DEFAULT_CONFIG if None)
+        cache: Optional TranscriptCache; a hit skips Whisper entirely
+        audio: AudioBuffer from extract_audio() (extracted into audio_cache_dir if None)
+    
+    Yields:
+        dict: Segment with 'start', 'end', 'text' keys
+    """
+    config = config or DEFAULT_CONFIG
+    
+    # Decode once; the cache key, VAD and every transcription path read the same samples
+    if audio is None:
+        # Relative to the agent folder, like open_transcript(), not the working directory
+        cache_dir = Path(config.audio_cache_dir)
+        if not cache_dir.is_absolute():
+            cache_dir = Path(__file__).parent.parent / cache_dir
+        audio = extract_audio(video_path, cache_dir, config.audio_cache_max_files)
+    duration = audio.duration
+    
+    if cache is not None:
+        from utils.transcript_cache import audio_digest
+        digest = audio_digest(audio.samples)
+        options = transcription_options(duration, config)
+        key = cache.make_key(digest, language, options)
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"♻️  Transcript cache hit ({len(cached)} segments), skipping Whisper")
+            yield from cached
+            return
+    
+    if 0 < config.long_media_threshold_s <= duration:
+        segments = iter_long_media_segments(audio, language=language, config=config)
+    else:
+        segments = iter_segments(audio.samples, language=language, model=model, config=config)
+    
+    transcript = []
+    for segment in segments:
+        transcript.append(segment)
+        yield segment
+    
+    # Only a fully consumed transcript is cached
+    if cache is not None:
+        cache.put(key, digest, language, options, transcript)